@@ -0,0 +1,90 @@
+"""attendance and profiles
+
+Revision ID: c4e8f2a19b37
+Revises: a26d62bf71c6
+Create Date: 2026-10-18 09:12:40.118523
+
+Databases bootstrapped by init_db() may already have these tables, so each
+one is only created when it is missing. Secondary indexes come in the next
+revision.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8f2a19b37'
+down_revision: Union[str, None] = 'a26d62bf71c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _missing(table: str) -> bool:
+    if context.is_offline_mode():
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _missing('officerprofile'):
+        op.create_table('officerprofile',
+        sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('user_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('designation', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('phone_number', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('zone', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('username', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+        )
+    if _missing('corperprofile'):
+        op.create_table('corperprofile',
+        sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('user_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('call_up_number', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('state_code', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('batch', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('stream', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('gender', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('passport_url', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('lga_primary_assignment', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('cds_group', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('zone', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('cds_day', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('current_status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('date_of_registration', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+        )
+    if _missing('attendance'):
+        op.create_table('attendance',
+        sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('corper_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('officer_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column('cds_group', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('attendance_date', sa.Date(), nullable=False),
+        sa.Column('check_in_time', sa.DateTime(), nullable=False),
+        sa.Column('check_out_time', sa.DateTime(), nullable=True),
+        sa.Column('gps_lat', sa.Float(), nullable=True),
+        sa.Column('gps_long', sa.Float(), nullable=True),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('remarks', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['corper_id'], ['user.id'], ),
+        sa.ForeignKeyConstraint(['officer_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attendance')
+    op.drop_table('corperprofile')
+    op.drop_table('officerprofile')
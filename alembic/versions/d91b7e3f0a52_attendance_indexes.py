@@ -0,0 +1,68 @@
+"""attendance access-path indexes
+
+Revision ID: d91b7e3f0a52
+Revises: c4e8f2a19b37
+Create Date: 2026-10-18 09:31:05.604217
+
+Indexes for the repository queries and their (created_at, id) keyset order,
+plus one attendance record per corper per day. They are built CONCURRENTLY
+outside the migration transaction, so attendance and user stay writable
+while they build. If a build is interrupted, drop the INVALID index it left
+behind (DROP INDEX CONCURRENTLY) and run the upgrade again.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91b7e3f0a52'
+down_revision: Union[str, None] = 'c4e8f2a19b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, unique)
+INDEXES = [
+    ('uq_attendance_corper_id_attendance_date', 'attendance', ['corper_id', 'attendance_date'], True),
+    ('ix_attendance_corper_id_created_at_id', 'attendance', ['corper_id', 'created_at', 'id'], False),
+    ('ix_attendance_cds_group_attendance_date', 'attendance', ['cds_group', 'attendance_date', 'created_at', 'id'], False),
+    ('ix_attendance_officer_id', 'attendance', ['officer_id'], False),
+    ('ix_corperprofile_cds_group', 'corperprofile', ['cds_group'], False),
+    ('ix_user_created_at_id', 'user', ['created_at', 'id'], False),
+]
+
+
+def _check_no_duplicate_attendance() -> None:
+    if context.is_offline_mode():
+        return
+    duplicate = op.get_bind().execute(sa.text(
+        "SELECT corper_id, attendance_date FROM attendance "
+        "GROUP BY corper_id, attendance_date HAVING count(*) > 1 LIMIT 1"
+    )).first()
+    if duplicate:
+        raise RuntimeError(
+            f"attendance has more than one record for corper {duplicate[0]} on "
+            f"{duplicate[1]}; remove the duplicates before adding "
+            "uq_attendance_corper_id_attendance_date"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_no_duplicate_attendance()
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=unique,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""user search trigram indexes
+
+Revision ID: e3a7c5f81d24
+Revises: d91b7e3f0a52
+Create Date: 2026-10-18 10:02:17.381940
+
+GIN pg_trgm indexes for every column UserRepository.search matches, so
+ILIKE '%term%' is an index lookup instead of a scan of user. Built
+CONCURRENTLY like the attendance indexes. pg_trgm is a trusted extension on
+PostgreSQL 13+, so the database owner can create it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c5f81d24'
+down_revision: Union[str, None] = 'd91b7e3f0a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, column)
+INDEXES = [
+    ('ix_user_email_trgm', 'user', 'email'),
+    ('ix_user_full_name_trgm', 'user', 'full_name'),
+    ('ix_corperprofile_call_up_number_trgm', 'corperprofile', 'call_up_number'),
+    ('ix_corperprofile_state_code_trgm', 'corperprofile', 'state_code'),
+    ('ix_corperprofile_cds_group_trgm', 'corperprofile', 'cds_group'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name, table, [column],
+                if_not_exists=True,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension stays: other objects may depend on it.
+    with op.get_context().autocommit_block():
+        for name, table, column in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
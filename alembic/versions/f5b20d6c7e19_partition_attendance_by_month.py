@@ -0,0 +1,133 @@
+"""partition attendance by month
+
+Revision ID: f5b20d6c7e19
+Revises: e3a7c5f81d24
+Create Date: 2026-10-18 10:48:52.907113
+
+Rebuilds attendance as a table range-partitioned on attendance_date, one
+partition per month from the oldest record to three months ahead
+(app.core.partitions keeps creating them after that). The
+primary key becomes (id, attendance_date), since it has to include the
+partition key. Rows are copied while attendance is locked, so run this in a
+maintenance window. Skipped when attendance is already partitioned, as
+init_db creates it from the model.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b20d6c7e19'
+down_revision: Union[str, None] = 'e3a7c5f81d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    'id, corper_id, officer_id, cds_group, attendance_date, check_in_time, '
+    'check_out_time, gps_lat, gps_long, status, remarks, created_at, updated_at'
+)
+
+# (name, columns, unique)
+INDEXES = [
+    ('uq_attendance_corper_id_attendance_date', ['corper_id', 'attendance_date'], True),
+    ('ix_attendance_corper_id_created_at_id', ['corper_id', 'created_at', 'id'], False),
+    ('ix_attendance_cds_group_attendance_date', ['cds_group', 'attendance_date', 'created_at', 'id'], False),
+    ('ix_attendance_officer_id', ['officer_id'], False),
+]
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_table(*constraints, **kw) -> None:
+    op.create_table('attendance',
+    sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('corper_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('officer_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('cds_group', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('attendance_date', sa.Date(), nullable=False),
+    sa.Column('check_in_time', sa.DateTime(), nullable=False),
+    sa.Column('check_out_time', sa.DateTime(), nullable=True),
+    sa.Column('gps_lat', sa.Float(), nullable=True),
+    sa.Column('gps_long', sa.Float(), nullable=True),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('remarks', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['corper_id'], ['user.id'], name='attendance_corper_id_fkey'),
+    sa.ForeignKeyConstraint(['officer_id'], ['user.id'], name='attendance_officer_id_fkey'),
+    *constraints,
+    **kw
+    )
+
+
+def _set_aside_old_table(name: str) -> None:
+    # Free the index and constraint names for the new table
+    op.rename_table('attendance', name)
+    op.execute(f'ALTER INDEX attendance_pkey RENAME TO {name}_pkey')
+    for column in ('corper_id', 'officer_id'):
+        op.execute(f'ALTER TABLE {name} DROP CONSTRAINT IF EXISTS attendance_{column}_fkey')
+    for index, columns, unique in INDEXES:
+        op.drop_index(index, table_name=name, if_exists=True)
+
+
+def _create_indexes() -> None:
+    # Built once on the parent, and by PostgreSQL on every partition
+    for index, columns, unique in INDEXES:
+        op.create_index(index, 'attendance', columns, unique=unique)
+
+
+def _partitioned() -> bool:
+    if context.is_offline_mode():
+        return False
+    return op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('attendance')")
+    ).first() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _partitioned():
+        # Its attendance_pYYYYMM partitions already exist (MonthlyPartitions)
+        return
+    _set_aside_old_table('attendance_unpartitioned')
+    _create_table(
+        sa.PrimaryKeyConstraint('id', 'attendance_date'),
+        postgresql_partition_by='RANGE (attendance_date)',
+    )
+
+    today = date.today()
+    first = today
+    if not context.is_offline_mode():
+        oldest = op.get_bind().execute(
+            sa.text('SELECT min(attendance_date) FROM attendance_unpartitioned')
+        ).scalar()
+        first = min(oldest or today, today)
+    month = _month_start(first)
+    while month <= _month_start(today, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE attendance_p{month:%Y%m} PARTITION OF attendance "
+            f"FOR VALUES FROM ('{month}') TO ('{_month_start(month, 1)}')"
+        )
+        month = _month_start(month, 1)
+
+    op.execute(f'INSERT INTO attendance ({COLUMNS}) SELECT {COLUMNS} FROM attendance_unpartitioned')
+    op.drop_table('attendance_unpartitioned')
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _set_aside_old_table('attendance_partitioned')
+    _create_table(sa.PrimaryKeyConstraint('id'))
+    op.execute(f'INSERT INTO attendance ({COLUMNS}) SELECT {COLUMNS} FROM attendance_partitioned')
+    op.drop_table('attendance_partitioned')  # drops its partitions too
+    _create_indexes()
@@ -1,11 +1,298 @@
+import asyncio
+import itertools
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from fastapi import Depends, Request
+from redis.exceptions import RedisError
+from sqlalchemy import Engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+from app.core.token_codec import token_codec
+
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
 
-engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI),
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
+# Seconds the replica is behind the primary, or 0 when it has replayed
+# everything it received (an idle primary is not lag).
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def async_database_uri(uri: str) -> str:
+    """Point a postgresql:// URI at the asyncpg driver and sqlite:// at aiosqlite."""
+    scheme, _, rest = uri.partition("://")
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return uri
+
+
+class _TimedPoolMixin:
+    """Record how long each checkout waited for a pooled connection."""
+
+    metric_prefix = "db_pool"
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            metrics.observe(f"{self.metric_prefix}.wait_seconds", waited)
+            if waited * 1000 >= settings.DB_POOL_WAIT_WARN_MS:
+                metrics.increment(f"{self.metric_prefix}.slow_checkouts")
+                logger.warning(
+                    f"Waited {waited * 1000:.0f}ms for a database connection "
+                    f"({self.metric_prefix}: {self.status()})"
+                )
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class EngineRegistry:
+    """The process's database engines, all built from one pool configuration.
+
+    Every session comes from here, so a request never holds connections from
+    two independently sized pools. Each engine's pool reports checked-out
+    connections, overflow and checkout wait time to the metrics registry.
+    Replicas are named ``replica0``, ``replica1``, ...; any other name is an
+    engine on the primary.
+    """
+
+    def __init__(self, url: str, replica_urls: Sequence[str] = ()):
+        self.url = url
+        self.replicas = [f"replica{i}" for i in range(len(replica_urls))]
+        self._urls = dict(zip(self.replicas, replica_urls))
+        self._engines: Dict[str, Engine] = {}
+        self._async_engines: Dict[str, AsyncEngine] = {}
+
+    def url_of(self, name: str) -> str:
+        return self._urls.get(name, self.url)
+
+    @staticmethod
+    def _pool_options() -> Dict[str, Any]:
+        return {
+            "echo": settings.DB_ECHO,
+            "pool_pre_ping": True,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        }
+
+    def _register(self, name: str, engine: Engine) -> None:
+        pool = engine.pool
+        pool.metric_prefix = f"db_pool.{name}"
+        event.listen(engine, "begin", lambda conn: metrics.increment(f"db_pool.{name}.transactions"))
+        metrics.register_gauge(f"db_pool.{name}.size", pool.size)
+        metrics.register_gauge(f"db_pool.{name}.checked_out", pool.checkedout)
+        metrics.register_gauge(f"db_pool.{name}.overflow", lambda: max(0, pool.overflow()))
+
+    def engine(self, name: str = "primary") -> Engine:
+        """Get a blocking engine, creating it on first use."""
+        if name not in self._engines:
+            connect_args = {}
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            engine = create_engine(
+                self.url_of(name),
+                poolclass=TimedQueuePool,
+                connect_args=connect_args,
+                **self._pool_options(),
+            )
+            self._register(name, engine)
+            self._engines[name] = engine
+        return self._engines[name]
+
+    def async_engine(self, name: str = "primary") -> AsyncEngine:
+        """Get an asyncpg engine, creating it on first use."""
+        if name not in self._async_engines:
+            connect_args = {}
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                connect_args["server_settings"] = {
+                    "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+                }
+            engine = create_async_engine(
+                async_database_uri(self.url_of(name)),
+                poolclass=TimedAsyncQueuePool,
+                connect_args=connect_args,
+                **self._pool_options(),
+            )
+            self._register(f"{name}_async", engine.sync_engine)
+            self._async_engines[name] = engine
+        return self._async_engines[name]
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Live statistics of every pool."""
+        pools = {name: e.pool for name, e in self._engines.items()}
+        pools.update({f"{name}_async": e.sync_engine.pool for name, e in self._async_engines.items()})
+        snapshot = metrics.snapshot()
+        stats = {}
+        for name, pool in pools.items():
+            prefix = f"db_pool.{name}"
+            stats[name] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "wait_seconds": snapshot["summaries"].get(f"{prefix}.wait_seconds"),
+                "slow_checkouts": snapshot["counters"].get(f"{prefix}.slow_checkouts", 0),
+                "transactions": snapshot["counters"].get(f"{prefix}.transactions", 0),
+            }
+        return stats
+
+    async def dispose(self) -> None:
+        """Close every pooled connection."""
+        for engine in self._async_engines.values():
+            await engine.dispose()
+        for engine in self._engines.values():
+            engine.dispose()
+
+
+class ReplicaRouter:
+    """Pick the engine each request's session reads from.
+
+    Requests with a safe method (GET, HEAD, OPTIONS) read from the replicas
+    in turn; every other request uses the primary. A replica is skipped while
+    its replay lag, checked every ``interval`` seconds, exceeds ``max_lag``
+    or cannot be measured, so reads fall back to the primary rather than
+    return stale data. After a user's write request succeeds, their reads
+    stay on the primary for ``sticky_seconds`` (recorded in Redis, so it
+    holds across workers) and they see their own writes.
+    """
+
+    def __init__(
+        self,
+        registry: EngineRegistry,
+        max_lag: float = settings.DB_REPLICA_MAX_LAG_SECONDS,
+        interval: int = settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+        sticky_seconds: int = settings.DB_READ_YOUR_WRITES_SECONDS,
+    ):
+        self.registry = registry
+        self.max_lag = max_lag
+        self.interval = interval
+        self.sticky_seconds = sticky_seconds
+        # None until measured, or when the last check failed
+        self.lag: Dict[str, Optional[float]] = {name: None for name in registry.replicas}
+        self._turn = itertools.count()
+        self._checker: Optional[asyncio.Task] = None
+        for name in registry.replicas:
+            metrics.register_gauge(
+                f"db_replica.{name}.lag_seconds", lambda name=name: self.lag[name]
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.registry.replicas)
+
+    async def measure_lag(self, name: str) -> float:
+        async with self.registry.async_engine(name).connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return 0.0
+            return float((await conn.execute(REPLICA_LAG_QUERY)).scalar())
+
+    async def check(self) -> None:
+        """Measure the lag of every replica."""
+        for name in self.registry.replicas:
+            try:
+                self.lag[name] = await self.measure_lag(name)
+            except Exception as e:
+                self.lag[name] = None
+                logger.warning(f"Replica {name} lag check failed: {str(e)}")
+
+    def available(self) -> List[str]:
+        return [
+            name for name, lag in self.lag.items() if lag is not None and lag <= self.max_lag
+        ]
+
+    @staticmethod
+    def user_id(request: Request) -> Optional[str]:
+        claims = token_codec.request_claims(request.scope)
+        return claims.get("sub") if claims else None
+
+    async def wrote_recently(self, user_id: str) -> bool:
+        try:
+            return bool(await async_redis_client.client.exists(f"db_primary:{user_id}"))
+        except RedisError as e:
+            # Unknown, so assume they did
+            logger.warning(f"Read-your-writes check failed: {str(e)}")
+            return True
+
+    async def route(self, request: Request) -> str:
+        """Name of the engine this request should use."""
+        if not self.enabled or request.method not in READ_ONLY_METHODS:
+            return "primary"
+        replicas = self.available()
+        if not replicas:
+            metrics.increment("db_replica.fallbacks")
+            return "primary"
+        user_id = self.user_id(request)
+        if user_id and await self.wrote_recently(user_id):
+            metrics.increment("db_replica.sticky_reads")
+            return "primary"
+        name = replicas[next(self._turn) % len(replicas)]
+        metrics.increment(f"db_replica.{name}.reads")
+        return name
+
+    async def written(self, request: Request) -> None:
+        """Keep the reads of the request's user on the primary for a while."""
+        user_id = self.user_id(request) if self.enabled else None
+        if not user_id or self.sticky_seconds <= 0:
+            return
+        try:
+            await async_redis_client.client.set(
+                f"db_primary:{user_id}", 1, ex=self.sticky_seconds
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to record write for read-your-writes: {str(e)}")
+
+    async def _check_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        await self.check()
+        if self._checker is None and self.interval > 0:
+            self._checker = asyncio.create_task(self._check_periodically())
+
+    async def stop(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            try:
+                await self._checker
+            except asyncio.CancelledError:
+                pass
+            self._checker = None
+
+
+engines = EngineRegistry(str(settings.SQLALCHEMY_DATABASE_URI), settings.DB_REPLICA_URIS)
+replica_router = ReplicaRouter(engines)
+
+engine = engines.engine()
+async_engine = engines.async_engine()
+async_session_factory = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
@@ -13,6 +300,81 @@ def init_db():
     SQLModel.metadata.create_all(engine)
 
 
-def get_session():
-    with Session(engine) as session:
-        yield session 
\ No newline at end of file
+async def route_request(request: Request) -> AsyncGenerator[str, None]:
+    """Engine for the request's session; FastAPI shares it across dependencies."""
+    yield await replica_router.route(request)
+    # Only reached when the handler succeeded
+    if request.method not in READ_ONLY_METHODS:
+        await replica_router.written(request)
+
+
+def get_session(route: str = Depends(route_request)):
+    with Session(engines.engine(route), expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_factory() as session:
+        yield session
+
+
+class UnitOfWork:
+    """One session, one connection and one transaction for a whole request.
+
+    Repositories built on ``uow.session`` flush instead of committing (see
+    ``staged``), so auth and the handler share the session and everything
+    they write is committed once when the request succeeds, or rolled back
+    if it raises.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        session.info["unit_of_work"] = True
+
+    async def flush(self) -> None:
+        await self.session.flush()
+
+    async def commit(self) -> None:
+        await self.session.commit()
+        for callback in self.session.info.pop("after_commit", []):
+            await callback()
+
+    async def rollback(self) -> None:
+        self.session.info.pop("after_commit", None)
+        await self.session.rollback()
+
+
+def staged(session: Union[Session, AsyncSession]) -> bool:
+    """Whether writes on this session are committed by a unit of work."""
+    return session.info.get("unit_of_work", False)
+
+
+async def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """Run callback once the session's writes are committed.
+
+    Right away, unless a unit of work owns the transaction; then only when it
+    commits, and never if it rolls back.
+    """
+    if staged(session):
+        session.info.setdefault("after_commit", []).append(callback)
+    else:
+        await callback()
+
+
+async def get_unit_of_work(
+    route: str = Depends(route_request),
+) -> AsyncGenerator[UnitOfWork, None]:
+    """Request-scoped unit of work; FastAPI shares it across dependencies.
+
+    Its session reads from a replica on GET, HEAD and OPTIONS requests (see
+    ReplicaRouter), where the handler must not write.
+    """
+    async with async_session_factory(bind=engines.async_engine(route)) as session:
+        uow = UnitOfWork(session)
+        metrics.increment("unit_of_work.requests")
+        try:
+            yield uow
+            await uow.commit()
+        except Exception:
+            await uow.rollback()
+            raise
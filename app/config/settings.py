@@ -24,6 +24,38 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT")
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+    # Connection pools (per engine, per worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_WAIT_WARN_MS: int = 100  # Log checkouts that waited this long
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 disables
+    DB_ECHO: bool = False  # Log every SQL statement
+    # Read replicas (a JSON list of DSNs). Reads of GET/HEAD/OPTIONS requests
+    # go to a replica whose replay lag is within the limit, or else to the
+    # primary; a user's reads stay on the primary for a while after they write.
+    DB_REPLICA_URIS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_INTERVAL: int = 5  # Seconds between lag checks
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
+    # Attendance is partitioned by month of attendance_date. Partitions are
+    # created months ahead; those older than the retention are detached and
+    # left as standalone tables to archive (0 = keep every month attached).
+    ATTENDANCE_PARTITION_MONTHS_AHEAD: int = 3
+    ATTENDANCE_RETENTION_MONTHS: int = 36
+    ATTENDANCE_PARTITION_INTERVAL: int = 86400  # Seconds between maintenance runs, 0 disables
+    # Date range of attendance queries given no dates, so they scan only the
+    # partitions it covers (one service year)
+    ATTENDANCE_QUERY_WINDOW_DAYS: int = 366
+    # Daily attendance rollups per CDS group are updated with every write;
+    # reconciliation recounts the most recent days to repair any drift, and
+    # fills the rollups from all of attendance at startup if they are empty.
+    ATTENDANCE_ROLLUP_RECONCILE_INTERVAL: int = 3600  # Seconds between runs, 0 disables
+    ATTENDANCE_ROLLUP_RECONCILE_DAYS: int = 7
+    # Attendance exports stream rows from a server-side cursor; each batch is
+    # one fetch from the database and one chunk of the response.
+    ATTENDANCE_EXPORT_BATCH_SIZE: int = 5000
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
@@ -44,14 +76,58 @@ class Settings(BaseSettings):
     REDIS_DB: int = os.getenv("REDIS_DB")
     REDIS_PASSWORD: Optional[str] = None
     REDIS_SSL: bool = False
+    REDIS_MAX_CONNECTIONS: int = 50  # Connections per worker pool
+    REDIS_POOL_TIMEOUT: int = 5  # Seconds to wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT: int = 5  # Seconds
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # Seconds between idle connection pings
 
     # Session settings
     SESSION_EXPIRE_SECONDS: int = 3600  # 1 hour
     REFRESH_TOKEN_EXPIRE_DAYS: int = 1  # day
 
+    # Access token mode: "stateful" checks every access token against Redis,
+    # "stateless" trusts signature and expiry and only consults the
+    # replicated revocation list.
+    ACCESS_TOKEN_MODE: str = "stateful"
+    REVOCATION_SYNC_INTERVAL: int = 5  # Seconds between revocation list syncs
+
+    # Validated access token cache (per worker)
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 10000  # Entries
+    TOKEN_CACHE_TTL_SECONDS: int = 30  # Upper bound on staleness if a revocation is missed
+    TOKEN_CACHE_CHANNEL: str = "token_revocations"
+
+    # Authenticated-user cache: the projection of each user that auth needs
+    # (see UserPrincipal), per worker and in Redis. Writes to a user
+    # invalidate it everywhere; the TTL bounds staleness if that message is lost.
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000  # Entries per worker
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_CHANNEL: str = "principal_invalidations"
+
+    # Password hashing (bcrypt runs on a process pool)
+    PASSWORD_HASH_WORKERS: int = 2  # Processes per API worker
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # Calls allowed to wait for a free process
+    PASSWORD_HASH_RETRY_AFTER: int = 1  # Seconds, sent with 503 when the queue is full
+
+    # Session index: logins beyond the cap evict the user's oldest sessions
+    # (0 = unlimited); the sweep prunes expired entries of idle users.
+    MAX_SESSIONS_PER_USER: int = 10
+    SESSION_SWEEP_INTERVAL: int = 3600  # Seconds, 0 disables the sweep
+
     # Rate limiting settings
     RATE_LIMIT_REQUESTS: int = 100  # Number of requests
     RATE_LIMIT_WINDOW: int = 3600  # Time window in seconds (1 hour)
+    # Leased limiting: each worker takes this many requests from Redis at a
+    # time (0 or 1 = one Redis call per request). Across W workers up to
+    # W * (size - 1) requests of quota can be held unused, for at most
+    # RATE_LIMIT_LEASE_TTL seconds before being refunded.
+    RATE_LIMIT_LEASE_SIZE: int = 10
+    RATE_LIMIT_LEASE_TTL: int = 5  # Seconds
+    RATE_LIMIT_LEASE_MAX_KEYS: int = 10000  # Keys tracked per worker
+    # Per-route quotas live in app/config/rate_limits.yaml. Only trust
+    # X-Forwarded-For for the client IP when running behind a proxy that sets it.
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
 
     @property
     def redis_url(self) -> str:
@@ -66,5 +142,12 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_DAYS: int = os.getenv("REFRESH_TOKEN_EXPIRE_DAYS")
 
+    # JWT codec: "jose" or "pyjwt" (optional, needed for EdDSA). Asymmetric
+    # algorithms sign with the private key and verify with the public key (PEM).
+    JWT_BACKEND: str = "jose"
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_PUBLIC_KEY: Optional[str] = None
+    JWT_LEEWAY_SECONDS: int = 5  # Clock skew tolerated on exp/iat between hosts
+
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = os.getenv("BACKEND_CORS_ORIGINS")
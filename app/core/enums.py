@@ -27,4 +27,12 @@ class OrderStatus(str, Enum):
 
     @classmethod
     def is_valid_transition(cls, current_status: str, new_status: str) -> bool:
-        return cls(new_status) in cls.get_valid_transitions(current_status) 
\ No newline at end of file
+        return cls(new_status) in cls.get_valid_transitions(current_status) 
+
+
+class AttendanceStatus(str, Enum):
+    """Statuses an attendance record can have; each is counted in the rollups."""
+    PRESENT = "present"
+    ABSENT = "absent"
+    LATE = "late"
+    EXCUSED = "excused"
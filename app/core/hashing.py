@@ -0,0 +1,96 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.utils.auth import get_password_hash, verify_password
+
+
+def _timed_call(fn: Callable, submitted_at: float, *args: Any) -> Tuple[float, float, Any]:
+    """Run fn in a worker process and report how long it queued and ran."""
+    started_at = time.time()
+    result = fn(*args)
+    return started_at - submitted_at, time.time() - started_at, result
+
+
+class PasswordHasher:
+    """Run bcrypt on a process pool so it never blocks the event loop.
+
+    At most ``max_workers + max_queue`` calls may be pending at once; beyond
+    that callers get a 503 with Retry-After instead of piling up behind a
+    login burst.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_QUEUE_SIZE,
+        retry_after: int = settings.PASSWORD_HASH_RETRY_AFTER,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+        metrics.register_gauge("password_hasher.pool_size", lambda: self.max_workers)
+        metrics.register_gauge("password_hasher.in_flight", lambda: min(self._pending, self.max_workers))
+        metrics.register_gauge("password_hasher.queue_depth", lambda: max(0, self._pending - self.max_workers))
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Get the process pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        if self._pending >= self.max_workers + self.max_queue:
+            metrics.increment("password_hasher.rejected")
+            logger.warning("Password hashing queue is full, rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy. Please try again shortly.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            wait, run, result = await loop.run_in_executor(
+                self.executor, _timed_call, fn, time.time(), *args
+            )
+        finally:
+            self._pending -= 1
+
+        metrics.observe("password_hasher.wait_seconds", wait)
+        metrics.observe("password_hasher.run_seconds", run)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def start(self) -> None:
+        """Spawn the worker processes ahead of the first login."""
+        for _ in range(self.max_workers):
+            self.executor.submit(int)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Create a singleton instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Generic, Optional, Tuple, TypeVar
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+
+V = TypeVar("V")
+
+
+class LocalCache(Generic[V]):
+    """Bounded per-worker LRU kept in step across workers over Redis pub/sub.
+
+    Entries expire at the time they were stored with. Messages on
+    ``channel`` are applied by handle_message, which subclasses implement.
+    The subscription uses AsyncRedisClient.subscriber, which never
+    reconnects silently: whenever it is (re)established the LRU is cleared,
+    since anything published while we were not subscribed is lost.
+    """
+
+    def __init__(self, name: str, enabled: bool, max_size: int, ttl_seconds: int, channel: str):
+        self.name = name
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.channel = channel
+        # key -> (value, expires_at)
+        self._entries: "OrderedDict[str, Tuple[V, float]]" = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+        metrics.register_gauge(f"{name}.size", lambda: len(self._entries))
+
+    def _lookup(self, key: str) -> Optional[V]:
+        """The live value stored under key, or None; expired entries are dropped."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _remember(self, key: str, value: V, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            metrics.increment(f"{self.name}.evictions")
+
+    def evict(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def handle_message(self, message: str) -> None:
+        """Apply a message received from the channel."""
+        raise NotImplementedError
+
+    async def _listen(self) -> None:
+        backoff = 1
+        while True:
+            pubsub = async_redis_client.subscriber.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything published while we were not subscribed is lost.
+                self.clear()
+                backoff = 1
+                while True:
+                    # Wakes up at least every health check interval to ping
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                    )
+                    if message and message.get("type") == "message":
+                        self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                logger.warning(f"Subscription of {self.name} lost: {str(e)}")
+                self.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await pubsub.aclose()
+
+    async def start(self) -> None:
+        """Start listening on the channel."""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening and drop every cached entry."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self.clear()
@@ -0,0 +1,70 @@
+from threading import Lock
+from typing import Callable, Dict, Any
+
+
+class Summary:
+    """Running count/total/max of an observed value (e.g. a wait time)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+        }
+
+
+class MetricsRegistry:
+    """In-process metrics for the current worker.
+
+    Counters and summaries are updated inline; gauges are callables sampled
+    when a snapshot is taken, so components only register where to read them.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.counters: Dict[str, int] = {}
+        self.summaries: Dict[str, Summary] = {}
+        self.gauges: Dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation of a summary."""
+        with self._lock:
+            summary = self.summaries.get(name)
+            if summary is None:
+                summary = self.summaries[name] = Summary()
+            summary.observe(value)
+
+    def register_gauge(self, name: str, callback: Callable[[], Any]) -> None:
+        """Register a callable that returns the current value of a gauge."""
+        self.gauges[name] = callback
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current value of every metric."""
+        with self._lock:
+            counters = dict(self.counters)
+            summaries = {name: s.to_dict() for name, s in self.summaries.items()}
+        return {
+            "counters": counters,
+            "gauges": {name: callback() for name, callback in self.gauges.items()},
+            "summaries": summaries,
+        }
+
+
+# Create a singleton instance
+metrics = MetricsRegistry()
@@ -0,0 +1,165 @@
+import asyncio
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.config.database import async_engine
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after the month of day."""
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class MonthlyPartitions:
+    """Keep a table range-partitioned by month of a date column.
+
+    Partitions are named ``{table}_pYYYYMM``. Maintenance creates the next
+    ``months_ahead`` months so inserts always have a partition, and detaches
+    months older than ``retention_months``, leaving them as standalone tables
+    to archive or drop. Queries filtering on the date column only scan the
+    partitions they cover, and autovacuum works on one month at a time, so
+    neither slows down as history accumulates. PostgreSQL 14+ only; a no-op
+    on other databases.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        engine: AsyncEngine = async_engine,
+        months_ahead: int = settings.ATTENDANCE_PARTITION_MONTHS_AHEAD,
+        retention_months: int = settings.ATTENDANCE_RETENTION_MONTHS,
+        interval: int = settings.ATTENDANCE_PARTITION_INTERVAL,
+    ):
+        self.table = table
+        self.engine = engine
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.interval = interval
+        self._maintainer: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table}_p{month:%Y%m}"
+
+    async def attached(self) -> List[date]:
+        """First day of every month that has an attached partition."""
+        async with self.engine.connect() as conn:
+            rows = await conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = CAST(:table AS regclass)"
+                ),
+                {"table": f'"{self.table}"'},
+            )
+            names = rows.scalars().all()
+        prefix = f"{self.table}_p"
+        return sorted(
+            date(int(name[-6:-2]), int(name[-2:]), 1)
+            for name in names
+            if name.startswith(prefix) and len(name) == len(prefix) + 6 and name[-6:].isdigit()
+        )
+
+    async def ensure(self, start: date, end: date) -> List[str]:
+        """Create the missing partitions for every month from start to end."""
+        existing = set(await self.attached())
+        created = []
+        month = month_start(start)
+        while month <= end:
+            if month not in existing:
+                name = self.partition_name(month)
+                # One short transaction each: creating a partition briefly
+                # locks the parent, so never queue behind long queries.
+                async with self.engine.begin() as conn:
+                    await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+                    await conn.execute(
+                        text(
+                            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{self.table}" '
+                            f"FOR VALUES FROM ('{month}') TO ('{month_start(month, 1)}')"
+                        )
+                    )
+                created.append(name)
+            month = month_start(month, 1)
+        return created
+
+    async def detach_expired(self, today: date) -> List[str]:
+        """Detach the partitions of months past the retention period."""
+        if self.retention_months <= 0:
+            return []
+        cutoff = month_start(today, -self.retention_months)
+        detached = []
+        async with self.engine.connect() as conn:
+            # DETACH ... CONCURRENTLY cannot run inside a transaction block
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for month in await self.attached():
+                if month >= cutoff:
+                    break
+                name = self.partition_name(month)
+                await conn.execute(
+                    text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}" CONCURRENTLY')
+                )
+                detached.append(name)
+        return detached
+
+    async def maintain(self, today: Optional[date] = None) -> None:
+        """Create upcoming partitions and detach expired ones."""
+        if not self.enabled:
+            return
+        today = today or date.today()
+        created = await self.ensure(today, month_start(today, self.months_ahead))
+        detached = await self.detach_expired(today)
+        metrics.increment(f"partitions.{self.table}.created", len(created))
+        metrics.increment(f"partitions.{self.table}.detached", len(detached))
+        if created:
+            logger.info(f"Created {self.table} partitions: {', '.join(created)}")
+        if detached:
+            logger.info(f"Detached {self.table} partitions for archiving: {', '.join(detached)}")
+
+    async def _maintain_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # One worker maintains per interval; the others skip.
+                if await async_redis_client.client.set(
+                    f"{self.table}_partitions_lock", 1, nx=True, ex=self.interval
+                ):
+                    await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.table} partition maintenance failed: {str(e)}")
+
+    async def start(self) -> None:
+        """Make sure this month's partitions exist, then maintain periodically."""
+        if not self.enabled:
+            return
+        try:
+            await self.maintain()
+        except Exception as e:
+            # Usually another worker creating the same partition concurrently
+            logger.warning(f"{self.table} partition maintenance failed: {str(e)}")
+        if self._maintainer is None and self.interval > 0:
+            self._maintainer = asyncio.create_task(self._maintain_periodically())
+
+    async def stop(self) -> None:
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+            try:
+                await self._maintainer
+            except asyncio.CancelledError:
+                pass
+            self._maintainer = None
+
+
+attendance_partitions = MonthlyPartitions("attendance")
@@ -0,0 +1,115 @@
+import time
+from typing import Iterable, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.config.logging import logger
+from app.core.local_cache import LocalCache
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+from app.schemas.user import UserPrincipal
+
+
+class PrincipalCache(LocalCache[UserPrincipal]):
+    """Authenticated users by id, in a per-worker LRU backed by Redis.
+
+    Lookups try this worker's LRU, then Redis, and only then the database;
+    the ``principal_cache.misses`` counter is the number of auth lookups that
+    reached the database. Entries expire PRINCIPAL_CACHE_TTL_SECONDS after
+    they were read from the database, in Redis and locally alike. Writes to a
+    user call invalidate, which deletes the Redis entry and broadcasts the id
+    on a pub/sub channel so every worker drops its copy; the LRU is cleared
+    whenever the subscription is (re)established (see LocalCache).
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.PRINCIPAL_CACHE_MAX_SIZE,
+        ttl_seconds: int = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        channel: str = settings.PRINCIPAL_CACHE_CHANNEL,
+    ):
+        super().__init__(
+            "principal_cache", settings.PRINCIPAL_CACHE_ENABLED, max_size, ttl_seconds, channel
+        )
+
+    @staticmethod
+    def redis_key(user_id: str) -> str:
+        return f"principal:{user_id}"
+
+    async def get(self, user_id: UUID) -> Optional[UserPrincipal]:
+        """Return the cached principal of a user, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = str(user_id)
+        principal = self._lookup(key)
+        if principal is not None:
+            metrics.increment("principal_cache.local_hits")
+            return principal
+        try:
+            pipeline = async_redis_client.client.pipeline(transaction=False)
+            pipeline.get(self.redis_key(key))
+            pipeline.pttl(self.redis_key(key))
+            cached, ttl_ms = await pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Principal cache lookup failed: {str(e)}")
+            cached = None
+        if cached and ttl_ms > 0:
+            principal = UserPrincipal.model_validate_json(cached)
+            self._remember(key, principal, time.time() + ttl_ms / 1000)
+            metrics.increment("principal_cache.redis_hits")
+            return principal
+        metrics.increment("principal_cache.misses")
+        return None
+
+    async def put(self, principal: UserPrincipal) -> None:
+        """Cache a principal just read from the database."""
+        if not self.enabled:
+            return
+        self._remember(str(principal.id), principal, time.time() + self.ttl_seconds)
+        try:
+            await async_redis_client.client.set(
+                self.redis_key(str(principal.id)), principal.model_dump_json(), ex=self.ttl_seconds
+            )
+        except RedisError as e:
+            logger.warning(f"Principal cache store failed: {str(e)}")
+
+    async def invalidate(self, user_ids: Iterable[UUID]) -> None:
+        """Drop users from Redis and from the LRU of every worker."""
+        keys = [str(user_id) for user_id in user_ids]
+        if not self.enabled or not keys:
+            return
+        for key in keys:
+            self.evict(key)
+        try:
+            pipeline = async_redis_client.client.pipeline(transaction=False)
+            pipeline.delete(*(self.redis_key(key) for key in keys))
+            for key in keys:
+                pipeline.publish(self.channel, key)
+            await pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Principal cache invalidation failed: {str(e)}")
+        metrics.increment("principal_cache.invalidations", len(keys))
+
+    def handle_message(self, message: str) -> None:
+        """Drop the user whose id was broadcast by invalidate."""
+        self.evict(message)
+
+    def stats(self) -> dict:
+        counters = metrics.snapshot()["counters"]
+        local = counters.get("principal_cache.local_hits", 0)
+        remote = counters.get("principal_cache.redis_hits", 0)
+        misses = counters.get("principal_cache.misses", 0)
+        lookups = local + remote + misses
+        return {
+            "size": len(self._entries),
+            "local_hits": local,
+            "redis_hits": remote,
+            "misses": misses,
+            "db_hit_rate": misses / lookups if lookups else None,
+        }
+
+
+# Create a singleton instance
+principal_cache = PrincipalCache()
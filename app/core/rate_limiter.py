@@ -1,47 +1,250 @@
-from datetime import datetime
-from typing import Tuple
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
 
-from app.core.redis import redis_client
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
 from app.config import settings
 
+# Generic cell rate algorithm (GCRA). The key holds the theoretical arrival
+# time (TAT) of the next request; each request of weight `cost` pushes it
+# forward by cost * period / limit, and a request is allowed while the TAT
+# stays within one period of now. Uses the Redis server clock so every
+# worker agrees on "now".
+# KEYS[1] = rate_limit:{key}
+# ARGV[1] = limit, ARGV[2] = period (seconds), ARGV[3] = cost (0 = peek,
+# negative = refund unused quota)
+# Returns {allowed, remaining, retry_after, reset_after}; times are strings
+# because Redis truncates Lua numbers to integers.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local interval = period / limit
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + cost * interval
+local diff = now - (new_tat - period)
+if diff < 0 then
+    local remaining = math.floor((now - (tat - period)) / interval)
+    return {0, remaining, tostring(-diff), tostring(tat - now)}
+end
+if new_tat <= now then
+    redis.call('DEL', KEYS[1])
+elseif cost ~= 0 then
+    redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+end
+return {1, math.floor(diff / interval), '0', tostring(new_tat - now)}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # Seconds until a request of the same cost is allowed
+    reset_after: float  # Seconds until the full limit is available again
+
+
 class RateLimiter:
+    """GCRA rate limiter evaluated in a single Redis script call.
+
+    Requests are spread evenly over the window instead of being counted per
+    fixed window, so a client cannot burst twice the limit across a window
+    boundary. If Redis is unavailable requests are allowed.
+    """
+
     def __init__(self):
         self.max_requests = settings.RATE_LIMIT_REQUESTS
         self.window_seconds = settings.RATE_LIMIT_WINDOW
 
-    def is_rate_limited(self, key: str) -> Tuple[bool, int]:
+    async def hit(
+        self,
+        key: str,
+        limit: Optional[int] = None,
+        period: Optional[int] = None,
+        cost: int = 1,
+    ) -> RateLimitResult:
+        """Consume `cost` requests from a key's budget (cost=0 only reads it)."""
+        limit = limit or self.max_requests
+        period = period or self.window_seconds
+        reply = await async_redis_client.run_script(
+            GCRA_SCRIPT, keys=[f"rate_limit:{key}"], args=[limit, period, cost]
+        )
+        if reply is None:
+            return RateLimitResult(True, limit, 0.0, 0.0)
+        allowed, remaining, retry_after, reset_after = reply
+        return RateLimitResult(
+            bool(allowed), max(0, int(remaining)), float(retry_after), float(reset_after)
+        )
+
+    async def is_rate_limited(
+        self, key: str, limit: Optional[int] = None, period: Optional[int] = None, cost: int = 1
+    ) -> Tuple[bool, int]:
         """
         Check if a key is rate limited.
         Returns (is_limited, remaining_attempts)
         """
-        current = datetime.utcnow().timestamp()
-        window_key = f"rate_limit:{key}:{int(current / self.window_seconds)}"
-        
-        # Get current count
-        count = redis_client.increment(window_key, 1) or 1
-        
-        # Set expiration if this is the first request
-        if count == 1:
-            redis_client.expire(window_key, self.window_seconds)
-        
-        # Calculate remaining attempts
-        remaining = max(0, self.max_requests - count)
-        
-        return count > self.max_requests, remaining
-
-    def get_remaining_attempts(self, key: str) -> int:
+        result = await self.hit(key, limit, period, cost)
+        return not result.allowed, result.remaining
+
+    async def get_remaining_attempts(
+        self, key: str, limit: Optional[int] = None, period: Optional[int] = None
+    ) -> int:
         """Get remaining attempts for a key."""
-        current = datetime.utcnow().timestamp()
-        window_key = f"rate_limit:{key}:{int(current / self.window_seconds)}"
-        
-        count = redis_client.get(window_key) or 0
-        return max(0, self.max_requests - int(count))
+        result = await self.hit(key, limit, period, cost=0)
+        return result.remaining
 
-    def reset_attempts(self, key: str) -> None:
+    async def reset_attempts(self, key: str) -> None:
         """Reset rate limit attempts for a key."""
-        current = datetime.utcnow().timestamp()
-        window_key = f"rate_limit:{key}:{int(current / self.window_seconds)}"
-        redis_client.delete(window_key)
+        await async_redis_client.delete(f"rate_limit:{key}")
+
+    @staticmethod
+    def retry_after_header(result: RateLimitResult) -> str:
+        """Whole seconds for a Retry-After header."""
+        return str(max(1, math.ceil(result.retry_after)))
+
+class _Lease:
+    __slots__ = ("tokens", "remaining", "expires_at", "blocked_until", "limit", "period")
+
+    def __init__(self, limit: Optional[int], period: Optional[int]):
+        self.tokens = 0
+        self.remaining = 0
+        self.expires_at = 0.0
+        self.blocked_until = 0.0
+        self.limit = limit
+        self.period = period
+
+
+class LeasedRateLimiter:
+    """Two-tier limiter: per-worker buckets backed by quota leased from Redis.
+
+    A worker debits RATE_LIMIT_LEASE_SIZE requests from the shared GCRA in
+    one call and serves them from memory, so Redis is touched about once per
+    lease instead of once per request. Leased quota is debited before it is
+    used, so a key never admits more than its limit across all workers.
+    The trade-off is early rejection: with W workers, up to
+    W * (lease_size - 1) requests of a key's quota can sit unused in other
+    workers' leases. Unused tokens are refunded to Redis by a background
+    task once their lease is older than RATE_LIMIT_LEASE_TTL, which bounds
+    how long that quota stays stranded. When a full lease is refused the
+    worker falls back to single requests, and a refusal is cached locally
+    until its retry-after, so a blocked client costs no Redis calls.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        lease_size: int = settings.RATE_LIMIT_LEASE_SIZE,
+        lease_ttl: int = settings.RATE_LIMIT_LEASE_TTL,
+        max_keys: int = settings.RATE_LIMIT_LEASE_MAX_KEYS,
+    ):
+        self.limiter = limiter or rate_limiter
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.max_keys = max_keys
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._refunds: Dict[Tuple[str, Optional[int], Optional[int]], int] = {}
+        self._reconciler: Optional[asyncio.Task] = None
+        metrics.register_gauge("rate_limiter.leases", lambda: len(self._leases))
+
+    def _lease(self, key: str, limit: Optional[int], period: Optional[int]) -> _Lease:
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease(limit, period)
+            while len(self._leases) > self.max_keys:
+                old_key, old = self._leases.popitem(last=False)
+                self._release(old_key, old)
+        self._leases.move_to_end(key)
+        return lease
+
+    def _release(self, key: str, lease: _Lease) -> None:
+        """Queue a lease's unused tokens for refund."""
+        if lease.tokens > 0:
+            refund_key = (key, lease.limit, lease.period)
+            self._refunds[refund_key] = self._refunds.get(refund_key, 0) + lease.tokens
+            lease.tokens = 0
+
+    async def hit(
+        self, key: str, limit: Optional[int] = None, period: Optional[int] = None
+    ) -> RateLimitResult:
+        """Consume one request from a key's budget."""
+        if self.lease_size <= 1:
+            return await self.limiter.hit(key, limit, period)
+
+        now = time.monotonic()
+        lease = self._lease(key, limit, period)
+        if lease.blocked_until > now:
+            metrics.increment("rate_limiter.local_rejections")
+            return RateLimitResult(False, 0, lease.blocked_until - now, lease.blocked_until - now)
+        if lease.tokens > 0 and lease.expires_at > now:
+            lease.tokens -= 1
+            metrics.increment("rate_limiter.local_hits")
+            return RateLimitResult(True, lease.remaining + lease.tokens, 0.0, 0.0)
+        self._release(key, lease)
+
+        size = min(self.lease_size, limit or self.limiter.max_requests)
+        result = await self.limiter.hit(key, limit, period, cost=size)
+        if not result.allowed:
+            size = 1
+            result = await self.limiter.hit(key, limit, period)
+        if result.allowed:
+            lease.tokens = size - 1
+            lease.remaining = result.remaining
+            lease.expires_at = now + self.lease_ttl
+            return result._replace(remaining=result.remaining + lease.tokens)
+        lease.blocked_until = now + result.retry_after
+        return result
+
+    async def reconcile(self) -> None:
+        """Refund the unused tokens of expired leases to Redis."""
+        now = time.monotonic()
+        for key, lease in list(self._leases.items()):
+            if lease.expires_at <= now and lease.blocked_until <= now:
+                self._release(key, lease)
+                del self._leases[key]
+        refunds, self._refunds = self._refunds, {}
+        for (key, limit, period), tokens in refunds.items():
+            await self.limiter.hit(key, limit, period, cost=-tokens)
+        metrics.increment("rate_limiter.refunds", len(refunds))
+
+    async def _reconcile_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl)
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Rate limit lease reconciliation failed: {str(e)}")
+
+    async def start(self) -> None:
+        """Start refunding expired leases in the background."""
+        if self._reconciler is None and self.lease_size > 1:
+            self._reconciler = asyncio.create_task(self._reconcile_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background task and return every unused token."""
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            try:
+                await self._reconciler
+            except asyncio.CancelledError:
+                pass
+            self._reconciler = None
+        for key, lease in self._leases.items():
+            self._release(key, lease)
+        self._leases.clear()
+        await self.reconcile()
+
 
-# Create a singleton instance
-rate_limiter = RateLimiter() 
\ No newline at end of file
+# Create singleton instances
+rate_limiter = RateLimiter()
+leased_rate_limiter = LeasedRateLimiter()
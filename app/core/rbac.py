@@ -4,7 +4,7 @@ from pathlib import Path
 
 from fastapi import HTTPException, status, Depends
 from app.dependencies.auth import get_current_user
-from app.models.user import User
+from app.schemas.user import UserPrincipal
 from app.config.logging import logger
 
 
@@ -122,7 +122,7 @@ class PermissionChecker:
         self.required_permission = required_permission
         logger.debug(f"Initialized PermissionChecker for permission: {required_permission}")
 
-    async def __call__(self, user: User) -> bool:
+    async def __call__(self, user: UserPrincipal) -> bool:
         """Check if the user's role has the required permission."""
         logger.debug(f"Starting permission check for user: {user.email} with role: {user.role}")
         try:
@@ -142,7 +142,7 @@ class PermissionChecker:
 
 def require_permission(permission: str):
     """Decorator to require a specific permission for an endpoint."""
-    async def permission_dependency(user: User = Depends(get_current_user)) -> bool:
+    async def permission_dependency(user: UserPrincipal = Depends(get_current_user)) -> bool:
         logger.debug(f"Checking permission '{permission}' for user: {user.email}")
         if not rbac_manager.has_permission(user.role, permission):
             logger.warning(f"Permission '{permission}' denied for role '{user.role}'")
@@ -1,6 +1,12 @@
-from typing import Any, Optional, List
+from typing import Any, Dict, Iterable, Optional, List
 import json
 from redis import Redis
+from redis.asyncio import BlockingConnectionPool as AsyncBlockingConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import NoBackoff
+from redis.commands.core import AsyncScript
 from redis.exceptions import RedisError
 
 from app.config import settings
@@ -102,3 +108,187 @@ class RedisClient:
 
 # Create a singleton instance
 redis_client = RedisClient()
+
+
+class AsyncRedisClient:
+    """Non-blocking counterpart of RedisClient built on redis.asyncio.
+
+    All connections come from one explicitly sized BlockingConnectionPool, so
+    a burst of requests waits for a free connection instead of opening new
+    sockets without bound.
+    """
+
+    def __init__(self):
+        self._pool: Optional[AsyncBlockingConnectionPool] = None
+        self._client: Optional[AsyncRedis] = None
+        self._subscriber: Optional[AsyncRedis] = None
+        self._scripts: Dict[str, AsyncScript] = {}
+
+    @property
+    def pool(self) -> AsyncBlockingConnectionPool:
+        """Get the shared connection pool."""
+        if self._pool is None:
+            self._pool = AsyncBlockingConnectionPool.from_url(
+                settings.redis_url,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry_on_timeout=True,
+                decode_responses=True,
+            )
+        return self._pool
+
+    @property
+    def client(self) -> AsyncRedis:
+        """Get async Redis client instance."""
+        if self._client is None:
+            self._client = AsyncRedis(connection_pool=self.pool)
+        return self._client
+
+    @property
+    def subscriber(self) -> AsyncRedis:
+        """Client for pub/sub subscriptions, on connections of its own.
+
+        A subscription sits idle until something is published, so its reads
+        have no socket timeout, and it never reconnects on its own: a lost
+        connection raises, so the subscriber knows it may have missed
+        messages. Pubsub health checks and TCP keepalive notice dead peers.
+        """
+        if self._subscriber is None:
+            self._subscriber = AsyncRedis.from_url(
+                settings.redis_url,
+                socket_timeout=None,
+                socket_keepalive=True,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry=AsyncRetry(NoBackoff(), 0),
+                decode_responses=True,
+            )
+        return self._subscriber
+
+    async def ping(self) -> bool:
+        """Check that Redis is reachable."""
+        try:
+            return bool(await self.client.ping())
+        except RedisError:
+            return False
+
+    async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        """Set a key-value pair in Redis."""
+        try:
+            if not isinstance(value, (str, int, float)):
+                value = json.dumps(value)
+            return await self.client.set(key, value, ex=expire)
+        except RedisError:
+            return False
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Get a value from Redis."""
+        try:
+            value = await self.client.get(key)
+            if value is None:
+                return default
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return value
+        except RedisError:
+            return default
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key from Redis."""
+        try:
+            return bool(await self.client.delete(key))
+        except RedisError:
+            return False
+
+    async def exists(self, *keys: str) -> bool:
+        """Check if every given key exists in Redis (one round trip)."""
+        try:
+            return await self.client.exists(*keys) == len(keys)
+        except RedisError:
+            return False
+
+    async def increment(self, key: str, amount: int = 1) -> Optional[int]:
+        """Increment a counter in Redis."""
+        try:
+            return await self.client.incr(key, amount)
+        except RedisError:
+            return None
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """Set expiration time for a key."""
+        try:
+            return bool(await self.client.expire(key, seconds))
+        except RedisError:
+            return False
+
+    async def sadd(self, key: str, *values: Any) -> bool:
+        """Add one or more members to a set."""
+        try:
+            return bool(await self.client.sadd(key, *values))
+        except RedisError:
+            return False
+
+    async def srem(self, key: str, *values: Any) -> bool:
+        """Remove one or more members from a set."""
+        try:
+            return bool(await self.client.srem(key, *values))
+        except RedisError:
+            return False
+
+    async def smembers(self, key: str) -> List[str]:
+        """Get all members of a set."""
+        try:
+            return list(await self.client.smembers(key))
+        except RedisError:
+            return []
+
+    def pipeline(self, transaction: bool = True) -> AsyncPipeline:
+        """Create a pipeline that sends all queued commands in one round trip."""
+        return self.client.pipeline(transaction=transaction)
+
+    async def execute_pipeline(self, pipeline: AsyncPipeline) -> Optional[List[Any]]:
+        """Execute a pipeline, returning None if Redis fails."""
+        try:
+            return await pipeline.execute()
+        except RedisError:
+            return None
+
+    async def run_script(
+        self,
+        source: str,
+        keys: Iterable[str] = (),
+        args: Iterable[Any] = (),
+        default: Any = None,
+    ) -> Any:
+        """Run a Lua script server-side in a single round trip.
+
+        Scripts are cached by source and invoked with EVALSHA, falling back to
+        loading the script the first time a server has not seen it.
+        """
+        script = self._scripts.get(source)
+        if script is None:
+            script = self.client.register_script(source)
+            self._scripts[source] = script
+        try:
+            return await script(keys=list(keys), args=list(args), client=self.client)
+        except RedisError:
+            return default
+
+    async def close(self) -> None:
+        """Close the client and disconnect every pooled connection."""
+        self._scripts.clear()
+        if self._subscriber is not None:
+            await self._subscriber.aclose()
+            self._subscriber = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._pool is not None:
+            await self._pool.disconnect()
+            self._pool = None
+
+
+# Create a singleton instance
+async_redis_client = AsyncRedisClient()
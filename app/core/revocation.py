@@ -0,0 +1,142 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+
+# KEYS[1] = revoked token set
+# ARGV[1] = retention seconds, ARGV[2] = channel, ARGV[3] = message (both
+# empty to skip publishing), ARGV[4..] = members
+REVOKE_SCRIPT = """
+local now = redis.call('TIME')
+local score = tonumber(now[1]) + tonumber(now[2]) / 1000000
+for i = 4, #ARGV do
+    redis.call('ZADD', KEYS[1], score, ARGV[i])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', score - tonumber(ARGV[1]))
+if ARGV[2] ~= '' then
+    redis.call('PUBLISH', ARGV[2], ARGV[3])
+end
+return tostring(score)
+"""
+
+
+class RevocationList:
+    """Revoked access tokens for stateless mode, replicated into every worker.
+
+    Redis keeps one sorted set of ``jti:{jti}`` and ``user:{user_id}`` members
+    scored by the Redis server time of revocation. A ``user:`` member revokes
+    every token of that user issued at or before that time (``iat`` has
+    one-second resolution, so a token issued in that same second is revoked
+    too). Entries older than
+    the access token lifetime can only match expired tokens, so the set stays
+    bounded by the revocations of one token lifetime.
+
+    Workers copy the set into memory and poll only the entries added since
+    their last sync, so a revocation made on another worker takes effect
+    within REVOCATION_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        key: str = "revoked_tokens",
+        sync_interval: int = settings.REVOCATION_SYNC_INTERVAL,
+    ):
+        self.key = key
+        self.sync_interval = sync_interval
+        # Long enough to outlive every access token issued before a revocation
+        self.retention_seconds = (
+            settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + settings.JWT_LEEWAY_SECONDS
+        )
+        self._jtis: Dict[str, float] = {}
+        self._users: Dict[str, float] = {}
+        # Highest score pulled by sync(); local revocations do not advance it
+        # so entries written concurrently by other workers are not skipped.
+        self._synced_until = 0.0
+        self._syncer: Optional[asyncio.Task] = None
+        metrics.register_gauge("revocation_list.size", lambda: len(self._jtis) + len(self._users))
+
+    def _apply(self, member: str, revoked_at: float) -> None:
+        kind, _, value = member.partition(":")
+        if kind == "jti":
+            self._jtis[value] = revoked_at
+        elif kind == "user":
+            self._users[value] = max(revoked_at, self._users.get(value, 0.0))
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for entries in (self._jtis, self._users):
+            for key in [k for k, revoked_at in entries.items() if revoked_at < cutoff]:
+                del entries[key]
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Check a decoded access token against the local copy."""
+        jti = payload.get("jti")
+        if jti and jti in self._jtis:
+            return True
+        revoked_at = self._users.get(payload.get("sub"))
+        return revoked_at is not None and payload.get("iat", 0) <= revoked_at
+
+    async def _revoke(self, members: List[str], channel: str = "", message: str = "") -> bool:
+        if not members:
+            return False
+        score = await async_redis_client.run_script(
+            REVOKE_SCRIPT,
+            keys=[self.key],
+            args=[self.retention_seconds, channel, message, *members],
+        )
+        if score is None:
+            return False
+        for member in members:
+            self._apply(member, float(score))
+        return True
+
+    async def revoke_token(self, jti: str, channel: str, message: str) -> bool:
+        """Revoke a single access token by jti."""
+        return await self._revoke([f"jti:{jti}"], channel, message)
+
+    async def revoke_users(self, user_ids: Iterable[str]) -> bool:
+        """Revoke every access token issued so far to each of the users."""
+        return await self._revoke([f"user:{user_id}" for user_id in user_ids])
+
+    async def sync(self) -> None:
+        """Pull revocations added since the last sync."""
+        entries = await async_redis_client.client.zrangebyscore(
+            self.key, self._synced_until, "+inf", withscores=True
+        )
+        for member, revoked_at in entries:
+            self._apply(member, revoked_at)
+            self._synced_until = max(self._synced_until, revoked_at)
+        self._prune()
+        metrics.increment("revocation_list.syncs")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Revocation list sync failed: {str(e)}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def start(self) -> None:
+        """Load the revocation set and keep it in sync."""
+        if self._syncer is None:
+            self._syncer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._syncer is not None:
+            self._syncer.cancel()
+            try:
+                await self._syncer
+            except asyncio.CancelledError:
+                pass
+            self._syncer = None
+
+
+# Create a singleton instance
+revocation_list = RevocationList()
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Optional
+
+from app.config import settings
+from app.config.database import async_session_factory
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+from app.repositories.attendance import AsyncAttendanceRepository
+
+# Held while one worker fills empty rollups, so the others do not repeat it
+BACKFILL_LOCK_SECONDS = 3600
+
+
+class AttendanceRollupReconciler:
+    """Periodically recount recent attendance rollups from attendance.
+
+    The rollups are kept in step by create_attendance and
+    update_attendance_status, but writes that bypass them (bulk loads,
+    deletes, manual fixes) make them drift. Each run recounts the last
+    ``days`` days and rewrites only the rows that differ, so it is cheap
+    when nothing drifted. At startup the rollups are filled from all of
+    attendance if they are empty, as they are after init_db creates them.
+    """
+
+    def __init__(
+        self,
+        days: int = settings.ATTENDANCE_ROLLUP_RECONCILE_DAYS,
+        interval: int = settings.ATTENDANCE_ROLLUP_RECONCILE_INTERVAL,
+    ):
+        self.days = days
+        self.interval = interval
+        self._reconciler: Optional[asyncio.Task] = None
+
+    async def reconcile(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> int:
+        """Repair the rollups from start_date to end_date; return the rows repaired.
+
+        Defaults to the last ``days`` days up to today.
+        """
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=self.days)
+        async with async_session_factory() as session:
+            repaired = await AsyncAttendanceRepository(session).reconcile_rollups(
+                start_date, end_date
+            )
+        metrics.increment("attendance_rollups.repaired", repaired)
+        if repaired:
+            logger.warning(
+                f"Repaired {repaired} attendance rollups between {start_date} and {end_date}"
+            )
+        return repaired
+
+    async def backfill(self) -> int:
+        """Recount every day of attendance if there are no rollups yet."""
+        async with async_session_factory() as session:
+            repository = AsyncAttendanceRepository(session)
+            if await repository.has_rollups():
+                return 0
+            start_date, end_date = await repository.get_attendance_dates()
+        if start_date is None:
+            return 0
+        logger.info(f"Filling attendance rollups from {start_date} to {end_date}")
+        return await self.reconcile(start_date, end_date)
+
+    async def _exclusively(
+        self, run: Callable[[], Awaitable[int]], lock: str, lock_seconds: int
+    ) -> None:
+        try:
+            # One worker runs it; the others skip.
+            if await async_redis_client.client.set(lock, 1, nx=True, ex=lock_seconds):
+                await run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Attendance rollup reconciliation failed: {str(e)}")
+
+    async def _reconcile_periodically(self) -> None:
+        await self._exclusively(
+            self.backfill, "attendance_rollups_backfill_lock", BACKFILL_LOCK_SECONDS
+        )
+        while self.interval > 0:
+            await asyncio.sleep(self.interval)
+            await self._exclusively(self.reconcile, "attendance_rollups_lock", self.interval)
+
+    async def start(self) -> None:
+        if self._reconciler is None:
+            self._reconciler = asyncio.create_task(self._reconcile_periodically())
+
+    async def stop(self) -> None:
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            try:
+                await self._reconciler
+            except asyncio.CancelledError:
+                pass
+            self._reconciler = None
+
+
+attendance_rollups = AttendanceRollupReconciler()
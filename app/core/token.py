@@ -1,119 +1,538 @@
+import asyncio
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from uuid import UUID
+from typing import Optional, Callable, Dict, Any, List, Sequence
+from uuid import UUID, uuid4
 
-from app.core.redis import redis_client
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.redis import async_redis_client
+from app.core.revocation import revocation_list
+from app.core.token_cache import token_cache
 from app.config import settings
-from app.utils.auth import create_access_token, create_refresh_token, verify_token
+from app.utils.auth import create_access_token, create_refresh_token, decode_token
+
+# Session records are small hashes keyed by jti:
+#   session:{sid}        one per login (the refresh token's jti); it also
+#                        lists its live access records as access:{jti} fields
+#   access:{jti}         one per stateful access token, tied to its session
+#   user_sessions:{uid}  sorted set of the user's session ids scored by
+#                        expiry time, pruned lazily on every write
+# Tokens issued before this format have no "typ" claim and live under the
+# legacy full-JWT keys (access_token:{jwt}, refresh_token:{jwt},
+# user_tokens:{uid}); those are still honoured until they expire.
+#
+# Scripts that revoke or evict sessions derive the session and access keys
+# from the indexes they read, so every key of a user must live on one Redis
+# node: Redis Cluster is not supported.
+
+# Shared Lua helpers for the per-user session index. Indexes written as plain
+# sets by older releases are converted in place the first time they are used.
+SESSION_INDEX_LUA = """
+local function upgrade_index(key, score)
+    if redis.call('TYPE', key).ok == 'set' then
+        local members = redis.call('SMEMBERS', key)
+        redis.call('DEL', key)
+        for _, sid in ipairs(members) do
+            redis.call('ZADD', key, score, sid)
+        end
+    end
+end
+local function session_keys(sid)
+    local keys = {'session:' .. sid}
+    for _, field in ipairs(redis.call('HKEYS', 'session:' .. sid)) do
+        if string.sub(field, 1, 7) == 'access:' then
+            keys[#keys + 1] = field
+        end
+    end
+    return keys
+end
+local function index_members(key)
+    local kind = redis.call('TYPE', key).ok
+    if kind == 'zset' then
+        return redis.call('ZRANGE', key, 0, -1)
+    elseif kind == 'set' then
+        return redis.call('SMEMBERS', key)
+    end
+    return {}
+end
+"""
+
+# KEYS[1] = session:{sid}, KEYS[2] = user_sessions:{uid}, KEYS[3] = access:{jti}
+# ARGV[1] = user id, ARGV[2] = sid, ARGV[3] = created_at, ARGV[4] = session
+# expires_at, ARGV[5] = session ttl, ARGV[6] = now (epoch seconds),
+# ARGV[7] = access expires_at, ARGV[8] = access ttl, ARGV[9] = 1 to write the
+# access record, ARGV[10] = max sessions per user (0 = unlimited),
+# ARGV[11] = revocation channel, ARGV[12] = session revocation message prefix
+# Returns the ids of sessions evicted to stay within the cap.
+CREATE_SESSION_SCRIPT = SESSION_INDEX_LUA + """
+local now = tonumber(ARGV[6])
+local session_expiry = now + tonumber(ARGV[5])
+upgrade_index(KEYS[2], session_expiry)
+redis.call('HSET', KEYS[1], 'user_id', ARGV[1], 'created_at', ARGV[3], 'expires_at', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+redis.call('ZADD', KEYS[2], session_expiry, ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+if ARGV[9] == '1' then
+    redis.call('HSET', KEYS[3], 'user_id', ARGV[1], 'sid', ARGV[2],
+        'created_at', ARGV[3], 'expires_at', ARGV[7])
+    redis.call('EXPIRE', KEYS[3], ARGV[8])
+    redis.call('HSET', KEYS[1], KEYS[3], now + tonumber(ARGV[8]))
+end
+local evicted = {}
+local cap = tonumber(ARGV[10])
+if cap > 0 then
+    local excess = redis.call('ZCARD', KEYS[2]) - cap
+    if excess > 0 then
+        local oldest = redis.call('ZPOPMIN', KEYS[2], excess)
+        for i = 1, #oldest, 2 do
+            redis.call('UNLINK', unpack(session_keys(oldest[i])))
+            redis.call('PUBLISH', ARGV[11], ARGV[12] .. oldest[i])
+            evicted[#evicted + 1] = oldest[i]
+        end
+    end
+end
+return evicted
+"""
+
+# KEYS[1] = user_sessions:{uid}
+# ARGV[1] = now (epoch seconds), ARGV[2] = score for upgraded members
+# Returns sid, created_at, expires_at triples of the user's live sessions.
+LIST_SESSIONS_SCRIPT = SESSION_INDEX_LUA + """
+upgrade_index(KEYS[1], ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local sessions = {}
+for _, sid in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    local record = redis.call('HMGET', 'session:' .. sid, 'created_at', 'expires_at')
+    if record[1] then
+        sessions[#sessions + 1] = sid
+        sessions[#sessions + 1] = record[1]
+        sessions[#sessions + 1] = record[2] or ''
+    else
+        redis.call('ZREM', KEYS[1], sid)
+    end
+end
+return sessions
+"""
+
+# KEYS[1] = key proving the refresh token is live (session:{sid} or legacy
+# refresh_token:{jwt}), KEYS[2] = session:{sid}, KEYS[3] = access:{jti},
+# KEYS[4] = user_sessions:{uid}
+# ARGV[1] = user id, ARGV[2] = sid, ARGV[3] = created_at, ARGV[4] = expires_at,
+# ARGV[5] = access ttl, ARGV[6] = 1 to write the access record,
+# ARGV[7] = now (epoch seconds), ARGV[8] = session ttl
+REFRESH_ACCESS_TOKEN_SCRIPT = SESSION_INDEX_LUA + """
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl == -2 then
+    return 0
+end
+if KEYS[1] ~= KEYS[2] then
+    -- Legacy refresh token: mirror it as a compact session record so the
+    -- access tokens it issues validate like any other.
+    redis.call('HSET', KEYS[2], 'user_id', ARGV[1], 'created_at', ARGV[3])
+    local expiry = tonumber(ARGV[7]) + tonumber(ARGV[8])
+    if ttl > 0 then
+        redis.call('PEXPIRE', KEYS[2], ttl)
+        expiry = tonumber(ARGV[7]) + ttl / 1000
+    end
+    upgrade_index(KEYS[4], expiry)
+    redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', ARGV[7])
+    redis.call('ZADD', KEYS[4], expiry, ARGV[2])
+end
+if ARGV[6] == '1' then
+    redis.call('HSET', KEYS[3], 'user_id', ARGV[1], 'sid', ARGV[2],
+        'created_at', ARGV[3], 'expires_at', ARGV[4])
+    redis.call('EXPIRE', KEYS[3], ARGV[5])
+    -- Forget access records that have expired on their own
+    local fields = redis.call('HGETALL', KEYS[2])
+    for i = 1, #fields, 2 do
+        if string.sub(fields[i], 1, 7) == 'access:' and tonumber(fields[i + 1]) <= tonumber(ARGV[7]) then
+            redis.call('HDEL', KEYS[2], fields[i])
+        end
+    end
+    redis.call('HSET', KEYS[2], KEYS[3], tonumber(ARGV[7]) + tonumber(ARGV[5]))
+end
+return 1
+"""
+
+# KEYS[1] = legacy {token_type}_token:{token}, KEYS[2] = mirrored session:{sid}
+# ARGV[1] = token, ARGV[2] = revocation channel, ARGV[3] = revocation message
+INVALIDATE_LEGACY_TOKEN_SCRIPT = """
+local data = redis.call('GET', KEYS[1])
+if not data then
+    return 0
+end
+local ok, decoded = pcall(cjson.decode, data)
+if ok and type(decoded) == 'table' and decoded['user_id'] then
+    redis.call('SREM', 'user_tokens:' .. decoded['user_id'], ARGV[1])
+end
+redis.call('DEL', KEYS[2])
+redis.call('PUBLISH', ARGV[2], ARGV[3])
+return redis.call('DEL', KEYS[1])
+"""
+
+# KEYS = user_sessions:{uid}, user_tokens:{uid} pairs, one pair per user
+# ARGV[1] = revocation channel, ARGV[1 + n] = revocation message for user n
+REVOKE_USER_SESSIONS_SCRIPT = SESSION_INDEX_LUA + """
+local removed = 0
+local batch = {}
+local function flush()
+    if #batch > 0 then
+        redis.call('UNLINK', unpack(batch))
+        batch = {}
+    end
+end
+local function add(key)
+    batch[#batch + 1] = key
+    if #batch >= 1000 then
+        flush()
+    end
+end
+for i = 1, #KEYS, 2 do
+    local sessions = index_members(KEYS[i])
+    for _, sid in ipairs(sessions) do
+        for _, key in ipairs(session_keys(sid)) do
+            add(key)
+        end
+    end
+    local tokens = redis.call('SMEMBERS', KEYS[i + 1])
+    for _, token in ipairs(tokens) do
+        add('access_token:' .. token)
+        add('refresh_token:' .. token)
+    end
+    if #sessions + #tokens > 0 then
+        add(KEYS[i])
+        add(KEYS[i + 1])
+        removed = removed + #sessions + #tokens
+        redis.call('PUBLISH', ARGV[1], ARGV[(i + 1) / 2 + 1])
+    end
+end
+flush()
+return removed
+"""
+
+
+def _legacy_session_id(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
 
 class TokenManager:
+    """Issue, validate and revoke Redis-backed sessions.
+
+    Every write path (issue, refresh, revoke) is a single round trip: each is
+    a Lua script (or a MULTI/EXEC pipeline) that executes atomically on the
+    server.
+
+    A refresh token is a session; access tokens carry the session id in their
+    ``sid`` claim and are only valid while that session exists, so revoking a
+    session never needs to find its access tokens.
+
+    With ACCESS_TOKEN_MODE="stateless" access tokens are not stored at all:
+    they are valid by signature and expiry unless their jti (or their user)
+    is on the replicated revocation list. Refresh tokens stay in Redis in
+    both modes.
+
+    Each user's session index is pruned of expired sessions on every login
+    and capped at MAX_SESSIONS_PER_USER, evicting the oldest sessions first;
+    a periodic sweep prunes the indexes of users who stopped logging in.
+    """
+
     def __init__(self):
         self.expire_seconds = settings.SESSION_EXPIRE_SECONDS
+        self.refresh_expire_seconds = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+        self.stateless = settings.ACCESS_TOKEN_MODE == "stateless"
+        self.revoke_batch_size = 500  # Users per revocation script call
+        self.max_sessions = settings.MAX_SESSIONS_PER_USER
+        self.sweep_interval = settings.SESSION_SWEEP_INTERVAL
+        self._sweeper: Optional[asyncio.Task] = None
 
-    def create_tokens(self, user_id: UUID) -> Dict[str, str]:
-        """Create access and refresh tokens for a user."""
-        access_token = create_access_token(user_id)
-        refresh_token = create_refresh_token(user_id)
-        
-        # Store tokens in Redis
-        token_data = {
+    def _record(self, user_id: UUID | str, expire_seconds: int, **extra: str) -> Dict[str, str]:
+        now = datetime.utcnow()
+        return {
             "user_id": str(user_id),
-            "created_at": datetime.utcnow().isoformat(),
-            "expires_at": (datetime.utcnow() + timedelta(seconds=self.expire_seconds)).isoformat(),
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=expire_seconds)).isoformat(),
+            **extra,
         }
-        
-        # Store access token
-        redis_client.set(
-            f"access_token:{access_token}",
-            token_data,
-            expire=self.expire_seconds
-        )
-        
-        # Store refresh token with longer expiration
-        redis_client.set(
-            f"refresh_token:{refresh_token}",
-            token_data,
-            expire=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600  # Convert days to seconds
+
+    async def create_tokens(self, user_id: UUID) -> Dict[str, str]:
+        """Create access and refresh tokens for a user."""
+        session_id = uuid4().hex
+        access_id = uuid4().hex
+        access_token = create_access_token(user_id, token_id=access_id, session_id=session_id)
+        refresh_token = create_refresh_token(user_id, token_id=session_id)
+
+        now = datetime.utcnow()
+        evicted = await async_redis_client.run_script(
+            CREATE_SESSION_SCRIPT,
+            keys=[f"session:{session_id}", f"user_sessions:{user_id}", f"access:{access_id}"],
+            args=[
+                str(user_id),
+                session_id,
+                now.isoformat(),
+                (now + timedelta(seconds=self.refresh_expire_seconds)).isoformat(),
+                self.refresh_expire_seconds,
+                time.time(),
+                (now + timedelta(seconds=self.expire_seconds)).isoformat(),
+                self.expire_seconds,
+                0 if self.stateless else 1,
+                self.max_sessions,
+                token_cache.channel,
+                token_cache.session_message(""),
+            ],
+            default=[],
         )
-        
-        # Add tokens to user's active tokens
-        redis_client.sadd(f"user_tokens:{user_id}", access_token)
-        redis_client.sadd(f"user_tokens:{user_id}", refresh_token)
-        
+        for evicted_id in evicted:
+            token_cache.evict_session(evicted_id)
+
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
             "token_type": "bearer"
         }
 
-    def validate_token(self, token: str, token_type: str = "access") -> Optional[str]:
-        """Validate a token and return the user_id if valid."""
+    def _is_type(self, payload: Dict[str, Any], token_type: str) -> bool:
+        """Whether a decoded token is of token_type.
+
+        Tokens without a "typ" claim are told apart only by their legacy
+        Redis key, which stateless access validation never reads; there a
+        typ-less token counts as a refresh token, never as an access token.
+        """
+        if "typ" in payload:
+            return payload["typ"] == token_type
+        return not (token_type == "access" and self.stateless)
+
+    def _liveness_keys(self, token: str, payload: Dict[str, Any], token_type: str) -> list:
+        """Keys that must all exist for a stateful token to be valid."""
+        if "typ" not in payload:
+            return [f"{token_type}_token:{token}"]
+        if token_type == "access":
+            return [f"access:{payload.get('jti')}", f"session:{payload.get('sid')}"]
+        return [f"session:{payload.get('jti')}"]
+
+    async def validate_token(
+        self,
+        token: str,
+        token_type: str = "access",
+        decode: Callable[[str], Optional[dict]] = decode_token,
+    ) -> Optional[str]:
+        """Validate a token and return the user_id if valid.
+
+        ``decode`` verifies the token only on a token cache miss; callers that
+        may already hold its claims pass their own.
+        """
+        if token_type == "access":
+            user_id = token_cache.get(token)
+            if user_id:
+                return user_id
+
         # First verify the JWT token
-        user_id = verify_token(token)
-        if not user_id:
+        payload = decode(token)
+        user_id = payload.get("sub") if payload else None
+        if not user_id or not self._is_type(payload, token_type):
             return None
-            
-        # Then check if token exists in Redis
-        token_key = f"{token_type}_token:{token}"
-        if not redis_client.exists(token_key):
-            return None
-            
+
+        if token_type == "access" and self.stateless:
+            if revocation_list.is_revoked(payload):
+                return None
+        else:
+            # Then check if token (and its session) exists in Redis
+            metrics.increment("token_manager.redis_lookups")
+            keys = self._liveness_keys(token, payload, token_type)
+            if not await async_redis_client.exists(*keys):
+                return None
+
+        if token_type == "access":
+            token_cache.put(token, user_id, payload.get("exp"), payload.get("sid"))
         return user_id
 
-    def invalidate_token(self, token: str, token_type: str = "access") -> bool:
+    async def invalidate_token(self, token: str, token_type: str = "access") -> bool:
         """Invalidate a token."""
-        token_key = f"{token_type}_token:{token}"
-        token_data = redis_client.get(token_key)
-        
-        if token_data:
-            user_id = token_data.get("user_id")
-            if user_id:
-                redis_client.srem(f"user_tokens:{user_id}", token)
-            return redis_client.delete(token_key)
-        return False
+        payload = decode_token(token)
+        if not payload or not self._is_type(payload, token_type):
+            return False
+
+        if token_type == "access" and self.stateless:
+            if not payload.get("jti"):
+                return False
+            token_cache.evict(token_cache.digest(token))
+            return await revocation_list.revoke_token(
+                payload["jti"], token_cache.channel, token_cache.token_message(token)
+            )
 
-    def invalidate_user_tokens(self, user_id: UUID) -> bool:
+        if "typ" not in payload:
+            deleted = await async_redis_client.run_script(
+                INVALIDATE_LEGACY_TOKEN_SCRIPT,
+                keys=[
+                    f"{token_type}_token:{token}",
+                    f"session:{_legacy_session_id(token)}",
+                ],
+                args=[token, token_cache.channel, token_cache.token_message(token)],
+                default=0,
+            )
+            token_cache.evict(token_cache.digest(token))
+            return bool(deleted)
+
+        pipeline = async_redis_client.pipeline()
+        if token_type == "access":
+            message = token_cache.token_message(token)
+            pipeline.delete(f"access:{payload['jti']}")
+        else:
+            message = token_cache.session_message(payload["jti"])
+            pipeline.delete(f"session:{payload['jti']}")
+            pipeline.zrem(f"user_sessions:{payload['sub']}", payload["jti"])
+        pipeline.publish(token_cache.channel, message)
+        results = await async_redis_client.execute_pipeline(pipeline)
+        token_cache.handle_message(message)
+        return bool(results and results[0])
+
+    async def invalidate_user_tokens(self, user_id: UUID) -> bool:
         """Invalidate all tokens for a user."""
-        token_key = f"user_tokens:{user_id}"
-        tokens = redis_client.smembers(token_key)
-        
-        if tokens:
-            for token in tokens:
-                # Try both access and refresh token keys
-                redis_client.delete(f"access_token:{token}")
-                redis_client.delete(f"refresh_token:{token}")
-            return redis_client.delete(token_key)
-        return False
-
-    def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
+        return bool(await self.revoke_sessions([user_id]))
+
+    async def revoke_sessions(self, user_ids: Sequence[UUID | str]) -> int:
+        """Revoke every session of every given user.
+
+        Each batch of users is one script call that UNLINKs the session
+        records, their access records and the indexes server-side, so the
+        cost on the API side does not depend on how many sessions the users
+        hold. Access tokens of revoked
+        sessions fail validation from then on because their session is gone.
+        Returns the number of sessions (and legacy tokens) removed.
+        """
+        user_ids = [str(user_id) for user_id in user_ids]
+        removed = 0
+        for start in range(0, len(user_ids), self.revoke_batch_size):
+            batch = user_ids[start:start + self.revoke_batch_size]
+            keys = []
+            for user_id in batch:
+                keys += [f"user_sessions:{user_id}", f"user_tokens:{user_id}"]
+            removed += await async_redis_client.run_script(
+                REVOKE_USER_SESSIONS_SCRIPT,
+                keys=keys,
+                args=[token_cache.channel, *(token_cache.user_message(u) for u in batch)],
+                default=0,
+            )
+            for user_id in batch:
+                token_cache.evict_user(user_id)
+            if self.stateless:
+                await revocation_list.revoke_users(batch)
+        return removed
+
+    async def list_sessions(self, user_id: UUID) -> List[Dict[str, str]]:
+        """List a user's live sessions, oldest first."""
+        rows = await async_redis_client.run_script(
+            LIST_SESSIONS_SCRIPT,
+            keys=[f"user_sessions:{user_id}"],
+            args=[time.time(), time.time() + self.refresh_expire_seconds],
+            default=[],
+        )
+        return [
+            {"session_id": rows[i], "created_at": rows[i + 1], "expires_at": rows[i + 2] or None}
+            for i in range(0, len(rows), 3)
+        ]
+
+    async def sweep_session_indexes(self) -> int:
+        """Drop expired entries from every user's session index."""
+        client = async_redis_client.client
+        pruned = 0
+        keys = []
+        async for key in client.scan_iter(match="user_sessions:*", count=1000):
+            keys.append(key)
+            if len(keys) >= 1000:
+                pruned += await self._prune_indexes(keys)
+                keys = []
+        if keys:
+            pruned += await self._prune_indexes(keys)
+        metrics.increment("token_manager.sweeps")
+        return pruned
+
+    async def _prune_indexes(self, keys: List[str]) -> int:
+        pipeline = async_redis_client.pipeline(transaction=False)
+        now = time.time()
+        for key in keys:
+            pipeline.zremrangebyscore(key, "-inf", now)
+        results = await pipeline.execute(raise_on_error=False)
+        return sum(r for r in results if isinstance(r, int))
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                # One worker sweeps per interval; the others skip.
+                if await async_redis_client.client.set(
+                    "session_sweep_lock", 1, nx=True, ex=self.sweep_interval
+                ):
+                    pruned = await self.sweep_session_indexes()
+                    logger.info(f"Pruned {pruned} expired sessions from session indexes")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Session index sweep failed: {str(e)}")
+
+    async def start(self) -> None:
+        """Start the periodic session index sweep."""
+        if self._sweeper is None and self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
         """Create a new access token using a refresh token."""
-        user_id = self.validate_token(refresh_token, "refresh")
-        if not user_id:
+        payload = decode_token(refresh_token)
+        user_id = payload.get("sub") if payload else None
+        if not user_id or payload.get("typ", "refresh") != "refresh":
             return None
-            
-        # Create new access token
-        access_token = create_access_token(user_id)
-        
-        # Store new access token
-        token_data = {
-            "user_id": user_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "expires_at": (datetime.utcnow() + timedelta(seconds=self.expire_seconds)).isoformat(),
-        }
-        
-        redis_client.set(
-            f"access_token:{access_token}",
-            token_data,
-            expire=self.expire_seconds
+
+        if "typ" in payload:
+            session_id = payload["jti"]
+            live_key = f"session:{session_id}"
+        else:
+            session_id = _legacy_session_id(refresh_token)
+            live_key = f"refresh_token:{refresh_token}"
+
+        access_id = uuid4().hex
+        access_token = create_access_token(user_id, token_id=access_id, session_id=session_id)
+        record = self._record(user_id, self.expire_seconds)
+
+        # The session check and the new access token write happen in one
+        # script so a concurrent logout cannot slip in between them.
+        stored = await async_redis_client.run_script(
+            REFRESH_ACCESS_TOKEN_SCRIPT,
+            keys=[
+                live_key,
+                f"session:{session_id}",
+                f"access:{access_id}",
+                f"user_sessions:{user_id}",
+            ],
+            args=[
+                user_id,
+                session_id,
+                record["created_at"],
+                record["expires_at"],
+                self.expire_seconds,
+                0 if self.stateless else 1,
+                time.time(),
+                self.refresh_expire_seconds,
+            ],
+            default=0,
         )
-        
-        # Add to user's active tokens
-        redis_client.sadd(f"user_tokens:{user_id}", access_token)
-        
+        if not stored:
+            return None
+
         return {
             "access_token": access_token,
             "token_type": "bearer"
         }
 
 # Create a singleton instance
-token_manager = TokenManager() 
\ No newline at end of file
+token_manager = TokenManager()
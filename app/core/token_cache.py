@@ -0,0 +1,105 @@
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.local_cache import LocalCache
+from app.core.metrics import metrics
+
+
+class TokenCache(LocalCache[Tuple[str, Optional[str]]]):
+    """Bounded LRU of recently validated access tokens for this worker.
+
+    Entries are keyed by the SHA-256 digest of the token (the raw JWT is never
+    kept) and live for at most TOKEN_CACHE_TTL_SECONDS, never past the token's
+    own ``exp``. Revocations are broadcast on a Redis pub/sub channel so every
+    worker drops revoked entries as soon as the message arrives; the cache is
+    cleared whenever the subscription is (re)established (see LocalCache).
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.TOKEN_CACHE_MAX_SIZE,
+        ttl_seconds: int = settings.TOKEN_CACHE_TTL_SECONDS,
+        channel: str = settings.TOKEN_CACHE_CHANNEL,
+    ):
+        # Values are (user_id, session_id)
+        super().__init__(
+            "token_cache", settings.TOKEN_CACHE_ENABLED, max_size, ttl_seconds, channel
+        )
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[str]:
+        """Return the cached user_id for a token, or None on a miss."""
+        if not self.enabled:
+            return None
+        value = self._lookup(self.digest(token))
+        if value is None:
+            metrics.increment("token_cache.misses")
+            return None
+        metrics.increment("token_cache.hits")
+        return value[0]
+
+    def put(
+        self,
+        token: str,
+        user_id: str,
+        exp: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ) -> None:
+        """Cache a validated token until the TTL or its exp, whichever is first."""
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        self._remember(self.digest(token), (user_id, session_id), expires_at)
+
+    def evict_user(self, user_id: str) -> None:
+        """Drop every cached token that belongs to a user."""
+        for key in [k for k, ((uid, _), _) in self._entries.items() if uid == user_id]:
+            del self._entries[key]
+
+    def evict_session(self, session_id: str) -> None:
+        """Drop every cached access token issued under a session."""
+        for key in [k for k, ((_, sid), _) in self._entries.items() if sid == session_id]:
+            del self._entries[key]
+
+    def token_message(self, token: str) -> str:
+        """Pub/sub message that revokes one token on every worker."""
+        return f"token:{self.digest(token)}"
+
+    def user_message(self, user_id: str) -> str:
+        """Pub/sub message that revokes every token of a user on every worker."""
+        return f"user:{user_id}"
+
+    def session_message(self, session_id: str) -> str:
+        """Pub/sub message that revokes every access token of a session."""
+        return f"session:{session_id}"
+
+    def handle_message(self, message: str) -> None:
+        """Apply a revocation received from the channel."""
+        kind, _, value = message.partition(":")
+        if kind == "token":
+            self.evict(value)
+        elif kind == "user":
+            self.evict_user(value)
+        elif kind == "session":
+            self.evict_session(value)
+        metrics.increment("token_cache.revocations_received")
+
+    def stats(self) -> Dict[str, int]:
+        snapshot = metrics.snapshot()["counters"]
+        return {
+            "size": len(self._entries),
+            "hits": snapshot.get("token_cache.hits", 0),
+            "misses": snapshot.get("token_cache.misses", 0),
+            "evictions": snapshot.get("token_cache.evictions", 0),
+        }
+
+
+# Create a singleton instance
+token_cache = TokenCache()
@@ -0,0 +1,118 @@
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+# Backends that can sign and verify JWTs. "jose" (python-jose) is always
+# installed; "pyjwt" needs the optional PyJWT package and is the one to use
+# for EdDSA, which python-jose does not implement.
+BACKENDS = ("jose", "pyjwt")
+
+
+class TokenCodec:
+    """Encode and decode JWTs with key material built once per process.
+
+    Symmetric algorithms (HS*) sign and verify with SECRET_KEY; asymmetric
+    ones (EdDSA, ES*, RS*, PS*) sign with JWT_PRIVATE_KEY and verify with
+    JWT_PUBLIC_KEY, both PEM. The PEM is parsed here rather than on every
+    call, which is where most of the per-token cost of asymmetric keys goes.
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.JWT_BACKEND,
+        algorithm: str = settings.ALGORITHM,
+        secret_key: Optional[str] = settings.SECRET_KEY,
+        private_key: Optional[str] = settings.JWT_PRIVATE_KEY,
+        public_key: Optional[str] = settings.JWT_PUBLIC_KEY,
+        leeway: int = settings.JWT_LEEWAY_SECONDS,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown JWT backend {backend!r}, expected one of {BACKENDS}")
+        self.backend = backend
+        self.algorithm = algorithm
+        self.algorithms = [algorithm]
+        self.leeway = leeway
+
+        if algorithm.startswith("HS"):
+            signing_key = verifying_key = secret_key
+        else:
+            signing_key, verifying_key = private_key, public_key
+        if not signing_key or not verifying_key:
+            raise ValueError(f"No key configured for JWT algorithm {algorithm}")
+
+        if backend == "jose":
+            self._init_jose(signing_key, verifying_key)
+        else:
+            self._init_pyjwt(signing_key, verifying_key)
+
+    def _init_jose(self, signing_key: str, verifying_key: str) -> None:
+        from jose import JWTError, jwk, jwt
+        from jose.constants import ALGORITHMS
+
+        if self.algorithm not in ALGORITHMS.SUPPORTED:
+            raise ValueError(f"python-jose does not support JWT algorithm {self.algorithm}")
+        self._jwt = jwt
+        self._errors = (JWTError,)
+        self._signing_key = jwk.construct(signing_key, self.algorithm)
+        self._verifying_key = (
+            self._signing_key
+            if verifying_key is signing_key
+            else jwk.construct(verifying_key, self.algorithm)
+        )
+        self._decode_options = {"leeway": self.leeway}
+
+    def _init_pyjwt(self, signing_key: str, verifying_key: str) -> None:
+        try:
+            import jwt
+            from jwt.algorithms import get_default_algorithms
+        except ImportError as e:
+            raise RuntimeError(
+                "JWT_BACKEND=pyjwt requires PyJWT; install the eddsa extra"
+            ) from e
+
+        algorithm = get_default_algorithms().get(self.algorithm)
+        if algorithm is None:
+            raise ValueError(f"PyJWT does not support JWT algorithm {self.algorithm}")
+        self._jwt = jwt.PyJWT()
+        self._errors = (jwt.PyJWTError,)
+        self._signing_key = algorithm.prepare_key(signing_key)
+        self._verifying_key = (
+            self._signing_key
+            if verifying_key is signing_key
+            else algorithm.prepare_key(verifying_key)
+        )
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """Sign a set of claims."""
+        return self._jwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify a token and return its claims, or None if it is invalid."""
+        try:
+            if self.backend == "jose":
+                return self._jwt.decode(
+                    token, self._verifying_key, algorithms=self.algorithms, options=self._decode_options
+                )
+            return self._jwt.decode(
+                token, self._verifying_key, algorithms=self.algorithms, leeway=self.leeway
+            )
+        except self._errors:
+            return None
+
+    def request_claims(self, scope: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Claims of the request's bearer token, verified at most once per request.
+
+        Kept in ``scope["state"]`` (``request.state.token_claims``), so the
+        rate limiter, the replica router and auth share one decode.
+        """
+        state = scope.setdefault("state", {})
+        if "token_claims" not in state:
+            headers = {k.lower(): v for k, v in scope.get("headers", ())}
+            scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+            bearer = scheme.lower() == "bearer" and token
+            state["token_claims"] = self.decode(token) if bearer else None
+        return state["token_claims"]
+
+
+# Create a singleton instance
+token_codec = TokenCodec()
@@ -1,18 +0,0 @@
-from sqlmodel import Session, SQLModel, create_engine
-
-from app.config import settings
-
-engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI),
-    echo=True,
-    pool_pre_ping=True,
-)
-
-
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
-
-
-def get_session():
-    with Session(engine) as session:
-        yield session
@@ -1,26 +1,37 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session
-
 from uuid import UUID
 
-from app.config.database import get_session
+from app.config.database import (
+    UnitOfWork,
+    async_session_factory,
+    engines,
+    get_unit_of_work,
+    route_request,
+)
 from app.config import logger
-from app.models.user import User
-from app.repositories.user import UserRepository
+from app.repositories.user import AsyncUserRepository
+from app.schemas.user import UserPrincipal
+from app.core.principal_cache import principal_cache
 from app.core.token import token_manager
-from app.core.rate_limiter import rate_limiter
+from app.core.token_codec import token_codec
 
 
 security = HTTPBearer()
 
 
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UUID:
+async def get_current_user_id(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> UUID:
     logger.info("Starting get_current_user_id")
     token = credentials.credentials
     logger.info(f"Verifying token: {token[:10]}...")
     
-    user_id = token_manager.validate_token(token)
+    # Shares the decode with the rate limiter and replica router
+    user_id = await token_manager.validate_token(
+        token, decode=lambda _: token_codec.request_claims(request.scope)
+    )
     if not user_id:
         logger.error("Invalid token")
         raise HTTPException(
@@ -44,16 +55,30 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
 
 async def get_current_user(
     user_id: UUID = Depends(get_current_user_id),
-    session: Session = Depends(get_session),
-) -> User:
-    user_repository = UserRepository(session)
-    user = user_repository.get_by_id(user_id)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    uow: UnitOfWork = Depends(get_unit_of_work),
+    route: str = Depends(route_request),
+) -> UserPrincipal:
+    """The authenticated user, from the principal cache when possible.
+
+    A cache miss reads the user from the primary: the unit of work's session
+    when the request is routed there, otherwise a short session of its own,
+    so a lagging replica never puts a stale principal in the cache.
+    """
+    user = await principal_cache.get(user_id)
+    if user is None:
+        if route == "primary":
+            found = await AsyncUserRepository(uow.session).get_by_id(user_id)
+        else:
+            async with async_session_factory(bind=engines.async_engine("primary")) as session:
+                found = await AsyncUserRepository(session).get_by_id(user_id)
+
+        if not found:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+        user = UserPrincipal.model_validate(found)
+        await principal_cache.put(user)
         
     if not user.is_active:
         raise HTTPException(
@@ -65,7 +90,7 @@ async def get_current_user(
 
 
 async def get_current_user_role(
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_user),
 ) -> str:
     logger.info(f"Getting role for user: {user.email}")
     return user.role
@@ -82,12 +107,3 @@ async def require_active_session(
         )
     return current_user
 
-
-def rate_limit_auth_attempts(identifier: str):
-    """Rate limit authentication attempts for an identifier (e.g., IP or username)."""
-    is_limited, remaining = rate_limiter.is_rate_limited(f"auth_attempts:{identifier}")
-    if is_limited:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Too many authentication attempts. Try again in {remaining} seconds."
-        ) 
\ No newline at end of file
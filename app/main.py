@@ -3,18 +3,53 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-from app.config.database import init_db
+from app.config.database import engines, init_db, replica_router
 from app.config import settings
 from app.config.logging import setup_logging, logger
+from app.core.hashing import password_hasher
+from app.core.partitions import attendance_partitions
+from app.core.principal_cache import principal_cache
+from app.core.rate_limiter import leased_rate_limiter
+from app.core.redis import async_redis_client
+from app.core.revocation import revocation_list
+from app.core.rollups import attendance_rollups
+from app.core.token import token_manager
+from app.core.token_cache import token_cache
+from app.middleware.rate_limit import RateLimitMiddleware
 from app.routers import api_router
 
 
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting application...")
     init_db()
+    await attendance_partitions.start()
+    await attendance_rollups.start()
+    await replica_router.start()
     logger.info("Database initialized")
+    if await async_redis_client.ping():
+        logger.info("Redis connection pool ready")
+    else:
+        logger.warning("Redis is unreachable; token and rate limit checks will fail")
+    await token_cache.start()
+    await principal_cache.start()
+    await token_manager.start()
+    if settings.ACCESS_TOKEN_MODE == "stateless":
+        await revocation_list.start()
+    password_hasher.start()
+    await leased_rate_limiter.start()
     yield
     logger.info("Shutting down application...")
+    await leased_rate_limiter.stop()
+    await replica_router.stop()
+    await attendance_rollups.stop()
+    await attendance_partitions.stop()
+    password_hasher.shutdown()
+    await revocation_list.stop()
+    await token_manager.stop()
+    await principal_cache.stop()
+    await token_cache.stop()
+    await async_redis_client.close()
+    await engines.dispose()
 
 
 def init_app() -> FastAPI:
@@ -30,6 +65,9 @@ def init_app() -> FastAPI:
         redoc_url="/redoc",
     )
 
+    # Rate limit before routing; added first so CORS wraps its 429s
+    app.add_middleware(RateLimitMiddleware)
+
     # Set up CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -0,0 +1,225 @@
+import json
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from app.config import settings
+from app.config.logging import logger
+from app.core.metrics import metrics
+from app.core.rate_limiter import RateLimitResult, leased_rate_limiter, rate_limiter
+from app.core.token_codec import token_codec
+
+KEY_TYPES = ("ip", "user", "email")
+MAX_EMAIL_BODY_BYTES = 8192
+
+
+class RateLimitRule:
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        key: str,
+        limit: int,
+        period: int,
+        methods: Optional[List[str]] = None,
+        leased: bool = False,
+    ):
+        self.name = name
+        self.path = path
+        self.prefix = path[:-1] if path.endswith("*") else None
+        self.key = key
+        self.limit = limit
+        self.period = period
+        self.methods = {m.upper() for m in methods} if methods else None
+        self.leased = leased
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        if self.prefix is not None:
+            return path.startswith(self.prefix)
+        return path == self.path or path == self.path + "/"
+
+
+def load_rules(config_path: Optional[str] = None) -> List[RateLimitRule]:
+    """Load rate limit rules from YAML configuration file."""
+    if config_path is None:
+        config_path = str(Path(__file__).parent.parent / "config" / "rate_limits.yaml")
+    try:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid rate limit configuration: {str(e)}")
+
+    if not isinstance(config, dict) or not isinstance(config.get("rules", {}), dict):
+        raise ValueError("Invalid rate limit configuration: 'rules' must be a dictionary")
+
+    rules = []
+    for name, rule in (config.get("rules") or {}).items():
+        if not isinstance(rule, dict) or "path" not in rule:
+            raise ValueError(f"Invalid rate limit rule '{name}': a path is required")
+        if rule.get("key") not in KEY_TYPES:
+            raise ValueError(f"Invalid rate limit rule '{name}': key must be one of {KEY_TYPES}")
+        if int(rule.get("limit", 0)) <= 0 or int(rule.get("period", 0)) <= 0:
+            raise ValueError(f"Invalid rate limit rule '{name}': limit and period must be positive")
+        rules.append(
+            RateLimitRule(
+                name=name,
+                path=rule["path"],
+                key=rule["key"],
+                limit=int(rule["limit"]),
+                period=int(rule["period"]),
+                methods=rule.get("methods"),
+                leased=bool(rule.get("leased", False)),
+            )
+        )
+    # Email rules read the body, so they run last: a request rejected by any
+    # other rule never has its body touched.
+    rules.sort(key=lambda r: r.key == "email")
+    logger.info(f"Loaded {len(rules)} rate limit rules")
+    return rules
+
+
+class RateLimitMiddleware:
+    """Apply the configured rate limits before routing.
+
+    Runs as plain ASGI ahead of FastAPI, so a rejected request never opens a
+    DB session, resolves dependencies or parses its body (email-keyed rules
+    excepted, which read at most a few KB of JSON). Responses carry the
+    ``RateLimit-*`` headers of the tightest matching rule; rejections get a
+    429 with ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        config_path: Optional[str] = None,
+        prefix: str = settings.API_V1_STR,
+        trust_forwarded: bool = settings.RATE_LIMIT_TRUST_FORWARDED,
+    ):
+        self.app = app
+        self.rules = load_rules(config_path)
+        self.prefix = prefix
+        self.trust_forwarded = trust_forwarded
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            return await self.app(scope, receive, send)
+
+        path = scope["path"][len(self.prefix):] or "/"
+        rules = [r for r in self.rules if r.matches(scope["method"], path)]
+        if not rules:
+            return await self.app(scope, receive, send)
+
+        headers = {k.lower(): v for k, v in scope["headers"]}
+        tightest: Optional[Tuple[RateLimitRule, RateLimitResult]] = None
+        body_read = False
+        email = None
+        for rule in rules:
+            if rule.key == "email":
+                if not body_read:
+                    body, receive = await self._read_body(receive)
+                    email = self._email(body)
+                    body_read = True
+                value = email
+            elif rule.key == "user":
+                claims = token_codec.request_claims(scope)
+                value = claims.get("sub") if claims else None
+            else:
+                value = self._client_ip(scope, headers)
+            if value is None:
+                continue
+
+            limiter = leased_rate_limiter if rule.leased else rate_limiter
+            result = await limiter.hit(f"route:{rule.name}:{value}", rule.limit, rule.period)
+            if not result.allowed:
+                metrics.increment("rate_limit.rejected")
+                return await self._reject(send, rule, result)
+            if tightest is None or result.remaining < tightest[1].remaining:
+                tightest = (rule, result)
+
+        if tightest is None:
+            return await self.app(scope, receive, send)
+
+        limit_headers = self._headers(*tightest)
+
+        async def send_with_headers(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _client_ip(self, scope: Dict[str, Any], headers: Dict[bytes, bytes]) -> Optional[str]:
+        if self.trust_forwarded and b"x-forwarded-for" in headers:
+            return headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else None
+
+    @staticmethod
+    def _email(body: Optional[bytes]) -> Optional[str]:
+        if not body:
+            return None
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        email = data.get("email") if isinstance(data, dict) else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> Tuple[Optional[bytes], Callable]:
+        """Read up to MAX_EMAIL_BODY_BYTES and return it with a replaying receive."""
+        messages = []
+        size = 0
+        complete = False
+        while size <= MAX_EMAIL_BODY_BYTES:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                complete = True
+                break
+
+        body = None
+        if complete and size <= MAX_EMAIL_BODY_BYTES:
+            body = b"".join(m.get("body", b"") for m in messages)
+
+        async def replay() -> Dict[str, Any]:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return body, replay
+
+    @staticmethod
+    def _headers(rule: RateLimitRule, result: RateLimitResult) -> List[Tuple[bytes, bytes]]:
+        return [
+            (b"ratelimit-limit", str(rule.limit).encode()),
+            (b"ratelimit-remaining", str(result.remaining).encode()),
+            (b"ratelimit-reset", str(math.ceil(result.reset_after)).encode()),
+            (b"ratelimit-policy", f"{rule.limit};w={rule.period}".encode()),
+        ]
+
+    async def _reject(self, send: Callable, rule: RateLimitRule, result: RateLimitResult) -> None:
+        retry_after = rate_limiter.retry_after_header(result)
+        body = json.dumps(
+            {"detail": f"Too many requests. Try again in {retry_after} seconds."}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after.encode()),
+                    *self._headers(rule, result),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
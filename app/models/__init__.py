@@ -1,4 +1,2 @@
-from .user import User
-from .product import Product
-from .order import Order
-from .message import Message
\ No newline at end of file
+from .user import User, OfficerProfile, CorperProfile
+from .attendance import Attendance, AttendanceRollup
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional
 from uuid import UUID, uuid4
@@ -5,6 +6,24 @@ from datetime import datetime, date
 
 
 class Attendance(SQLModel, table=True):
+    # One record per corper per day; the others match the repository queries
+    # and their keyset order (see KeysetMixin.sort_key). Partitioned by month
+    # of attendance_date (see app.core.partitions), which the primary key has
+    # to include.
+    __table_args__ = (
+        Index("uq_attendance_corper_id_attendance_date", "corper_id", "attendance_date", unique=True),
+        Index("ix_attendance_corper_id_created_at_id", "corper_id", "created_at", "id"),
+        Index(
+            "ix_attendance_cds_group_attendance_date",
+            "cds_group",
+            "attendance_date",
+            "created_at",
+            "id",
+        ),
+        Index("ix_attendance_officer_id", "officer_id"),
+        {"postgresql_partition_by": "RANGE (attendance_date)"},
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
 
     corper_id: UUID = Field(foreign_key="user.id")
@@ -13,7 +32,9 @@ class Attendance(SQLModel, table=True):
     )  # could be officer or general secretary
     cds_group: str  # Stored as textfor now. could normalize
 
-    attendance_date: date = Field(default_factory=lambda: datetime.utcnow().date())
+    attendance_date: date = Field(
+        default_factory=lambda: datetime.utcnow().date(), primary_key=True
+    )
 
     check_in_time: datetime
     check_out_time: Optional[datetime] = None
@@ -34,3 +55,24 @@ class Attendance(SQLModel, table=True):
     officer: Optional["User"] = Relationship(
         sa_relationship_kwargs={"foreign_keys": "[Attendance.officer_id]"}
     )
+
+
+class AttendanceRollup(SQLModel, table=True):
+    # Status counts of one CDS group on one day, kept in step with attendance
+    # by the repository writes and repaired by reconciliation (see
+    # app.core.rollups). Summaries read these instead of attendance rows.
+    __table_args__ = (
+        Index("ix_attendancerollup_attendance_date_zone", "attendance_date", "zone"),
+    )
+
+    cds_group: str = Field(primary_key=True)
+    attendance_date: date = Field(primary_key=True)
+    zone: Optional[str] = None  # Of the group's corpers, from CorperProfile
+
+    present: int = 0
+    absent: int = 0
+    late: int = 0
+    excused: int = 0
+    total: int = 0  # Every record, whatever its status
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,9 +1,27 @@
+from sqlalchemy import DDL, Index, event
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from uuid import UUID, uuid4
 from datetime import datetime
 
 
+def trigram_index(name: str, column: str) -> Index:
+    """GIN pg_trgm index, serving ILIKE '%term%' and similarity() on column."""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
+
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 # Base user model
 class UserBase(SQLModel):
     email: str = Field(index=True, unique=True)
@@ -17,6 +35,14 @@ class UserBase(SQLModel):
 
 
 class User(UserBase, table=True):
+    __table_args__ = (
+        # Keyset pagination order (see KeysetMixin.sort_key)
+        Index("ix_user_created_at_id", "created_at", "id"),
+        # User search (see UserRepository.search)
+        trigram_index("ix_user_email_trgm", "email"),
+        trigram_index("ix_user_full_name_trgm", "full_name"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     password: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -40,6 +66,14 @@ class OfficerProfile(SQLModel, table=True):
 
 
 class CorperProfile(SQLModel, table=True):
+    __table_args__ = (
+        # Corpers of a CDS group (see AdminRepository)
+        Index("ix_corperprofile_cds_group", "cds_group"),
+        trigram_index("ix_corperprofile_call_up_number_trgm", "call_up_number"),
+        trigram_index("ix_corperprofile_state_code_trgm", "state_code"),
+        trigram_index("ix_corperprofile_cds_group_trgm", "cds_group"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id", unique=True)
 
@@ -2,9 +2,10 @@ from typing import Optional
 from uuid import UUID
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.user import OfficerProfile, User
-from app.repositories.base import BaseRepository
+from app.models.user import CorperProfile, OfficerProfile, User
+from app.repositories.base import AsyncBaseRepository, BaseRepository, Include
 
 
 class AdminRepository(BaseRepository[User]):
@@ -14,10 +15,51 @@ class AdminRepository(BaseRepository[User]):
     def create_officer_account(self, officer_profile: OfficerProfile) -> OfficerProfile:
         return self.create(officer_profile)
 
-    def get_officer_by_id(self, user_id: UUID) -> Optional[User]:
+    def get_officer_by_id(self, user_id: UUID, include: Include = None) -> Optional[User]:
         return self.session.exec(
-            select(User).where(User.id == user_id, User.role == "officer")
+            self._include(select(User).where(User.id == user_id, User.role == "officer"), include)
         ).first()
 
-    def get_all_officers(self) -> list[User]:
-        return self.session.exec(select(User).where(User.role == "officer")).all()
+    def get_all_officers(self, include: Include = None) -> list[User]:
+        return self.session.exec(
+            self._include(select(User).where(User.role == "officer"), include)
+        ).all()
+
+    def get_user_ids_by_cds_group(self, cds_group: str) -> list[UUID]:
+        return self.session.exec(
+            select(CorperProfile.user_id).where(CorperProfile.cds_group == cds_group)
+        ).all()
+
+
+class AsyncAdminRepository(AsyncBaseRepository[User]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, User)
+
+    async def create_officer_account(self, officer_profile: OfficerProfile) -> OfficerProfile:
+        self.session.add(officer_profile)
+        await self._commit()
+        await self.session.refresh(officer_profile)
+        return officer_profile
+
+    async def get_officer_by_id(self, user_id: UUID, include: Include = None) -> Optional[User]:
+        return (
+            await self.session.exec(
+                self._include(
+                    select(User).where(User.id == user_id, User.role == "officer"), include
+                )
+            )
+        ).first()
+
+    async def get_all_officers(self, include: Include = None) -> list[User]:
+        return (
+            await self.session.exec(
+                self._include(select(User).where(User.role == "officer"), include)
+            )
+        ).all()
+
+    async def get_user_ids_by_cds_group(self, cds_group: str) -> list[UUID]:
+        return (
+            await self.session.exec(
+                select(CorperProfile.user_id).where(CorperProfile.cds_group == cds_group)
+            )
+        ).all()
@@ -1,54 +1,548 @@
-from datetime import date
-from typing import Optional, List
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, List, Sequence, Tuple
 from uuid import UUID
 
+from sqlalchemy import DateTime, Row, delete, exists, func, literal, or_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 
-from app.models.attendance import Attendance
-from app.repositories.base import BaseRepository
+from app.config import settings
+from app.core.enums import AttendanceStatus
+from app.models.attendance import Attendance, AttendanceRollup
+from app.models.user import CorperProfile
+from app.repositories.base import AsyncBaseRepository, BaseRepository, Include, Page
+
+ROLLUP_STATUSES = [status.value for status in AttendanceStatus]
+ROLLUP_COUNTS = ROLLUP_STATUSES + ["total"]
+
+# Columns of an export, in order
+EXPORT_COLUMNS = tuple(Attendance.__table__.columns)
+
+
+def _in_window(start_date: Optional[date] = None, end_date: Optional[date] = None) -> Any:
+    """attendance_date range, so a query only scans the partitions it covers.
+
+    Defaults to the ATTENDANCE_QUERY_WINDOW_DAYS up to today.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=settings.ATTENDANCE_QUERY_WINDOW_DAYS)
+    return Attendance.attendance_date.between(start_date, end_date)
+
+
+def _export(
+    start_date: date, end_date: date, cds_group: Optional[str], batch_size: int
+) -> Any:
+    """Attendance columns as plain rows, fetched batch_size at a time.
+
+    yield_per reads through a server-side cursor and keeps no ORM objects
+    around, so a client holds one batch however many rows match. No ORDER
+    BY: rows come in storage order, partition by partition, with no sort
+    to spill.
+    """
+    statement = select(*EXPORT_COLUMNS).where(_in_window(start_date, end_date))
+    if cds_group:
+        statement = statement.where(Attendance.cds_group == cds_group)
+    return statement.execution_options(yield_per=batch_size)
+
+
+def _by_id(attendance_id: UUID, attendance_date: Optional[date] = None) -> Dict[str, Any]:
+    # Without its date, a record is looked up in every partition.
+    filters: Dict[str, Any] = {"id": attendance_id}
+    if attendance_date is not None:
+        filters["attendance_date"] = attendance_date
+    return filters
+
+
+def _rollup_insert(dialect: str) -> Any:
+    # Both dialects spell the upsert INSERT ... ON CONFLICT DO UPDATE
+    return (postgresql if dialect == "postgresql" else sqlite).insert(AttendanceRollup)
+
+
+def _zone_of(corper_id: Any) -> Any:
+    return (
+        select(CorperProfile.zone)
+        .where(CorperProfile.user_id == corper_id)
+        .scalar_subquery()
+    )
+
+
+def _rollup_delta(dialect: str, attendance: Any, deltas: Dict[str, int]) -> Any:
+    """Add deltas (status -> change in count) to the rollup of a record's group and day.
+
+    An upsert, so concurrent writers for the same group and day add to the
+    same row instead of racing on a read-modify-write.
+    """
+    counts = {status: deltas.get(status, 0) for status in ROLLUP_STATUSES}
+    statement = _rollup_insert(dialect).values(
+        cds_group=attendance.cds_group,
+        attendance_date=attendance.attendance_date,
+        zone=_zone_of(attendance.corper_id),
+        total=sum(deltas.values()),
+        updated_at=datetime.utcnow(),
+        **counts,
+    )
+    changes = {
+        column: getattr(AttendanceRollup, column) + statement.excluded[column]
+        for column in ROLLUP_COUNTS
+    }
+    return statement.on_conflict_do_update(
+        index_elements=["cds_group", "attendance_date"],
+        set_={
+            **changes,
+            "zone": func.coalesce(statement.excluded.zone, AttendanceRollup.zone),
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+
+
+def _status_deltas(previous: str, current: str) -> Dict[str, int]:
+    if previous == current:
+        return {}
+    return {previous: -1, current: 1}
+
+
+def _reconcile_rollups(
+    dialect: str, start_date: date, end_date: date
+) -> Tuple[List[Any], List[Any]]:
+    """Statements recounting the rollups of a date range from attendance.
+
+    Returns (locking, repairing) statements, to run in order in one
+    transaction. The locking ones add an empty rollup for every group and
+    day that has none and lock every rollup of the range, so no
+    _rollup_delta can commit between the recount and its write: writers
+    still in flight wait, and add their change to the recounted row. The
+    repairing ones then count under those locks; the upsert only rewrites
+    rows whose counts drifted and the delete drops rollups left without
+    attendance, so their rowcounts are the repairs made.
+    """
+    in_range = Attendance.attendance_date.between(start_date, end_date)
+    rollups_in_range = AttendanceRollup.attendance_date.between(start_date, end_date)
+    columns = ["cds_group", "attendance_date", "zone", *ROLLUP_COUNTS, "updated_at"]
+
+    days = (
+        select(
+            Attendance.cds_group,
+            Attendance.attendance_date,
+            *[literal(0) for _ in ROLLUP_COUNTS],
+            literal(datetime.utcnow(), DateTime),
+        )
+        .where(in_range)
+        .group_by(Attendance.cds_group, Attendance.attendance_date)
+    )
+    add_missing = (
+        _rollup_insert(dialect)
+        .from_select(["cds_group", "attendance_date", *ROLLUP_COUNTS, "updated_at"], days)
+        .on_conflict_do_nothing(index_elements=["cds_group", "attendance_date"])
+    )
+    # In key order, so two reconciliations cannot deadlock each other
+    lock = (
+        select(AttendanceRollup.cds_group)
+        .where(rollups_in_range)
+        .order_by(AttendanceRollup.cds_group, AttendanceRollup.attendance_date)
+        .with_for_update()
+    )
+
+    counts = (
+        select(
+            Attendance.cds_group,
+            Attendance.attendance_date,
+            func.max(CorperProfile.zone),
+            *[func.count().filter(Attendance.status == status) for status in ROLLUP_STATUSES],
+            func.count(),
+            literal(datetime.utcnow(), DateTime),
+        )
+        .select_from(Attendance)
+        .outerjoin(CorperProfile, CorperProfile.user_id == Attendance.corper_id)
+        .where(in_range)
+        .group_by(Attendance.cds_group, Attendance.attendance_date)
+    )
+    statement = _rollup_insert(dialect).from_select(columns, counts)
+    recount = statement.on_conflict_do_update(
+        index_elements=["cds_group", "attendance_date"],
+        set_={column: statement.excluded[column] for column in columns[2:]},
+        where=or_(
+            *[
+                getattr(AttendanceRollup, column).is_distinct_from(statement.excluded[column])
+                for column in ["zone", *ROLLUP_COUNTS]
+            ]
+        ),
+    )
+    orphaned = delete(AttendanceRollup).where(
+        rollups_in_range,
+        ~exists().where(
+            Attendance.cds_group == AttendanceRollup.cds_group,
+            Attendance.attendance_date == AttendanceRollup.attendance_date,
+        ),
+    )
+    return [add_missing, lock], [recount, orphaned]
+
+
+def _attendance_dates() -> Any:
+    return select(func.min(Attendance.attendance_date), func.max(Attendance.attendance_date))
+
+
+def _group_summary(cds_group: str, start_date: date, end_date: date) -> Any:
+    return (
+        select(AttendanceRollup)
+        .where(AttendanceRollup.cds_group == cds_group)
+        .where(AttendanceRollup.attendance_date.between(start_date, end_date))
+        .order_by(AttendanceRollup.attendance_date)
+    )
+
+
+def _zone_summary(start_date: date, end_date: date, zone: Optional[str] = None) -> Any:
+    statement = (
+        select(
+            AttendanceRollup.zone,
+            AttendanceRollup.attendance_date,
+            func.count().label("groups"),
+            *[func.sum(getattr(AttendanceRollup, column)).label(column) for column in ROLLUP_COUNTS],
+        )
+        .where(AttendanceRollup.attendance_date.between(start_date, end_date))
+        .group_by(AttendanceRollup.zone, AttendanceRollup.attendance_date)
+        .order_by(AttendanceRollup.attendance_date, AttendanceRollup.zone)
+    )
+    if zone is not None:
+        statement = statement.where(AttendanceRollup.zone == zone)
+    return statement
 
 
 class AttendanceRepository(BaseRepository[Attendance]):
+    """Attendance records and their daily rollups per CDS group.
+
+    create_attendance and update_attendance_status update the rollups in the
+    same transaction; other writes (create_many, update, delete) leave them
+    to reconcile_rollups.
+    """
+
     def __init__(self, session: Session):
         super().__init__(session, Attendance)
 
-    def get_attendance_by_corper(self, corper_id: UUID) -> List[Attendance]:
+    @property
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    def get_attendance_by_corper(
+        self,
+        corper_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include: Include = None,
+    ) -> List[Attendance]:
         return self.session.exec(
-            select(Attendance).where(Attendance.corper_id == corper_id)
+            self._include(
+                select(Attendance)
+                .where(Attendance.corper_id == corper_id)
+                .where(_in_window(start_date, end_date)),
+                include,
+            )
         ).all()
 
     def get_attendance_by_date(
-        self, cds_group: str, target_date: date
+        self, cds_group: str, target_date: date, include: Include = None
     ) -> List[Attendance]:
         return self.session.exec(
-            select(Attendance)
-            .where(Attendance.cds_group == cds_group)
-            .where(Attendance.attendance_date == target_date)
+            self._include(
+                select(Attendance)
+                .where(Attendance.cds_group == cds_group)
+                .where(Attendance.attendance_date == target_date),
+                include,
+            )
         ).all()
 
+    def get_attendance_page_by_corper(
+        self,
+        corper_id: UUID,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include: Include = None,
+    ) -> Page:
+        statement = self._keyset(
+            self._include(
+                select(Attendance)
+                .where(Attendance.corper_id == corper_id)
+                .where(_in_window(start_date, end_date)),
+                include,
+            ),
+            limit,
+            cursor,
+        )
+        return self._page(self.session.exec(statement).all(), limit)
+
+    def get_attendance_page_by_date(
+        self,
+        cds_group: str,
+        target_date: date,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include: Include = None,
+    ) -> Page:
+        statement = self._keyset(
+            self._include(
+                select(Attendance)
+                .where(Attendance.cds_group == cds_group)
+                .where(Attendance.attendance_date == target_date),
+                include,
+            ),
+            limit,
+            cursor,
+        )
+        return self._page(self.session.exec(statement).all(), limit)
+
+    def stream_attendance(
+        self,
+        start_date: date,
+        end_date: date,
+        cds_group: Optional[str] = None,
+        batch_size: int = settings.ATTENDANCE_EXPORT_BATCH_SIZE,
+    ) -> Iterator[Sequence[Row]]:
+        """Batches of EXPORT_COLUMNS rows from start_date to end_date."""
+        result = self.session.exec(_export(start_date, end_date, cds_group, batch_size))
+        yield from result.partitions()
+
     def create_attendance(self, attendance: Attendance) -> Attendance:
         self.session.add(attendance)
-        self.session.commit()
+        self.session.flush()
+        self.session.exec(_rollup_delta(self._dialect, attendance, {attendance.status: 1}))
+        self._commit()
         self.session.refresh(attendance)
         return attendance
 
-    def get_attendance_by_id(self, attendance_id: UUID) -> Optional[Attendance]:
-        return self.session.get(Attendance, attendance_id)
+    def get_attendance_by_id(
+        self,
+        attendance_id: UUID,
+        attendance_date: Optional[date] = None,
+        include: Include = None,
+    ) -> Optional[Attendance]:
+        statement = self._include(
+            select(Attendance).filter_by(**_by_id(attendance_id, attendance_date)), include
+        )
+        return self.session.exec(statement).first()
 
     def update_attendance_status(
         self,
         attendance_id: UUID,
         status: str,
         remarks: Optional[str] = None,
+        attendance_date: Optional[date] = None,
     ) -> Optional[Attendance]:
-        attendance = self.session.get(Attendance, attendance_id)
-        if not attendance:
+        filters = _by_id(attendance_id, attendance_date)
+        previous = self.session.exec(
+            select(Attendance.status).filter_by(**filters).with_for_update()
+        ).first()
+        if previous is None:
             return None
-        attendance.status = status
+        values = {"status": status}
         if remarks:
-            attendance.remarks = remarks
+            values["remarks"] = remarks
+        updated = self.session.exec(self._update(filters, values)).scalars().first()
+        deltas = _status_deltas(previous, status)
+        if deltas:
+            self.session.exec(_rollup_delta(self._dialect, updated, deltas))
+        self._commit()
+        return updated
+
+    def reconcile_rollups(self, start_date: date, end_date: date) -> int:
+        """Recount the rollups from start_date to end_date; return the rows repaired."""
+        conn = self.session.connection()
+        locking, repairing = _reconcile_rollups(self._dialect, start_date, end_date)
+        for statement in locking:
+            conn.execute(statement)
+        repaired = sum(conn.execute(statement).rowcount for statement in repairing)
+        self._commit()
+        return repaired
+
+    def has_rollups(self) -> bool:
+        return self.session.exec(select(AttendanceRollup.cds_group).limit(1)).first() is not None
+
+    def get_attendance_dates(self) -> Tuple[Optional[date], Optional[date]]:
+        """Dates of the oldest and newest attendance records."""
+        return self.session.exec(_attendance_dates()).one()
+
+    def get_group_summary(
+        self, cds_group: str, start_date: date, end_date: date
+    ) -> List[AttendanceRollup]:
+        return self.session.exec(_group_summary(cds_group, start_date, end_date)).all()
+
+    def get_zone_summary(
+        self, start_date: date, end_date: date, zone: Optional[str] = None
+    ) -> List[Any]:
+        return self.session.exec(_zone_summary(start_date, end_date, zone)).all()
+
+
+class AsyncAttendanceRepository(AsyncBaseRepository[Attendance]):
+    """AttendanceRepository on an AsyncSession."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, Attendance)
+
+    @property
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    async def get_by_id(self, id: UUID) -> Optional[Attendance]:
+        # The primary key is (id, attendance_date), so session.get needs both
+        return await self.get_attendance_by_id(id)
+
+    async def get_attendance_by_corper(
+        self,
+        corper_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include: Include = None,
+    ) -> List[Attendance]:
+        return (
+            await self.session.exec(
+                self._include(
+                    select(Attendance)
+                    .where(Attendance.corper_id == corper_id)
+                    .where(_in_window(start_date, end_date)),
+                    include,
+                )
+            )
+        ).all()
+
+    async def get_attendance_by_date(
+        self, cds_group: str, target_date: date, include: Include = None
+    ) -> List[Attendance]:
+        return (
+            await self.session.exec(
+                self._include(
+                    select(Attendance)
+                    .where(Attendance.cds_group == cds_group)
+                    .where(Attendance.attendance_date == target_date),
+                    include,
+                )
+            )
+        ).all()
+
+    async def get_attendance_page_by_corper(
+        self,
+        corper_id: UUID,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include: Include = None,
+    ) -> Page:
+        statement = self._keyset(
+            self._include(
+                select(Attendance)
+                .where(Attendance.corper_id == corper_id)
+                .where(_in_window(start_date, end_date)),
+                include,
+            ),
+            limit,
+            cursor,
+        )
+        return self._page((await self.session.exec(statement)).all(), limit)
+
+    async def get_attendance_page_by_date(
+        self,
+        cds_group: str,
+        target_date: date,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include: Include = None,
+    ) -> Page:
+        statement = self._keyset(
+            self._include(
+                select(Attendance)
+                .where(Attendance.cds_group == cds_group)
+                .where(Attendance.attendance_date == target_date),
+                include,
+            ),
+            limit,
+            cursor,
+        )
+        return self._page((await self.session.exec(statement)).all(), limit)
+
+    async def stream_attendance(
+        self,
+        start_date: date,
+        end_date: date,
+        cds_group: Optional[str] = None,
+        batch_size: int = settings.ATTENDANCE_EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Batches of EXPORT_COLUMNS rows from start_date to end_date."""
+        result = await self.session.stream(_export(start_date, end_date, cds_group, batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def create_attendance(self, attendance: Attendance) -> Attendance:
         self.session.add(attendance)
-        self.session.commit()
-        self.session.refresh(attendance)
+        await self.session.flush()
+        await self.session.exec(_rollup_delta(self._dialect, attendance, {attendance.status: 1}))
+        await self._commit()
+        await self.session.refresh(attendance)
         return attendance
+
+    async def get_attendance_by_id(
+        self,
+        attendance_id: UUID,
+        attendance_date: Optional[date] = None,
+        include: Include = None,
+    ) -> Optional[Attendance]:
+        statement = self._include(
+            select(Attendance).filter_by(**_by_id(attendance_id, attendance_date)), include
+        )
+        return (await self.session.exec(statement)).first()
+
+    async def update_attendance_status(
+        self,
+        attendance_id: UUID,
+        status: str,
+        remarks: Optional[str] = None,
+        attendance_date: Optional[date] = None,
+    ) -> Optional[Attendance]:
+        filters = _by_id(attendance_id, attendance_date)
+        previous = (
+            await self.session.exec(
+                select(Attendance.status).filter_by(**filters).with_for_update()
+            )
+        ).first()
+        if previous is None:
+            return None
+        values = {"status": status}
+        if remarks:
+            values["remarks"] = remarks
+        updated = (await self.session.exec(self._update(filters, values))).scalars().first()
+        deltas = _status_deltas(previous, status)
+        if deltas:
+            await self.session.exec(_rollup_delta(self._dialect, updated, deltas))
+        await self._commit()
+        return updated
+
+    async def reconcile_rollups(self, start_date: date, end_date: date) -> int:
+        """Recount the rollups from start_date to end_date; return the rows repaired."""
+        conn = await self.session.connection()
+        locking, repairing = _reconcile_rollups(self._dialect, start_date, end_date)
+        for statement in locking:
+            await conn.execute(statement)
+        repaired = 0
+        for statement in repairing:
+            repaired += (await conn.execute(statement)).rowcount
+        await self._commit()
+        return repaired
+
+    async def has_rollups(self) -> bool:
+        statement = select(AttendanceRollup.cds_group).limit(1)
+        return (await self.session.exec(statement)).first() is not None
+
+    async def get_attendance_dates(self) -> Tuple[Optional[date], Optional[date]]:
+        """Dates of the oldest and newest attendance records."""
+        return (await self.session.exec(_attendance_dates())).one()
+
+    async def get_group_summary(
+        self, cds_group: str, start_date: date, end_date: date
+    ) -> List[AttendanceRollup]:
+        return (await self.session.exec(_group_summary(cds_group, start_date, end_date))).all()
+
+    async def get_zone_summary(
+        self, start_date: date, end_date: date, zone: Optional[str] = None
+    ) -> List[Any]:
+        return (await self.session.exec(_zone_summary(start_date, end_date, zone))).all()
@@ -1,67 +1,294 @@
-from typing import Generic, Optional, Type, TypeVar, List
+from datetime import date, datetime
+from typing import Any, Dict, Generic, Iterable, Iterator, Optional, Sequence, Tuple, Type, TypeVar, List
 from uuid import UUID
 
 from sqlmodel import Session, SQLModel, select
-from sqlalchemy import func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.sqltypes import GUID
+from sqlalchemy import delete, func, insert, inspect, literal, tuple_, update
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.config.database import staged
+from app.utils.pagination import decode_cursor, encode_cursor
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 
+Page = Tuple[List[ModelType], Optional[str]]  # (rows, cursor of the next page)
+
+# Relationship paths to load with the rows, e.g. ("corper.corper_profile",)
+Include = Optional[Iterable[str]]
+
+
+def eager_options(model: Type[SQLModel], include: Include) -> List[Any]:
+    """Loader options for the relationship paths of an include spec.
+
+    To-one relationships are joined into the query (joinedload), collections
+    are read with one more ``SELECT ... WHERE ... IN`` (selectinload). Raises
+    ValueError for a name that is not a relationship.
+    """
+    options = []
+    for path in include or ():
+        option, current = None, model
+        for name in path.split("."):
+            relationship = inspect(current).relationships.get(name)
+            if relationship is None:
+                raise ValueError(f"{current.__name__} has no relationship {name!r}")
+            loader = selectinload if relationship.uselist else joinedload
+            attribute = getattr(current, name)
+            option = loader(attribute) if option is None else getattr(option, loader.__name__)(attribute)
+            current = relationship.mapper.class_
+        options.append(option)
+    return options
+
+
+class EagerLoadMixin:
+    """Relationships named by an include spec are loaded with the rows.
+
+    Without one, each relationship is loaded lazily on first access: one
+    SELECT per row serialized, which a list endpoint multiplies by its length.
+    """
+
+    def _include(self, statement: Any, include: Include) -> Any:
+        options = eager_options(self.model, include)
+        return statement.options(*options) if options else statement
+
+
+# Cursor values that arrive as strings, parsed by the type of their column
+_CURSOR_PARSERS = {UUID: UUID, datetime: datetime.fromisoformat, date: date.fromisoformat}
+
+
+def cursor_value(value: Any, column: Any) -> Any:
+    """A decoded cursor value as the python type of its sort key column.
+
+    Raises ValueError when it is not one, rather than binding it as a
+    literal the database rejects or compares as something else.
+    """
+    python_type = UUID if isinstance(column.type, GUID) else column.type.python_type
+    if isinstance(value, str) and python_type in _CURSOR_PARSERS:
+        value = _CURSOR_PARSERS[python_type](value)
+    # Exact type: a datetime is also a date and a bool an int
+    if type(value) is not python_type:
+        raise ValueError(f"Invalid cursor value for {column.key}")
+    if isinstance(value, datetime) and (value.tzinfo is not None) != column.type.timezone:
+        raise ValueError(f"Invalid cursor value for {column.key}")
+    return value
+
+
+class KeysetMixin:
+    """Keyset (cursor) pagination on a unique, indexed sort key.
+
+    Pages are read with ``WHERE (sort key) > (last row's key) ORDER BY sort
+    key LIMIT n``, so every page costs the same however deep it is, unlike
+    OFFSET which scans and discards every skipped row. A cursor that does not
+    match the sort key raises ValueError, which services turn into a 400.
+    """
+
+    # Columns of the model to page by; must end in a unique column.
+    sort_key: Tuple[str, ...] = ("created_at", "id")
+
+    def _keyset(self, statement: Any, limit: int, cursor: Optional[str]) -> Any:
+        columns = [getattr(self.model, name) for name in self.sort_key]
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(columns):
+                raise ValueError("Invalid cursor")
+            values = [cursor_value(v, c) for v, c in zip(values, columns)]
+            statement = statement.where(
+                tuple_(*columns)
+                > tuple_(*(literal(v, type_=c.type) for v, c in zip(values, columns)))
+            )
+        return statement.order_by(*columns).limit(limit + 1)
+
+    def _page(self, rows: Sequence[ModelType], limit: int) -> Page:
+        rows = list(rows)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor([getattr(rows[-1], name) for name in self.sort_key])
+
+
+def _chunks(rows: List[Dict[str, Any]], size: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    size = size or len(rows) or 1
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class SetBasedMixin:
+    """Writes as single statements with RETURNING.
+
+    ``create_many``, ``update``, ``update_where`` and ``delete`` each send one
+    INSERT/UPDATE/DELETE (one per chunk for chunked inserts) and read the
+    affected rows back from its RETURNING clause, instead of loading every
+    row first and refreshing it after the commit.
+    """
+
+    def _values(self, obj_in: Dict[str, Any]) -> Dict[str, Any]:
+        columns = self.model.__table__.columns
+        return {field: value for field, value in obj_in.items() if field in columns}
+
+    def _insert_rows(self, objects: List[ModelType]) -> List[Dict[str, Any]]:
+        # Dump the models so their default factories (id, timestamps) apply.
+        return [obj.model_dump() for obj in objects]
+
+    def _insert(self) -> Any:
+        return insert(self.model).returning(self.model, sort_by_parameter_order=True)
+
+    def _update(self, filters: Dict[str, Any], values: Dict[str, Any]) -> Any:
+        return update(self.model).filter_by(**filters).values(**values).returning(self.model)
+
+    def _delete(self, filters: Dict[str, Any]) -> Any:
+        return delete(self.model).filter_by(**filters).returning(self.model.id)
 
-class BaseRepository(Generic[ModelType]):
+
+class BaseRepository(KeysetMixin, SetBasedMixin, EagerLoadMixin, Generic[ModelType]):
     def __init__(self, session: Session, model: Type[ModelType]):
         self.session = session
         self.model = model
 
+    def _commit(self) -> None:
+        """Commit, or only flush when a unit of work owns the transaction."""
+        if staged(self.session):
+            self.session.flush()
+        else:
+            self.session.commit()
+
     def get_by_id(self, id: UUID) -> Optional[ModelType]:
         statement = select(self.model).where(self.model.id == id)
         return self.session.exec(statement).first()
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        """Deprecated: OFFSET paging, use get_page."""
         statement = select(self.model).offset(skip).limit(limit)
         return self.session.exec(statement).all()
 
+    def get_page(self, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        """Get one page in sort_key order and the cursor of the next one."""
+        statement = self._keyset(select(self.model), limit, cursor)
+        return self._page(self.session.exec(statement).all(), limit)
+
     def get_count(self) -> int:
         statement = select(func.count()).select_from(self.model)
         return self.session.exec(statement).first()
 
     def create(self, obj_in: ModelType) -> ModelType:
         self.session.add(obj_in)
-        self.session.commit()
+        self._commit()
         self.session.refresh(obj_in)
         return obj_in
 
-    def create_many(self, objects: List[ModelType]) -> List[ModelType]:
-        self.session.add_all(objects)
-        self.session.commit()
-        for obj in objects:
-            self.session.refresh(obj)
-        return objects
+    def create_many(
+        self, objects: List[ModelType], chunk_size: Optional[int] = None
+    ) -> List[ModelType]:
+        """Insert objects with INSERT ... RETURNING and return the stored rows.
 
-    def update(self, id: UUID, obj_in: dict) -> Optional[ModelType]:
-        statement = select(self.model).where(self.model.id == id)
-        obj = self.session.exec(statement).first()
-        if not obj:
-            return None
+        With chunk_size, each chunk is inserted and committed on its own so a
+        large batch never holds one long transaction; chunks committed before
+        a failure stay committed. Inside a unit of work chunks are only
+        flushed: the whole batch commits, or rolls back, with the request.
+        """
+        created: List[ModelType] = []
+        for rows in _chunks(self._insert_rows(objects), chunk_size):
+            created.extend(self.session.exec(self._insert(), params=rows).scalars().all())
+            self._commit()
+        return created
 
-        for field, value in obj_in.items():
-            if hasattr(obj, field):
-                setattr(obj, field, value)
+    def update(self, id: UUID, obj_in: dict) -> Optional[ModelType]:
+        updated = self.update_where({"id": id}, obj_in)
+        return updated[0] if updated else None
 
-        self.session.add(obj)
-        self.session.commit()
-        self.session.refresh(obj)
-        return obj
+    def update_where(self, filters: Dict[str, Any], values: dict) -> List[ModelType]:
+        """Set values on every row matching the equality filters; return those rows."""
+        values = self._values(values)
+        if not values:
+            statement = select(self.model).filter_by(**filters)
+            return self.session.exec(statement).all()
+        rows = self.session.exec(self._update(filters, values)).scalars().all()
+        self._commit()
+        return rows
 
     def delete(self, id: UUID) -> bool:
-        statement = select(self.model).where(self.model.id == id)
-        obj = self.session.exec(statement).first()
-        if not obj:
-            return False
-
-        self.session.delete(obj)
-        self.session.commit()
-        return True
+        deleted = self.session.exec(self._delete({"id": id})).scalar_one_or_none()
+        self._commit()
+        return deleted is not None
 
     def exists(self, id: UUID) -> bool:
         statement = select(func.count()).select_from(self.model).where(self.model.id == id)
-        return self.session.exec(statement).first() > 0 
\ No newline at end of file
+        return self.session.exec(statement).first() > 0
+
+
+class AsyncBaseRepository(KeysetMixin, SetBasedMixin, EagerLoadMixin, Generic[ModelType]):
+    """BaseRepository on an AsyncSession; every query awaits instead of blocking."""
+
+    def __init__(self, session: AsyncSession, model: Type[ModelType]):
+        self.session = session
+        self.model = model
+
+    async def _commit(self) -> None:
+        """Commit, or only flush when a unit of work owns the transaction."""
+        if staged(self.session):
+            await self.session.flush()
+        else:
+            await self.session.commit()
+
+    async def get_by_id(self, id: UUID) -> Optional[ModelType]:
+        return await self.session.get(self.model, id)
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        """Deprecated: OFFSET paging, use get_page."""
+        statement = select(self.model).offset(skip).limit(limit)
+        return (await self.session.exec(statement)).all()
+
+    async def get_page(self, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        """Get one page in sort_key order and the cursor of the next one."""
+        statement = self._keyset(select(self.model), limit, cursor)
+        return self._page((await self.session.exec(statement)).all(), limit)
+
+    async def get_count(self) -> int:
+        statement = select(func.count()).select_from(self.model)
+        return (await self.session.exec(statement)).one()
+
+    async def create(self, obj_in: ModelType) -> ModelType:
+        self.session.add(obj_in)
+        await self._commit()
+        await self.session.refresh(obj_in)
+        return obj_in
+
+    async def create_many(
+        self, objects: List[ModelType], chunk_size: Optional[int] = None
+    ) -> List[ModelType]:
+        """Insert objects with INSERT ... RETURNING and return the stored rows.
+
+        With chunk_size, each chunk is inserted and committed on its own so a
+        large batch never holds one long transaction; chunks committed before
+        a failure stay committed. Inside a unit of work chunks are only
+        flushed: the whole batch commits, or rolls back, with the request.
+        """
+        created: List[ModelType] = []
+        for rows in _chunks(self._insert_rows(objects), chunk_size):
+            result = await self.session.exec(self._insert(), params=rows)
+            created.extend(result.scalars().all())
+            await self._commit()
+        return created
+
+    async def update(self, id: UUID, obj_in: dict) -> Optional[ModelType]:
+        updated = await self.update_where({"id": id}, obj_in)
+        return updated[0] if updated else None
+
+    async def update_where(self, filters: Dict[str, Any], values: dict) -> List[ModelType]:
+        """Set values on every row matching the equality filters; return those rows."""
+        values = self._values(values)
+        if not values:
+            statement = select(self.model).filter_by(**filters)
+            return (await self.session.exec(statement)).all()
+        rows = (await self.session.exec(self._update(filters, values))).scalars().all()
+        await self._commit()
+        return rows
+
+    async def delete(self, id: UUID) -> bool:
+        deleted = (await self.session.exec(self._delete({"id": id}))).scalar_one_or_none()
+        await self._commit()
+        return deleted is not None
+
+    async def exists(self, id: UUID) -> bool:
+        statement = select(func.count()).select_from(self.model).where(self.model.id == id)
+        return (await self.session.exec(statement)).one() > 0
@@ -1,42 +1,103 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from uuid import UUID
 
 from sqlmodel import Session, select, and_, or_
-from sqlalchemy import func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, union
 
-from app.models.user import User
-from app.repositories.base import BaseRepository
+from app.config.database import after_commit
+from app.core.principal_cache import principal_cache
+from app.models.user import CorperProfile, User
+from app.repositories.base import AsyncBaseRepository, BaseRepository, Page
+
+# Columns matched by search(); each has a trigram index
+USER_SEARCH_COLUMNS = (User.email, User.full_name)
+PROFILE_SEARCH_COLUMNS = (
+    CorperProfile.call_up_number,
+    CorperProfile.state_code,
+    CorperProfile.cds_group,
+)
+
+
+def _contains_pattern(query: str) -> str:
+    """ILIKE pattern matching query anywhere, its own wildcards escaped."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 
 class UserRepository(BaseRepository[User]):
     def __init__(self, session: Session):
         super().__init__(session, User)
 
+    @staticmethod
+    def _search_statement(query: str):
+        search_term = f"%{query}%"
+        return select(User).where(
+            and_(
+                User.is_active == True,
+                or_(User.email.ilike(search_term), User.full_name.ilike(search_term)),
+            )
+        )
+
+    @staticmethod
+    def _ranked_search_statement(query: str, limit: int):
+        """Active users matching query, best match first.
+
+        Each branch of the UNION is a substring match served by one trigram
+        index, so candidates come from index lookups rather than a scan of
+        user, and only they are ranked by trigram similarity.
+        """
+        term = _contains_pattern(query)
+        matches = [
+            select(User.id).where(column.ilike(term, escape="\\"))
+            for column in USER_SEARCH_COLUMNS
+        ] + [
+            select(CorperProfile.user_id).where(column.ilike(term, escape="\\"))
+            for column in PROFILE_SEARCH_COLUMNS
+        ]
+        candidates = union(*matches).subquery()
+        score = func.greatest(
+            *(func.similarity(column, query) for column in USER_SEARCH_COLUMNS + PROFILE_SEARCH_COLUMNS)
+        ).label("score")
+        return (
+            select(User, CorperProfile, score)
+            .join(candidates, candidates.c.id == User.id)
+            .outerjoin(CorperProfile, CorperProfile.user_id == User.id)
+            .where(User.is_active == True)
+            .order_by(score.desc(), User.id)
+            .limit(limit)
+        )
+
     def get_by_email(self, email: str) -> Optional[User]:
         statement = select(User).where(User.email == email)
         return self.session.exec(statement).first()
 
+    def search(
+        self, query: str, limit: int = 20
+    ) -> List[Tuple[User, Optional[CorperProfile], float]]:
+        """Rank users and corper profiles against query (pg_trgm)."""
+        return self.session.exec(self._ranked_search_statement(query, limit)).all()
+
     def get_active_users(self, skip: int = 0, limit: int = 100) -> List[User]:
+        """Deprecated: OFFSET paging, use get_active_users_page."""
         statement = select(User).where(User.is_active == True).offset(skip).limit(limit)
         return self.session.exec(statement).all()
 
     def search_users(self, query: str, skip: int = 0, limit: int = 100) -> List[User]:
-        search_term = f"%{query}%"
-        statement = (
-            select(User)
-            .where(
-                and_(
-                    User.is_active == True,
-                    or_(
-                        User.email.ilike(search_term), User.full_name.ilike(search_term)
-                    ),
-                )
-            )
-            .offset(skip)
-            .limit(limit)
-        )
+        """Deprecated: OFFSET paging, use search_users_page."""
+        statement = self._search_statement(query).offset(skip).limit(limit)
         return self.session.exec(statement).all()
 
+    def get_active_users_page(self, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        statement = self._keyset(select(User).where(User.is_active == True), limit, cursor)
+        return self._page(self.session.exec(statement).all(), limit)
+
+    def search_users_page(
+        self, query: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        statement = self._keyset(self._search_statement(query), limit, cursor)
+        return self._page(self.session.exec(statement).all(), limit)
+
     def get_active_user_count(self) -> int:
         statement = select(func.count()).select_from(User).where(User.is_active == True)
         return self.session.exec(statement).first()
@@ -65,3 +126,83 @@ class UserRepository(BaseRepository[User]):
 
     def update_user(self, id: UUID, user_data: dict) -> Optional[User]:
         return self.update(id, user_data)
+
+
+class AsyncUserRepository(AsyncBaseRepository[User]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, User)
+
+    _search_statement = staticmethod(UserRepository._search_statement)
+    _ranked_search_statement = staticmethod(UserRepository._ranked_search_statement)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        statement = select(User).where(User.email == email)
+        return (await self.session.exec(statement)).first()
+
+    async def search(
+        self, query: str, limit: int = 20
+    ) -> List[Tuple[User, Optional[CorperProfile], float]]:
+        """Rank users and corper profiles against query (pg_trgm)."""
+        return (await self.session.exec(self._ranked_search_statement(query, limit))).all()
+
+    async def get_active_users(self, skip: int = 0, limit: int = 100) -> List[User]:
+        """Deprecated: OFFSET paging, use get_active_users_page."""
+        statement = select(User).where(User.is_active == True).offset(skip).limit(limit)
+        return (await self.session.exec(statement)).all()
+
+    async def search_users(self, query: str, skip: int = 0, limit: int = 100) -> List[User]:
+        """Deprecated: OFFSET paging, use search_users_page."""
+        statement = self._search_statement(query).offset(skip).limit(limit)
+        return (await self.session.exec(statement)).all()
+
+    async def get_active_users_page(self, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        statement = self._keyset(select(User).where(User.is_active == True), limit, cursor)
+        return self._page((await self.session.exec(statement)).all(), limit)
+
+    async def search_users_page(
+        self, query: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        statement = self._keyset(self._search_statement(query), limit, cursor)
+        return self._page((await self.session.exec(statement)).all(), limit)
+
+    async def get_active_user_count(self) -> int:
+        statement = select(func.count()).select_from(User).where(User.is_active == True)
+        return (await self.session.exec(statement)).one()
+
+    async def create_user(
+        self,
+        email: str,
+        hashed_password: str,
+        role: str,
+        address: str,
+        phone: str,
+        full_name: Optional[str] = None,
+    ) -> User:
+        user = User(
+            email=email,
+            password=hashed_password,
+            full_name=full_name,
+            role=role,
+            address=address,
+            phone=phone,
+        )
+        return await self.create(user)
+
+    async def update_user(self, id: UUID, user_data: dict) -> Optional[User]:
+        return await self.update(id, user_data)
+
+    # Every update and delete goes through these, so the cached principals
+    # of the affected users are invalidated once the change is committed.
+    # Changes to users belong here: the blocking UserRepository does not
+    # invalidate them.
+    async def update_where(self, filters: Dict[str, Any], values: dict) -> List[User]:
+        users = await super().update_where(filters, values)
+        user_ids = [user.id for user in users]
+        await after_commit(self.session, lambda: principal_cache.invalidate(user_ids))
+        return users
+
+    async def delete(self, id: UUID) -> bool:
+        deleted = await super().delete(id)
+        if deleted:
+            await after_commit(self.session, lambda: principal_cache.invalidate([id]))
+        return deleted
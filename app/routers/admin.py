@@ -1,10 +1,20 @@
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from locust import User
-from sqlmodel import Session
 
+from app.config.database import UnitOfWork, engines, get_unit_of_work
+from app.core.metrics import metrics
+from app.core.principal_cache import principal_cache
 from app.core.rbac import require_permission
-from app.db.session import get_session
 from app.dependencies.auth import get_current_user
+from app.schemas.user import UserPrincipal
+from app.schemas.admin import (
+    OFFICER_INCLUDE,
+    OfficerResponse,
+    SessionRevokeRequest,
+    SessionRevokeResponse,
+)
+from app.services.admin import AdminService
 
 
 router = APIRouter()
@@ -12,9 +22,9 @@ router = APIRouter()
 
 @router.post("/officers")
 async def create_officer(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     _: bool = Depends(require_permission("create:officer")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
@@ -22,13 +32,60 @@ async def create_officer(
     )
 
 
+@router.get("/officers", response_model=List[OfficerResponse])
+async def list_officers(
+    _: bool = Depends(require_permission("read:all_profiles")),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+):
+    """List every officer with their profile."""
+    admin_service = AdminService(uow.session)
+    return await admin_service.get_all_officers(include=OFFICER_INCLUDE)
+
+
 @router.post("/assign-secretary")
 async def assign_secretary(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     _: bool = Depends(require_permission("assign:general_secretary")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
         detail="This endpoint is not implemented yet.",
     )
+
+
+@router.post("/sessions/revoke", response_model=SessionRevokeResponse)
+async def revoke_sessions(
+    revoke_data: SessionRevokeRequest,
+    _: bool = Depends(require_permission("update:user_status")),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+):
+    """Log out every session of the given users and/or a whole CDS group."""
+    admin_service = AdminService(uow.session)
+    return await admin_service.revoke_sessions(
+        revoke_data.user_ids, revoke_data.cds_group
+    )
+
+
+@router.get("/metrics")
+async def get_metrics(
+    _: bool = Depends(require_permission("read:metrics")),
+):
+    """Get this worker's in-process metrics (caches, pools, queues)."""
+    return metrics.snapshot()
+
+
+@router.get("/db/pool")
+async def get_pool_stats(
+    _: bool = Depends(require_permission("read:metrics")),
+):
+    """Get live connection pool statistics for this worker."""
+    return engines.pool_stats()
+
+
+@router.get("/auth/principal-cache")
+async def get_principal_cache_stats(
+    _: bool = Depends(require_permission("read:metrics")),
+):
+    """Get this worker's principal cache statistics, including how often auth hit the database."""
+    return principal_cache.stats()
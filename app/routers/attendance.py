@@ -1,61 +1,147 @@
-from fastapi import APIRouter, Depends
-from locust import User
-from sqlmodel import Session
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from app.core.rbac import require_permission
-from app.db.session import get_session
+from app.config.database import (
+    UnitOfWork,
+    engines,
+    get_unit_of_work,
+    route_request,
+)
 from app.dependencies.auth import get_current_user
-from app.services.attendance import AttendanceService
+from app.schemas.attendance import (
+    ATTENDANCE_RECORD_INCLUDE,
+    AttendanceRecord,
+    GroupAttendanceSummary,
+    ZoneAttendanceSummary,
+)
+from app.schemas.user import UserPrincipal
+from app.services.attendance import (
+    AttendanceExportService,
+    AttendanceService,
+    AttendanceSummaryService,
+)
 
 
 router = APIRouter()
 
 
-@router.get("/me")
+@router.get("/me", response_model=List[AttendanceRecord])
 async def view_own_attendance(
-    current_user: User = Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: UserPrincipal = Depends(get_current_user),
     _: bool = Depends(require_permission("read:own_attendance")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
-    """View own attendance."""
-    attendance_service = AttendanceService(session)
-    return await attendance_service.get_attendance_by_corper(current_user.id)
+    """View own attendance from start_date to end_date.
+
+    end_date defaults to today and start_date to ATTENDANCE_QUERY_WINDOW_DAYS
+    before it; earlier records are reached by passing older dates.
+    """
+    attendance_service = AttendanceService(uow.session)
+    return await attendance_service.get_corper_attendance(
+        current_user.id, start_date, end_date, include=ATTENDANCE_RECORD_INCLUDE
+    )
 
 
-@router.get("/group")
+@router.get("/summary", response_model=List[GroupAttendanceSummary])
+async def view_group_attendance_summary(
+    cds_group: str = Query(..., min_length=1),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    _: bool = Depends(require_permission("read:attendance_summary")),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+):
+    """Status counts of a CDS group for each day from start_date to end_date.
+
+    Both dates default to today. Served from the daily rollups, so the
+    latency does not depend on the size of the group.
+    """
+    summary_service = AttendanceSummaryService(uow.session)
+    return await summary_service.get_group_summary(cds_group, start_date, end_date)
+
+
+@router.get("/summary/zones", response_model=List[ZoneAttendanceSummary])
+async def view_zone_attendance_summary(
+    zone: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    _: bool = Depends(require_permission("read:attendance_summary")),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+):
+    """Status counts per zone for each day from start_date to end_date."""
+    summary_service = AttendanceSummaryService(uow.session)
+    return await summary_service.get_zone_summary(start_date, end_date, zone)
+
+
+@router.get("/group", response_model=List[AttendanceRecord])
 async def view_assigned_group_attendance(
-    current_user: User = Depends(get_current_user),
+    cds_group: str = Query(..., min_length=1),
+    attendance_date: Optional[date] = None,
     _: bool = Depends(require_permission("read:assigned_attendance")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
-    """View CDS group attendance."""
-    attendance_service = AttendanceService(session)
-    return await attendance_service.get_attendance_by_date(
-        cds_group=current_user.cds_group, target_date=current_user.attendance_date
+    """View CDS group attendance on attendance_date, today by default."""
+    attendance_service = AttendanceService(uow.session)
+    return await attendance_service.get_group_attendance_by_date(
+        cds_group=cds_group,
+        target_date=attendance_date or date.today(),
+        include=ATTENDANCE_RECORD_INCLUDE,
     )
 
 
-@router.get("/all")
+@router.get("/all", response_model=List[AttendanceRecord])
 async def view_all_attendance(
-    current_user: User = Depends(get_current_user),
+    cds_group: str = Query(..., min_length=1),
+    attendance_date: Optional[date] = None,
     _: bool = Depends(require_permission("read:all_attendance")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
-    """View all attendance."""
-    attendance_service = AttendanceService(session)
+    """View all attendance of a CDS group on attendance_date, today by default."""
+    attendance_service = AttendanceService(uow.session)
     return await attendance_service.get_group_attendance_by_date(
-        cds_group=current_user.cds_group, target_date=current_user.attendance_date
+        cds_group=cds_group,
+        target_date=attendance_date or date.today(),
+        include=ATTENDANCE_RECORD_INCLUDE,
+    )
+
+
+@router.get("/export")
+async def export_all_attendance(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cds_group: Optional[str] = Query(None, min_length=1),
+    _: bool = Depends(require_permission("read:all_attendance")),
+    route: str = Depends(route_request),
+):
+    """Export attendance records from start_date to end_date, streamed.
+
+    end_date defaults to today and start_date to ATTENDANCE_QUERY_WINDOW_DAYS
+    before it. Rows are read through a server-side cursor and sent a batch
+    at a time, so memory use does not depend on the size of the export.
+    """
+    export_service = AttendanceExportService(engines.async_engine(route))
+    chunks = export_service.export(export_format, start_date, end_date, cds_group)
+    return StreamingResponse(
+        chunks,
+        media_type=AttendanceExportService.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="attendance.{export_format}"'},
     )
 
 
 @router.post("/mark")
 async def view_assigned_group_attendance(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     _: bool = Depends(require_permission("mark:attendance")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     """."""
-    attendance_service = AttendanceService(session)
+    attendance_service = AttendanceService(uow.session)
     return await attendance_service.mark_attendance_status(
         attendance_id=current_user.attendance_id,
         status=current_user.status,
@@ -1,3 +1,5 @@
+from typing import List
+
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
@@ -10,6 +12,7 @@ from app.schemas.auth import (
     Token,
     TokenRefresh,
     RefreshRequest,
+    SessionResponse,
 )
 from app.services.auth import AuthService
 from app.dependencies.auth import get_current_user_id
@@ -61,3 +64,12 @@ async def logout_all(
 ):
     auth_service = AuthService(session)
     return await auth_service.logout_all(current_user_id)
+
+
+@router.get("/sessions", response_model=List[SessionResponse])
+async def list_sessions(
+    current_user_id: UUID = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    auth_service = AuthService(session)
+    return await auth_service.list_sessions(current_user_id)
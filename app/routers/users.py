@@ -1,13 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 
-from app.config.database import get_session
+from app.config.database import UnitOfWork, get_unit_of_work
 from app.core.rbac import require_permission
 from app.dependencies.auth import get_current_user
-from app.models.user import User
-from app.schemas.user import UserResponse, UserUpdate
+from app.schemas.user import UserPrincipal, UserResponse, UserSearchResult, UserUpdate
 from app.services.users import UserService
+from app.utils.pagination import set_next_link
 
 
 router = APIRouter()
@@ -15,22 +14,22 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     _: bool = Depends(require_permission("read:own_profile")),
 ):
-    """Get current user's profile."""
+    """Get current user's profile (from the principal cache, see get_current_user)."""
     return current_user
 
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     _: bool = Depends(require_permission("update:own_profile")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     """Update current user's profile."""
-    user_service = UserService(session)
+    user_service = UserService(uow.session)
     return await user_service.update_user(
         current_user.id, user_data.model_dump(exclude_unset=True)
     )
@@ -38,14 +37,40 @@ async def update_current_user_profile(
 
 @router.get("/", response_model=List[UserResponse])
 async def list_users(
-    skip: int = 0,
+    request: Request,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: Optional[int] = Query(None, deprecated=True, description="Use cursor instead"),
     _: bool = Depends(require_permission("read:all_profiles")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
-    """List all users (requires read:all_profiles permission)."""
-    user_service = UserService(session)
-    return await user_service.get_all_users(skip, limit)
+    """List all users (requires read:all_profiles permission).
+
+    Pages are linked by cursor: follow the ``Link: rel="next"`` header.
+    """
+    user_service = UserService(uow.session)
+    if skip is not None:
+        return await user_service.get_all_users(skip, limit)
+    users, next_cursor = await user_service.get_users_page(limit, cursor)
+    set_next_link(request, response, next_cursor)
+    return users
+
+
+@router.get("/search", response_model=List[UserSearchResult])
+async def search_users(
+    q: str = Query(..., min_length=3, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    _: bool = Depends(require_permission("read:all_profiles")),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+):
+    """Search users by email, name, call-up number, state code or CDS group.
+
+    Results are ranked by trigram similarity, best match first. Queries need
+    at least three characters, the shortest a trigram index can serve.
+    """
+    user_service = UserService(uow.session)
+    return await user_service.search_users(q, limit)
 
 
 @router.get("/assigned")
@@ -53,7 +78,7 @@ async def list_users(
     skip: int = 0,
     limit: int = 100,
     _: bool = Depends(require_permission("read:assigned_corper")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     # throw unimplemented error
     raise HTTPException(
@@ -66,8 +91,8 @@ async def list_users(
 async def get_user(
     user_id: str,
     _: bool = Depends(require_permission("read:all_profiles")),
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     """Get a specific user's profile (requires read:all_profiles permission)."""
-    user_service = UserService(session)
+    user_service = UserService(uow.session)
     return await user_service.get_user_by_id(user_id)
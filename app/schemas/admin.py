@@ -0,0 +1,38 @@
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class SessionRevokeRequest(BaseModel):
+    user_ids: List[UUID] = []
+    cds_group: Optional[str] = None
+
+
+class SessionRevokeResponse(BaseModel):
+    users: int
+    sessions_revoked: int
+
+
+class OfficerProfileResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    designation: str
+    phone_number: Optional[str] = None
+    zone: Optional[str] = None
+
+
+class OfficerResponse(BaseModel):
+    """An officer with their profile, which OFFICER_INCLUDE loads with the rows."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    email: str
+    full_name: Optional[str] = None
+    is_active: bool
+    officer_profile: Optional[OfficerProfileResponse] = None
+
+
+# Include spec (see EagerLoadMixin) for the relationships of OfficerResponse
+OFFICER_INCLUDE = ("officer_profile",)
@@ -0,0 +1,67 @@
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AttendanceCounts(BaseModel):
+    present: int
+    absent: int
+    late: int
+    excused: int
+    total: int
+
+
+class GroupAttendanceSummary(AttendanceCounts):
+    cds_group: str
+    attendance_date: date
+    zone: Optional[str] = None
+    updated_at: datetime
+
+
+class ZoneAttendanceSummary(AttendanceCounts):
+    zone: Optional[str] = None
+    attendance_date: date
+    groups: int
+
+
+class AttendanceUser(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    full_name: Optional[str] = None
+
+
+class AttendanceCorperProfile(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    call_up_number: str
+    state_code: str
+
+
+class AttendanceCorper(AttendanceUser):
+    corper_profile: Optional[AttendanceCorperProfile] = None
+
+
+class AttendanceRecord(BaseModel):
+    """An attendance record with its corper and the officer who marked it.
+
+    Read from the relationships ATTENDANCE_RECORD_INCLUDE loads with the rows.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    cds_group: str
+    attendance_date: date
+    check_in_time: datetime
+    check_out_time: Optional[datetime] = None
+    status: str
+    remarks: Optional[str] = None
+    corper: Optional[AttendanceCorper] = None
+    officer: Optional[AttendanceUser] = None
+
+
+# Include spec (see EagerLoadMixin) for the relationships of AttendanceRecord
+ATTENDANCE_RECORD_INCLUDE = ("corper.corper_profile", "officer")
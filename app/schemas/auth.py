@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr
@@ -32,4 +33,10 @@ class RegisterRequest(BaseModel):
 
 
 class RefreshRequest(BaseModel):
-    refresh_token: str 
\ No newline at end of file
+    refresh_token: str
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    created_at: datetime
+    expires_at: Optional[datetime] = None
@@ -2,7 +2,7 @@ from typing import Optional
 from uuid import UUID
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 class UserUpdate(BaseModel):
@@ -18,4 +18,25 @@ class UserResponse(BaseModel):
     is_active: bool
     role: str
     created_at: datetime
-    updated_at: datetime 
\ No newline at end of file
+    updated_at: datetime 
+
+
+class UserPrincipal(BaseModel):
+    """The authenticated user as cached for auth (see app.core.principal_cache)."""
+
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+    id: UUID
+    email: str
+    full_name: Optional[str] = None
+    is_active: bool
+    role: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserSearchResult(UserResponse):
+    call_up_number: Optional[str] = None
+    state_code: Optional[str] = None
+    cds_group: Optional[str] = None
+    score: float
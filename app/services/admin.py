@@ -1,29 +1,32 @@
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 from fastapi import HTTPException, status
 from app.models.user import OfficerProfile
-from app.repositories.admin import AdminRepository
-from sqlmodel import Session
-from app.utils.auth import get_password_hash
+from app.repositories.admin import AsyncAdminRepository
+from app.repositories.base import Include
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.hashing import password_hasher
+from app.core.token import token_manager
 
-from app.repositories.user import UserRepository
+from app.repositories.user import AsyncUserRepository
 
 
 class AdminService:
-    def __init__(self, session: Session):
-        self.admin_repository = AdminRepository(session)
-        self.user_repository = UserRepository(Session)
+    def __init__(self, session: AsyncSession):
+        self.admin_repository = AsyncAdminRepository(session)
+        self.user_repository = AsyncUserRepository(session)
 
-    def create_officer(self, data: dict) -> dict:
-        user = self.user_repository.create_user(
+    async def create_officer(self, data: dict) -> dict:
+        user = await self.user_repository.create_user(
             email=data["email"],
-            hashed_password=get_password_hash(data["password"] or "password123"),
+            hashed_password=await password_hasher.hash(data["password"] or "password123"),
             full_name=data.get("full_name"),
             role="officer",
             address=data.get("address"),
             phone=data.get("phone"),
         )
 
-        officer_profile = self.admin_repository.create_officer_account(
+        officer_profile = await self.admin_repository.create_officer_account(
             officer_profile=OfficerProfile(
                 user_id=user.id,
                 rank=data.get("rank"),
@@ -32,14 +35,29 @@ class AdminService:
         )
         return {"user": user, "officer_profile": officer_profile}
 
-    def get_officer_by_id(self, officer_id: str) -> OfficerProfile:
-        officer = self.admin_repository.get_officer_by_id(officer_id)
+    async def get_officer_by_id(self, officer_id: str, include: Include = None) -> OfficerProfile:
+        officer = await self.admin_repository.get_officer_by_id(officer_id, include=include)
         if not officer:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Officer not found"
             )
         return officer
 
-    def get_all_officers(self) -> List[OfficerProfile]:
-        officers = self.admin_repository.get_all_officers()
+    async def get_all_officers(self, include: Include = None) -> List[OfficerProfile]:
+        officers = await self.admin_repository.get_all_officers(include=include)
         return officers
+
+    async def revoke_sessions(
+        self, user_ids: List[UUID], cds_group: Optional[str] = None
+    ) -> dict:
+        user_ids = list(user_ids)
+        if cds_group:
+            user_ids += await self.admin_repository.get_user_ids_by_cds_group(cds_group)
+        if not user_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide user_ids or a cds_group with members",
+            )
+        unique_ids = list(dict.fromkeys(user_ids))
+        revoked = await token_manager.revoke_sessions(unique_ids)
+        return {"users": len(unique_ids), "sessions_revoked": revoked}
@@ -1,43 +1,85 @@
-from datetime import date, datetime
-from http.client import HTTPException, status
-from sqlmodel import Session
-from app.models.attendance import Attendance
-from app.repositories.attendance import AttendanceRepository
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.config.database import async_session_factory
+from app.core.metrics import metrics
+from app.models.attendance import Attendance, AttendanceRollup
+from app.repositories.attendance import EXPORT_COLUMNS, AsyncAttendanceRepository
+from app.repositories.base import Include
+
+
+def _date_range(
+    start_date: Optional[date], end_date: Optional[date], default_days: int = 0
+) -> tuple:
+    """Validated (start_date, end_date); end_date defaults to today and
+    start_date to default_days before it."""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=default_days)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date.",
+        )
+    if end_date - start_date > timedelta(days=settings.ATTENDANCE_QUERY_WINDOW_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {settings.ATTENDANCE_QUERY_WINDOW_DAYS} days.",
+        )
+    return start_date, end_date
 
 
 class AttendanceService:
-    def __init__(self, session: Session):
-        self.attendance_repository = AttendanceRepository(session)
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.attendance_repository = AsyncAttendanceRepository(session)
 
-    def submit_attendance(self, attendance_data: dict) -> dict:
+    async def submit_attendance(self, attendance_data: dict) -> dict:
         today = attendance_data.get("attendance_date") or date.today()
 
-        existing = self.attendance_repository.get_attendance_by_date(
-            cds_group=attendance_data["cds_group"], target_date=today
-        )
-        if existing:
+        # uq_attendance_corper_id_attendance_date rejects a second record for
+        # the same corper and day, so no read is needed to check for one.
+        try:
+            attendance = await self.attendance_repository.create_attendance(
+                attendance=Attendance(
+                    corper_id=attendance_data.get("corper_id"),
+                    officer_id=attendance_data.get("officer_id"),
+                    cds_group=attendance_data.get("cds_group"),
+                    gps_lat=attendance_data.get("gps_lat"),
+                    gps_long=attendance_data.get("gps_long"),
+                    status=attendance_data.get("status", "present"),
+                    attendance_date=today,
+                    check_in_time=datetime.utcnow(),
+                )
+            )
+        except IntegrityError:
+            await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Attendance for this date already exists.",
             )
-
-        attendance = self.attendance_repository.create_attendance(
-            attendance=Attendance(
-                corper_id=attendance_data.get("corper_id"),
-                officer_id=attendance_data.get("officer_id"),
-                cds_group=attendance_data.get("cds_group"),
-                gps_lat=attendance_data.get("gps_lat"),
-                gps_long=attendance_data.get("gps_long"),
-                status=attendance_data.get("status", "present"),
-                attendance_date=today,
-                check_in_time=datetime.utcnow(),
-            )
-        )
         return {"attendance": attendance}
 
-    def get_corper_attendance(self, corper_id: str) -> list:
-        attendance_records = self.attendance_repository.get_attendance_by_corper(
-            corper_id=corper_id
+    async def get_corper_attendance(
+        self,
+        corper_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include: Include = None,
+    ) -> list:
+        start_date, end_date = _date_range(
+            start_date, end_date, default_days=settings.ATTENDANCE_QUERY_WINDOW_DAYS
+        )
+        attendance_records = await self.attendance_repository.get_attendance_by_corper(
+            corper_id=corper_id, start_date=start_date, end_date=end_date, include=include
         )
         if not attendance_records:
             raise HTTPException(
@@ -46,9 +88,11 @@ class AttendanceService:
             )
         return attendance_records
 
-    def get_group_attendance_by_date(self, cds_group: str, target_date: date) -> list:
-        attendance_records = self.attendance_repository.get_attendance_by_date(
-            cds_group=cds_group, target_date=target_date
+    async def get_group_attendance_by_date(
+        self, cds_group: str, target_date: date, include: Include = None
+    ) -> list:
+        attendance_records = await self.attendance_repository.get_attendance_by_date(
+            cds_group=cds_group, target_date=target_date, include=include
         )
         if not attendance_records:
             raise HTTPException(
@@ -57,11 +101,18 @@ class AttendanceService:
             )
         return attendance_records
 
-    def mark_attendance_status(
-        self, attendance_id: str, status: str, remarks: str = None
+    async def mark_attendance_status(
+        self,
+        attendance_id: str,
+        status: str,
+        remarks: str = None,
+        attendance_date: Optional[date] = None,
     ) -> dict:
-        updated_attendance = self.attendance_repository.update_attendance_status(
-            attendance_id=attendance_id, status=status, remarks=remarks
+        updated_attendance = await self.attendance_repository.update_attendance_status(
+            attendance_id=attendance_id,
+            status=status,
+            remarks=remarks,
+            attendance_date=attendance_date,
         )
         if not updated_attendance:
             raise HTTPException(
@@ -69,3 +120,104 @@ class AttendanceService:
                 detail="Attendance record not found.",
             )
         return {"attendance": updated_attendance}
+
+
+class AttendanceSummaryService:
+    """Attendance counts per group or zone per day, read from the rollups only."""
+
+    def __init__(self, session: AsyncSession):
+        self.attendance_repository = AsyncAttendanceRepository(session)
+
+    async def get_group_summary(
+        self,
+        cds_group: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[AttendanceRollup]:
+        start_date, end_date = _date_range(start_date, end_date)
+        return await self.attendance_repository.get_group_summary(cds_group, start_date, end_date)
+
+    async def get_zone_summary(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        zone: Optional[str] = None,
+    ) -> List[dict]:
+        start_date, end_date = _date_range(start_date, end_date)
+        rows = await self.attendance_repository.get_zone_summary(start_date, end_date, zone)
+        return [dict(row._mapping) for row in rows]
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _ndjson(rows: Sequence[Row]) -> str:
+    return "".join(
+        json.dumps({name: _export_value(value) for name, value in row._mapping.items()}) + "\n"
+        for row in rows
+    )
+
+
+def _csv(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+class AttendanceExportService:
+    """Attendance records streamed as NDJSON or CSV, one chunk per cursor batch.
+
+    The response body is sent after the request's dependencies have closed
+    their sessions, so each export opens its own on the engine it was given.
+    """
+
+    MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+    def __init__(self, bind: AsyncEngine):
+        self.bind = bind
+
+    def export(
+        self,
+        export_format: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cds_group: Optional[str] = None,
+        batch_size: int = settings.ATTENDANCE_EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[str]:
+        """Chunks of the export; the range is validated before any is read.
+
+        Defaults to the ATTENDANCE_QUERY_WINDOW_DAYS up to today.
+        """
+        if export_format not in self.MEDIA_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported export format: {export_format}",
+            )
+        start_date, end_date = _date_range(
+            start_date, end_date, settings.ATTENDANCE_QUERY_WINDOW_DAYS
+        )
+        return self._chunks(export_format, start_date, end_date, cds_group, batch_size)
+
+    async def _chunks(
+        self,
+        export_format: str,
+        start_date: date,
+        end_date: date,
+        cds_group: Optional[str],
+        batch_size: int,
+    ) -> AsyncIterator[str]:
+        async with async_session_factory(bind=self.bind) as session:
+            repository = AsyncAttendanceRepository(session)
+            if export_format == "csv":
+                yield _csv([[column.name for column in EXPORT_COLUMNS]])
+            encode = _csv if export_format == "csv" else _ndjson
+            async for rows in repository.stream_attendance(
+                start_date, end_date, cds_group, batch_size
+            ):
+                yield encode(rows)
+                metrics.increment("attendance_export.rows", len(rows))
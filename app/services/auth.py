@@ -3,7 +3,7 @@ from sqlmodel import Session
 from uuid import UUID
 
 from app.repositories.user import UserRepository
-from app.utils.auth import get_password_hash, verify_password
+from app.core.hashing import password_hasher
 from app.core.token import token_manager
 
 
@@ -25,12 +25,12 @@ class AuthService:
                 detail="Account is deactivated",
             )
 
-        if not verify_password(password, user.password):
+        if not await password_hasher.verify(password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
             )
-        token = token_manager.create_tokens(user.id)
+        token = await token_manager.create_tokens(user.id)
         token['user'] = user
         return token
 
@@ -45,19 +45,19 @@ class AuthService:
         # Create new user
         user = self.user_repository.create_user(
             email=user_data["email"],
-            hashed_password=get_password_hash(user_data["password"]),
+            hashed_password=await password_hasher.hash(user_data["password"]),
             full_name=user_data.get("full_name"),
             role=user_data.get("role"),
             address=user_data.get("address"),
             phone=user_data.get("phone"),
         )
 
-        token = token_manager.create_tokens(user.id)
+        token = await token_manager.create_tokens(user.id)
         token['user'] = user
         return token
 
     async def refresh_token(self, refresh_token: str) -> dict:
-        result = token_manager.refresh_access_token(refresh_token)
+        result = await token_manager.refresh_access_token(refresh_token)
         if not result:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,7 +67,7 @@ class AuthService:
 
     async def logout(self, token: str) -> dict:
         # Invalidate the access token
-        if not token_manager.invalidate_token(token, "access"):
+        if not await token_manager.invalidate_token(token, "access"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid token",
@@ -76,9 +76,12 @@ class AuthService:
 
     async def logout_all(self, user_id: UUID) -> dict:
         # Invalidate all tokens for the user
-        if not token_manager.invalidate_user_tokens(user_id):
+        if not await token_manager.invalidate_user_tokens(user_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to invalidate tokens",
             )
-        return {"message": "Successfully logged out from all devices"} 
\ No newline at end of file
+        return {"message": "Successfully logged out from all devices"}
+
+    async def list_sessions(self, user_id: UUID) -> list:
+        return await token_manager.list_sessions(user_id)
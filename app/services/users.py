@@ -1,18 +1,18 @@
 from fastapi import HTTPException, status
-from sqlmodel import Session
-from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from app.models.user import User
-from app.repositories.user import UserRepository
+from app.repositories.user import AsyncUserRepository
 
 
 class UserService:
-    def __init__(self, session: Session):
-        self.user_repository = UserRepository(session)
+    def __init__(self, session: AsyncSession):
+        self.user_repository = AsyncUserRepository(session)
 
     async def get_user_by_id(self, user_id: str) -> User:
-        user = self.user_repository.get_by_id(user_id)
+        user = await self.user_repository.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -21,10 +21,34 @@ class UserService:
         return user
 
     async def get_all_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        return self.user_repository.get_active_users(skip, limit)
+        return await self.user_repository.get_active_users(skip, limit)
+
+    async def get_users_page(
+        self, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str]]:
+        try:
+            return await self.user_repository.get_active_users_page(limit, cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    async def search_users(self, query: str, limit: int = 20) -> List[dict]:
+        rows = await self.user_repository.search(query.strip(), limit)
+        return [
+            {
+                **user.model_dump(),
+                "call_up_number": profile.call_up_number if profile else None,
+                "state_code": profile.state_code if profile else None,
+                "cds_group": profile.cds_group if profile else None,
+                "score": score,
+            }
+            for user, profile, score in rows
+        ]
 
     async def update_user(self, user_id: str, user_data: dict) -> User:
-        user = self.user_repository.update_user(user_id, user_data)
+        user = await self.user_repository.update_user(user_id, user_data)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -33,7 +57,7 @@ class UserService:
         return user
 
     async def update_user_role(self, user_id: str, new_role: str) -> User:
-        user = self.user_repository.update_user(user_id, {"role": new_role})
+        user = await self.user_repository.update_user(user_id, {"role": new_role})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
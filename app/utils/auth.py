@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.core.token_codec import token_codec
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -18,27 +18,47 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(subject: str | UUID, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(
+    subject: str | UUID,
+    expires_delta: Optional[timedelta] = None,
+    token_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode = {
+        "exp": expire,
+        "iat": datetime.utcnow(),
+        "sub": str(subject),
+        "jti": token_id or uuid4().hex,
+        "typ": "access",
+    }
+    if session_id:
+        to_encode["sid"] = session_id
+    return token_codec.encode(to_encode)
 
 
-def create_refresh_token(subject: str | UUID) -> str:
+def create_refresh_token(subject: str | UUID, token_id: Optional[str] = None) -> str:
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode = {
+        "exp": expire,
+        "iat": datetime.utcnow(),
+        "sub": str(subject),
+        "jti": token_id or uuid4().hex,
+        "typ": "refresh",
+    }
+    return token_codec.encode(to_encode)
+
+
+def decode_token(token: str) -> Optional[dict]:
+    return token_codec.decode(token)
 
 
 def verify_token(token: str) -> Optional[str]:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload.get("sub")
-    except JWTError:
-        return None 
\ No newline at end of file
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload.get("sub") 
\ No newline at end of file
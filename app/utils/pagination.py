@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional
+from uuid import UUID
+
+from fastapi import Request, Response
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Pack the sort key values of the last row into an opaque cursor."""
+    packed = []
+    for value in values:
+        if isinstance(value, datetime):
+            packed.append({"dt": value.isoformat()})
+        elif isinstance(value, date):
+            packed.append({"d": value.isoformat()})
+        elif isinstance(value, UUID):
+            packed.append({"u": str(value)})
+        else:
+            packed.append(value)
+    raw = json.dumps(packed, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Unpack a cursor made by encode_cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        packed = json.loads(raw)
+        if not isinstance(packed, list):
+            raise ValueError("cursor must be a list")
+        return [_unpack(value) for value in packed]
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _unpack(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    (kind, text), = value.items()
+    if kind == "dt":
+        return datetime.fromisoformat(text)
+    if kind == "d":
+        return date.fromisoformat(text)
+    if kind == "u":
+        return UUID(text)
+    raise ValueError(f"unknown cursor value type {kind!r}")
+
+
+def set_next_link(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Advertise the next page in a Link header (RFC 8288)."""
+    if next_cursor:
+        url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{url}>; rel="next"'
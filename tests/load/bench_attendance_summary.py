@@ -0,0 +1,242 @@
+"""Micro-benchmark: a day's status counts of a CDS group, rows vs rollup.
+
+Seeds corpers with profiles spread over a few CDS groups and zones, and
+several days of attendance inserted in bulk (bypassing the rollups, as a
+data load would). Reconciliation then has to build every rollup row. Times
+counting one group's day by loading its attendance rows, as
+get_attendance_by_date callers do, against reading its rollup, and checks
+that both agree. Then checks that create_attendance and
+update_attendance_status keep the rollup in step, and that reconciliation
+repairs drift introduced behind the repository's back and nothing else.
+Seeded rows are removed at the end.
+
+Usage (from the repository root, with the database migrated to head and .env
+configured):
+
+    python tests/load/bench_attendance_summary.py --corpers 20000 --groups 10 --days 5
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry
+from app.core.enums import AttendanceStatus
+from app.core.partitions import MonthlyPartitions
+from app.models.attendance import Attendance, AttendanceRollup
+from app.models.user import CorperProfile, User
+from app.repositories.attendance import AsyncAttendanceRepository
+
+EMAIL_DOMAIN = "bench-attendance-summary.example.com"
+GROUP_PREFIX = "bench-summary-group-"
+STATUSES = [status.value for status in AttendanceStatus]
+
+
+def group(i, groups):
+    return f"{GROUP_PREFIX}{i % groups}"
+
+
+async def seed(session_factory, corpers, groups, days, chunk=5000):
+    now = datetime.utcnow()
+    first_day = date.today() - timedelta(days=days)
+    officer_id = uuid4()
+    users = [{"id": officer_id, "role": "officer", "email": f"officer@{EMAIL_DOMAIN}"}]
+    users += [{"id": uuid4(), "role": "corper", "email": f"corper{i}@{EMAIL_DOMAIN}"} for i in range(corpers)]
+    for user in users:
+        user.update(is_active=True, is_verified=False, created_at=now, updated_at=now)
+    profiles = [
+        {
+            "id": uuid4(),
+            "user_id": user["id"],
+            "call_up_number": f"BENCH/{i}",
+            "state_code": f"BS/00/{i}",
+            "batch": "A",
+            "stream": "1",
+            "gender": "F",
+            "lga_primary_assignment": "Bench",
+            "cds_group": group(i, groups),
+            "zone": f"zone-{i % groups % 3}",
+            "cds_day": "Tuesday",
+            "current_status": "active",
+            "date_of_registration": now,
+        }
+        for i, user in enumerate(users[1:])
+    ]
+    async with session_factory() as session:
+        conn = await session.connection()
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(CorperProfile), profiles)
+        for day in range(days):
+            attendance_date = first_day + timedelta(days=day)
+            check_in = datetime.combine(attendance_date, datetime.min.time())
+            rows = [
+                {
+                    "id": uuid4(),
+                    "corper_id": user["id"],
+                    "officer_id": officer_id,
+                    "cds_group": group(i, groups),
+                    "attendance_date": attendance_date,
+                    "check_in_time": check_in,
+                    "status": STATUSES[(i + day) % 7 % len(STATUSES)],
+                    "created_at": check_in,
+                    "updated_at": check_in,
+                }
+                for i, user in enumerate(users[1:])
+            ]
+            for offset in range(0, len(rows), chunk):
+                await conn.execute(insert(Attendance), rows[offset:offset + chunk])
+        await session.commit()
+    return officer_id, [user["id"] for user in users[1:]], first_day
+
+
+async def analyze(engine):
+    # Fresh bulk-loaded rows have no statistics yet, which misleads the planner
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("ANALYZE")
+
+
+async def cleanup(session_factory):
+    async with session_factory() as session:
+        conn = await session.connection()
+        await conn.execute(delete(Attendance).where(Attendance.cds_group.like(f"{GROUP_PREFIX}%")))
+        await conn.execute(
+            delete(AttendanceRollup).where(AttendanceRollup.cds_group.like(f"{GROUP_PREFIX}%"))
+        )
+        await conn.execute(
+            delete(CorperProfile).where(CorperProfile.cds_group.like(f"{GROUP_PREFIX}%"))
+        )
+        await conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        await session.commit()
+
+
+async def timed(operation, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await operation()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), result
+
+
+def rollup_counts(rollup):
+    return {status: getattr(rollup, status) for status in STATUSES + ["total"]}
+
+
+async def main(corpers, groups, days, repeat, database_url):
+    registry = EngineRegistry(database_url)
+    engine = registry.async_engine("bench")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    if engine.dialect.name == "postgresql":
+        await MonthlyPartitions("attendance", engine).ensure(
+            date.today() - timedelta(days=days), date.today()
+        )
+
+    print(f"Seeding {corpers} corpers x {days} days of attendance in {groups} groups...")
+    officer_id, corper_ids, first_day = await seed(session_factory, corpers, groups, days)
+    await analyze(engine)
+    last_day = first_day + timedelta(days=days - 1)
+    target = (group(0, groups), first_day + timedelta(days=days // 2))
+    failures = 0
+
+    def check(name, ok):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+    try:
+        async with session_factory() as session:
+            repository = AsyncAttendanceRepository(session)
+            backfilled = await repository.reconcile_rollups(first_day, last_day)
+            check(f"reconciliation builds the {groups * days} missing rollups", backfilled == groups * days)
+            check("a second reconciliation repairs nothing", await repository.reconcile_rollups(first_day, last_day) == 0)
+
+            async def from_rows():
+                rows = await repository.get_attendance_by_date(*target)
+                counts = Counter(row.status for row in rows)
+                return {**{status: counts[status] for status in STATUSES}, "total": len(rows)}
+
+            async def from_rollup():
+                rollups = await repository.get_group_summary(target[0], target[1], target[1])
+                return rollup_counts(rollups[0])
+
+            rows_ms, expected = await timed(from_rows, repeat)
+            session.expunge_all()
+            rollup_ms, counts = await timed(from_rollup, repeat)
+            check("rollup counts match the attendance rows", counts == expected)
+            print(f"  {expected['total']} records in the group that day, median of {repeat}:")
+            print(f"    load rows and count  {rows_ms:8.2f}ms")
+            print(f"    read rollup          {rollup_ms:8.2f}ms")
+
+            zones = await repository.get_zone_summary(target[1], target[1])
+            check(
+                "zone totals add up to every record that day",
+                sum(row.total for row in zones) == corpers and sum(row.groups for row in zones) == groups,
+            )
+
+            # A new day through the repository: counted without reconciling
+            today = last_day + timedelta(days=1)
+            records = [
+                await repository.create_attendance(
+                    Attendance(
+                        corper_id=corper_id,
+                        officer_id=officer_id,
+                        cds_group=target[0],
+                        attendance_date=today,
+                        check_in_time=datetime.utcnow(),
+                    )
+                )
+                for corper_id in corper_ids[:3 * groups:groups]
+            ]
+            await repository.update_attendance_status(records[0].id, "late", attendance_date=today)
+            await repository.update_attendance_status(records[1].id, "present", attendance_date=today)
+            rollup = (await repository.get_group_summary(target[0], today, today))[0]
+            check(
+                "create and status updates keep the rollup in step",
+                rollup_counts(rollup) == {"present": 2, "absent": 0, "late": 1, "excused": 0, "total": 3}
+                and rollup.zone == "zone-0",
+            )
+            check("nothing to repair after repository writes", await repository.reconcile_rollups(first_day, today) == 0)
+
+            # Drift: a status changed and a record deleted behind its back
+            conn = await session.connection()
+            await conn.execute(
+                update(Attendance)
+                .where(Attendance.id == records[0].id, Attendance.attendance_date == today)
+                .values(status="excused")
+            )
+            await conn.execute(
+                delete(Attendance).where(
+                    Attendance.cds_group == group(1, groups), Attendance.attendance_date == first_day
+                )
+            )
+            await session.commit()
+            check("reconciliation repairs exactly the two drifted rollups", await repository.reconcile_rollups(first_day, today) == 2)
+            session.expunge_all()
+            rollup = (await repository.get_group_summary(target[0], today, today))[0]
+            check("the repaired rollup matches attendance", rollup.excused == 1 and rollup.late == 0)
+            check("rollups without attendance are removed", not await repository.get_group_summary(group(1, groups), first_day, first_day))
+    finally:
+        await cleanup(session_factory)
+        await registry.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpers", type=int, default=20000)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main(args.corpers, args.groups, args.days, args.repeat, args.database_url)) else 0)
@@ -0,0 +1,86 @@
+"""Micro-benchmark: statements and latency of a batch insert, add_all plus a
+refresh per row vs create_many's INSERT ... RETURNING.
+
+Inserts a batch of generated users both ways against the configured
+database, counts the statements each sends, and removes the rows after.
+
+Usage (from the repository root, with Postgres running and .env configured):
+
+    python tests/load/bench_bulk_writes.py --batch 1000 --chunk-size 500
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry
+from app.models.user import User
+from app.repositories.user import AsyncUserRepository
+
+EMAIL_DOMAIN = "bench-bulk.example.com"
+
+
+class Counters:
+    statements = 0
+
+
+def batch(size):
+    tag = uuid4().hex[:8]
+    return [User(email=f"{tag}{i}@{EMAIL_DOMAIN}", full_name=f"Bench User {i}") for i in range(size)]
+
+
+async def add_all_and_refresh(session, users, chunk_size):
+    session.add_all(users)
+    await session.commit()
+    for user in users:
+        await session.refresh(user)
+
+
+async def insert_returning(session, users, chunk_size):
+    await AsyncUserRepository(session).create_many(users, chunk_size=chunk_size)
+
+
+async def measure(name, flow, session_factory, size, chunk_size):
+    users = batch(size)
+    Counters.statements = 0
+    async with session_factory() as session:
+        start = time.perf_counter()
+        await flow(session, users, chunk_size)
+        elapsed = time.perf_counter() - start
+    print(f"{name:<22} statements={Counters.statements:5d}  {elapsed * 1000:9.1f}ms")
+
+
+async def main(size, chunk_size, database_url):
+    engine = EngineRegistry(database_url).async_engine("bench")
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: setattr(Counters, "statements", Counters.statements + 1),
+    )
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    print(f"batch of {size} users")
+    try:
+        await measure("add_all + refresh", add_all_and_refresh, session_factory, size, chunk_size)
+        await measure("INSERT ... RETURNING", insert_returning, session_factory, size, chunk_size)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    asyncio.run(main(args.batch, args.chunk_size, args.database_url))
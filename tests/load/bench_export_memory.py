@@ -0,0 +1,230 @@
+"""Memory benchmark: streaming attendance export vs loading every row.
+
+Seeds a year of attendance for enough corpers to reach --rows records,
+spread over --groups CDS groups (on PostgreSQL with generate_series, in
+bulk inserts elsewhere). Then runs AttendanceExportService over a single
+group and over the whole table, in each format, and reads the peak resident
+memory of the process after each. Checks that every record is exported
+once, and that the full export, --groups times larger, does not raise the
+peak the group export reached: memory use stays flat as the export grows.
+For comparison, measures loading --orm-rows records as ORM objects with
+.all() and extrapolates that to the table. Seeded rows are removed at the
+end.
+
+Usage (from the repository root, with the database migrated to head and .env
+configured):
+
+    python tests/load/bench_export_memory.py --rows 5000000
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import resource
+import time
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry
+from app.core.enums import AttendanceStatus
+from app.core.partitions import MonthlyPartitions
+from app.models.attendance import Attendance
+from app.models.user import User
+from app.services.attendance import AttendanceExportService
+
+EMAIL_DOMAIN = "bench-export-memory.example.com"
+GROUP_PREFIX = "bench-export-group-"
+STATUSES = [status.value for status in AttendanceStatus]
+DAYS = 365
+
+SEED_USERS_SQL = text(
+    """
+    INSERT INTO "user" (id, email, full_name, is_active, is_verified, role, created_at, updated_at)
+    SELECT gen_random_uuid(), 'corper' || n || '@' || :domain, 'Corper ' || n,
+           true, false, 'corper', now(), now()
+    FROM generate_series(1, :corpers) AS n
+    """
+)
+
+SEED_ATTENDANCE_SQL = text(
+    """
+    INSERT INTO attendance (id, corper_id, officer_id, cds_group, attendance_date,
+                            check_in_time, status, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, :officer_id, CAST(:prefix AS text) || (u.n % :groups),
+           :day, :check_in, (CAST(:statuses AS text[]))[1 + (u.n + :offset) % 4], :check_in, :check_in
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY email) AS n
+        FROM "user" WHERE email LIKE :pattern AND role = 'corper'
+    ) AS u
+    LIMIT :rows
+    """
+)
+
+
+async def seed(session_factory, rows, groups, first_day, chunk=10000):
+    now = datetime.utcnow()
+    corpers = math.ceil(rows / DAYS)
+    officer_id = uuid4()
+    async with session_factory() as session:
+        conn = await session.connection()
+        await conn.execute(
+            insert(User),
+            {"id": officer_id, "email": f"officer@{EMAIL_DOMAIN}", "role": "officer", "is_active": True,
+             "is_verified": False, "created_at": now, "updated_at": now},
+        )
+        if conn.dialect.name == "postgresql":
+            # Seeding millions of rows outlasts DB_STATEMENT_TIMEOUT_MS
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            await conn.execute(SEED_USERS_SQL, {"domain": EMAIL_DOMAIN, "corpers": corpers})
+            # Without fresh statistics the foreign key checks scan "user"
+            await conn.execute(text('ANALYZE "user"'))
+            for day in range(DAYS):
+                attendance_date = first_day + timedelta(days=day)
+                await conn.execute(
+                    SEED_ATTENDANCE_SQL,
+                    {"officer_id": officer_id, "prefix": GROUP_PREFIX, "groups": groups, "statuses": STATUSES,
+                     "day": attendance_date, "check_in": datetime.combine(attendance_date, datetime.min.time()),
+                     "offset": day, "pattern": f"corper%@{EMAIL_DOMAIN}", "rows": max(0, min(corpers, rows - day * corpers))},
+                )
+        else:
+            users = [
+                {"id": uuid4(), "email": f"corper{n}@{EMAIL_DOMAIN}", "full_name": f"Corper {n}", "role": "corper",
+                 "is_active": True, "is_verified": False, "created_at": now, "updated_at": now}
+                for n in range(1, corpers + 1)
+            ]
+            await conn.execute(insert(User), users)
+            batch = []
+            for day in range(DAYS):
+                attendance_date = first_day + timedelta(days=day)
+                check_in = datetime.combine(attendance_date, datetime.min.time())
+                for n, user in enumerate(users, start=1):
+                    if rows <= 0:
+                        break
+                    rows -= 1
+                    batch.append(
+                        {"id": uuid4(), "corper_id": user["id"], "officer_id": officer_id,
+                         "cds_group": f"{GROUP_PREFIX}{n % groups}", "attendance_date": attendance_date,
+                         "check_in_time": check_in, "status": STATUSES[(n + day) % 4],
+                         "created_at": check_in, "updated_at": check_in}
+                    )
+                    if len(batch) == chunk:
+                        await conn.execute(insert(Attendance), batch)
+                        batch = []
+            if batch:
+                await conn.execute(insert(Attendance), batch)
+        await session.commit()
+
+
+async def cleanup(session_factory):
+    async with session_factory() as session:
+        conn = await session.connection()
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        await conn.execute(delete(Attendance).where(Attendance.cds_group.like(f"{GROUP_PREFIX}%")))
+        await conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        await session.commit()
+
+
+def peak_rss():
+    """Peak resident memory of this process so far, in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def timed(operation):
+    start = time.perf_counter()
+    result = await operation()
+    return result, peak_rss(), time.perf_counter() - start
+
+
+async def consume(service, export_format, first_day, last_day, cds_group=None):
+    """Records and bytes of an export, keeping only the last chunk."""
+    records, size, header = 0, 0, export_format == "csv"
+    async for chunk in service.export(export_format, first_day, last_day, cds_group):
+        size += len(chunk)
+        lines = chunk.count("\n")
+        if header:
+            lines, header = lines - 1, False
+        elif export_format == "ndjson":
+            json.loads(chunk[:chunk.index("\n")])  # well-formed
+        records += lines
+    return records, size
+
+
+async def main(rows, groups, orm_rows, formats, database_url):
+    registry = EngineRegistry(database_url)
+    engine = registry.async_engine("bench")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    last_day = date.today()
+    first_day = last_day - timedelta(days=DAYS - 1)
+    if engine.dialect.name == "postgresql":
+        await MonthlyPartitions("attendance", engine).ensure(first_day, last_day)
+    service = AttendanceExportService(engine)
+    failures = 0
+
+    def check(name, ok):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+    print(f"Seeding {rows} attendance records in {groups} groups over {DAYS} days...")
+    start = time.perf_counter()
+    await seed(session_factory, rows, groups, first_day)
+    print(f"  seeded in {time.perf_counter() - start:.0f}s")
+    try:
+        group = f"{GROUP_PREFIX}0"
+        in_range = Attendance.attendance_date.between(first_day, last_day)
+        async with session_factory() as session:
+            total = await session.scalar(select(func.count()).where(in_range))
+            in_group = await session.scalar(
+                select(func.count()).where(in_range, Attendance.cds_group == group)
+            )
+        baseline = peak_rss()
+        print(f"Batches of {settings.ATTENDANCE_EXPORT_BATCH_SIZE}, peak RSS above {baseline:.0f}MB:")
+        for export_format in formats:
+            (group_records, _), group_peak, _ = await timed(
+                lambda: consume(service, export_format, first_day, last_day, group)
+            )
+            (records, size), peak, elapsed = await timed(
+                lambda: consume(service, export_format, first_day, last_day)
+            )
+            print(f"  {export_format:6}  {group_records:>9} records  +{group_peak - baseline:6.1f}MB")
+            print(
+                f"  {export_format:6}  {records:>9} records  +{peak - baseline:6.1f}MB"
+                f"  {size / 2**20:.0f}MB in {elapsed:.0f}s ({records / elapsed:.0f} records/s)"
+            )
+            check(f"{export_format}: every record is exported once", records == total and group_records == in_group)
+            # Peak RSS only grows: the full export may not raise it past the group's
+            check(f"{export_format}: the full export peaks where one group's did", peak <= group_peak + 8)
+
+        async def load_all():
+            async with session_factory() as session:
+                return len((await session.exec(select(Attendance).limit(orm_rows))).all())
+
+        before = peak_rss()
+        loaded, orm_peak, _ = await timed(load_all)
+        print(
+            f"  .all() of {loaded} ORM objects  +{orm_peak - before:6.1f}MB at least"
+            f"  (about {(orm_peak - before) * rows / loaded / 1024:.1f}GB for all {rows})"
+        )
+    finally:
+        await cleanup(session_factory)
+        await registry.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--orm-rows", type=int, default=100_000)
+    parser.add_argument("--formats", default="ndjson,csv")
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    formats = args.formats.split(",")
+    sys.exit(1 if asyncio.run(main(args.rows, args.groups, args.orm_rows, formats, args.database_url)) else 0)
@@ -0,0 +1,123 @@
+"""Micro-benchmark: latency of a deep page, OFFSET vs keyset pagination.
+
+Seeds a generated set of active users, then times fetching page N (default
+1000, 100 rows per page) with the deprecated OFFSET query and with the
+keyset query from that page's cursor, both ordered by (created_at, id) and
+served by ix_user_created_at_id. The seeded rows are removed at the end.
+
+Usage (from the repository root, with Postgres running and .env configured):
+
+    python tests/load/bench_pagination.py --users 300000 --page 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry
+from app.models.user import User
+from app.repositories.user import AsyncUserRepository
+
+EMAIL_DOMAIN = "bench-pagination.example.com"
+
+
+async def seed(session_factory, count, chunk=5000):
+    start = datetime.utcnow() - timedelta(days=365)
+    async with session_factory() as session:
+        conn = await session.connection()
+        for offset in range(0, count, chunk):
+            rows = [
+                {
+                    "id": uuid4(),
+                    "email": f"user{i}@{EMAIL_DOMAIN}",
+                    "full_name": f"Bench User {i}",
+                    "is_active": True,
+                    "is_verified": False,
+                    "role": "corper",
+                    "created_at": start + timedelta(seconds=i),
+                    "updated_at": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + chunk, count))
+            ]
+            await conn.execute(insert(User), rows)
+        await session.commit()
+
+
+async def fetch(session, statement):
+    return (await session.exec(statement)).all()
+
+
+async def timed(operation, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = await operation()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), rows
+
+
+async def main(users, page, limit, repeat, database_url):
+    engine = EngineRegistry(database_url).async_engine("bench")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    print(f"Seeding {users} users...")
+    await seed(session_factory, users)
+    try:
+        async with session_factory() as session:
+            repository = AsyncUserRepository(session)
+            skip = (page - 1) * limit
+            # The cursor a client would hold after reading page - 1.
+            previous = await fetch(
+                session,
+                select(User)
+                .where(User.is_active == True)
+                .order_by(User.created_at, User.id)
+                .offset(skip - 1)
+                .limit(1),
+            )
+            cursor = repository._page(previous * 2, 1)[1] if previous else None
+
+            offset_statement = (
+                select(User)
+                .where(User.is_active == True)
+                .order_by(User.created_at, User.id)
+                .offset(skip)
+                .limit(limit)
+            )
+            offset_ms, offset_rows = await timed(
+                lambda: fetch(session, offset_statement), repeat
+            )
+            keyset_ms, (keyset_rows, _) = await timed(
+                lambda: repository.get_active_users_page(limit, cursor), repeat
+            )
+        assert [u.id for u in offset_rows] == [u.id for u in keyset_rows]
+        print(f"page {page} ({limit} rows/page), median of {repeat}:")
+        print(f"  offset  {offset_ms:8.2f}ms")
+        print(f"  keyset  {keyset_ms:8.2f}ms")
+    finally:
+        async with session_factory() as session:
+            conn = await session.connection()
+            await conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.page, args.limit, args.repeat, args.database_url))
@@ -0,0 +1,76 @@
+"""Micro-benchmark: Redis calls per 1k requests, exact vs leased rate limiting.
+
+Simulates several workers, each with its own LeasedRateLimiter, sending
+requests for a handful of keys against a local Redis, and counts the limiter
+script calls made in exact mode (one per request) and in leased mode.
+
+Usage (from the repository root, with Redis running and .env configured):
+
+    python tests/load/bench_rate_limiter.py --requests 10000 --workers 4
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.core.redis import async_redis_client
+from app.core.rate_limiter import LeasedRateLimiter, RateLimiter
+
+LIMIT = 1000
+PERIOD = 60
+
+
+class CountingRateLimiter(RateLimiter):
+    """RateLimiter that counts its Redis script calls."""
+
+    calls = 0
+
+    async def hit(self, key, limit=None, period=None, cost=1):
+        CountingRateLimiter.calls += 1
+        return await super().hit(key, limit, period, cost)
+
+
+async def run(mode, requests, workers, lease_size, keys):
+    CountingRateLimiter.calls = 0
+    limiter = CountingRateLimiter()
+    for key in keys:
+        await limiter.reset_attempts(key)
+    size = lease_size if mode == "leased" else 0
+    tiers = [LeasedRateLimiter(limiter, lease_size=size) for _ in range(workers)]
+
+    allowed = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        tier = random.choice(tiers)
+        result = await tier.hit(random.choice(keys), LIMIT, PERIOD)
+        allowed += result.allowed
+    elapsed = time.perf_counter() - start
+    calls = CountingRateLimiter.calls
+    for tier in tiers:
+        await tier.stop()
+
+    print(
+        f"{mode:<7} redis calls/1k requests={calls * 1000 / requests:7.1f}  "
+        f"allowed={allowed:6d}/{requests}  {requests / elapsed:8.0f} req/s"
+    )
+
+
+async def main(requests, workers, lease_size, key_count):
+    keys = [f"bench:{i}" for i in range(key_count)]
+    print(
+        f"{requests} requests, {workers} workers, {key_count} keys, "
+        f"limit {LIMIT}/{PERIOD}s, lease size {lease_size}"
+    )
+    await run("exact", requests, workers, lease_size, keys)
+    await run("leased", requests, workers, lease_size, keys)
+    await async_redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lease-size", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.workers, args.lease_size, args.keys))
@@ -0,0 +1,74 @@
+"""Compare Redis memory used by N sessions in the legacy and compact formats.
+
+Legacy: the full JWT is part of the key (access_token:{jwt},
+refresh_token:{jwt}), the value is a JSON string, and user_tokens:{uid} holds
+both JWTs. Compact: session:{sid} and access:{jti} hashes keyed by jti, and
+user_sessions:{uid} holds only session ids.
+
+Usage (from the repository root, against a scratch Redis database):
+
+    python tests/load/bench_session_memory.py --sessions 50000
+"""
+import argparse
+import asyncio
+from uuid import uuid4
+
+from app.config import settings
+from app.core.redis import async_redis_client
+from app.core.token import token_manager
+from app.utils.auth import create_access_token, create_refresh_token
+
+BATCH = 1000
+
+
+async def used_memory() -> int:
+    info = await async_redis_client.client.info("memory")
+    return info["used_memory"]
+
+
+async def write_legacy(user_ids):
+    data = '{"user_id": "%s", "created_at": "2025-01-01T00:00:00", "expires_at": "2025-01-01T01:00:00"}'
+    for start in range(0, len(user_ids), BATCH):
+        pipeline = async_redis_client.pipeline(transaction=False)
+        for user_id in user_ids[start:start + BATCH]:
+            access_token = create_access_token(user_id)
+            refresh_token = create_refresh_token(user_id)
+            pipeline.set(f"access_token:{access_token}", data % user_id, ex=3600)
+            pipeline.set(f"refresh_token:{refresh_token}", data % user_id, ex=86400)
+            pipeline.sadd(f"user_tokens:{user_id}", access_token, refresh_token)
+        await pipeline.execute()
+
+
+async def write_compact(user_ids):
+    for start in range(0, len(user_ids), BATCH):
+        await asyncio.gather(*(token_manager.create_tokens(u) for u in user_ids[start:start + BATCH]))
+
+
+async def cleanup(user_ids):
+    for start in range(0, len(user_ids), BATCH):
+        await asyncio.gather(*(token_manager.invalidate_user_tokens(u) for u in user_ids[start:start + BATCH]))
+
+
+async def measure(name, writer, sessions):
+    user_ids = [str(uuid4()) for _ in range(sessions)]
+    before = await used_memory()
+    await writer(user_ids)
+    used = await used_memory() - before
+    print(f"{name:<8} total={used / 1024 / 1024:8.2f} MiB  per session={used / sessions:7.1f} B")
+    await cleanup(user_ids)
+    return used
+
+
+async def main(sessions):
+    print(f"{sessions} sessions on {settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}")
+    legacy = await measure("legacy", write_legacy, sessions)
+    compact = await measure("compact", write_compact, sessions)
+    print(f"compact format uses {compact / legacy:.0%} of the legacy memory")
+    await async_redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions))
@@ -0,0 +1,95 @@
+"""Micro-benchmark: JWT encode/decode throughput per codec backend and algorithm.
+
+Signs and verifies access-token-shaped claims with every backend/algorithm
+pair that is installed, using keys generated for the run, so the cheapest
+verification for our request volume can be picked via JWT_BACKEND and
+ALGORITHM. Pairs whose backend is missing or unsupported are skipped.
+
+Usage (from the repository root):
+
+    python tests/load/bench_token_codec.py --iterations 20000
+"""
+import argparse
+import secrets
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.core.token_codec import BACKENDS, TokenCodec
+
+
+def pem_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+def key_material():
+    secret = secrets.token_hex(32)
+    return {
+        "HS256": (None, None),
+        "EdDSA": pem_pair(ed25519.Ed25519PrivateKey.generate()),
+        "ES256": pem_pair(ec.generate_private_key(ec.SECP256R1())),
+        "RS256": pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+    }, secret
+
+
+def claims():
+    now = datetime.utcnow()
+    return {
+        "exp": now + timedelta(minutes=30),
+        "iat": now,
+        "sub": str(uuid4()),
+        "jti": uuid4().hex,
+        "sid": uuid4().hex,
+        "typ": "access",
+    }
+
+
+def ops_per_second(operation, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    return iterations / (time.perf_counter() - start)
+
+
+def main(iterations):
+    keys, secret = key_material()
+    print(f"{iterations} iterations per operation")
+    print(f"{'backend':<8} {'algorithm':<10} {'encode/s':>10} {'decode/s':>10}")
+    for backend in BACKENDS:
+        for algorithm, (private_key, public_key) in keys.items():
+            try:
+                codec = TokenCodec(
+                    backend=backend,
+                    algorithm=algorithm,
+                    secret_key=secret,
+                    private_key=private_key,
+                    public_key=public_key,
+                )
+            except (RuntimeError, ValueError) as e:
+                print(f"{backend:<8} {algorithm:<10} skipped: {e}")
+                continue
+            payload = claims()
+            token = codec.encode(payload)
+            assert codec.decode(token) is not None
+            encode_rate = ops_per_second(lambda: codec.encode(payload), iterations)
+            decode_rate = ops_per_second(lambda: codec.decode(token), iterations)
+            print(f"{backend:<8} {algorithm:<10} {encode_rate:>10.0f} {decode_rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,136 @@
+"""Micro-benchmark: Redis round trips and latency of token operations.
+
+Compares the original one-command-per-call TokenManager flow ("before") with
+the pipelined/scripted TokenManager ("after") against a local Redis.
+
+Usage (from the repository root, with Redis running and .env configured):
+
+    python tests/load/bench_token_roundtrips.py --iterations 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from redis.asyncio import BlockingConnectionPool, Connection
+
+from app.config import settings
+from app.core.redis import async_redis_client
+from app.core.token import token_manager
+from app.utils.auth import create_access_token, create_refresh_token, verify_token
+
+
+class CountingConnection(Connection):
+    """Connection that counts every packet written to the socket."""
+
+    round_trips = 0
+
+    async def send_packed_command(self, command, check_health=True):
+        CountingConnection.round_trips += 1
+        return await super().send_packed_command(command, check_health)
+
+
+def token_data(user_id):
+    return {"user_id": str(user_id), "created_at": "now", "expires_at": "later"}
+
+
+async def legacy_create_tokens(user_id):
+    client = async_redis_client
+    access_token = create_access_token(user_id)
+    refresh_token = create_refresh_token(user_id)
+    await client.set(f"access_token:{access_token}", token_data(user_id), expire=3600)
+    await client.set(f"refresh_token:{refresh_token}", token_data(user_id), expire=86400)
+    await client.sadd(f"user_tokens:{user_id}", access_token)
+    await client.sadd(f"user_tokens:{user_id}", refresh_token)
+    return {"access_token": access_token, "refresh_token": refresh_token}
+
+
+async def legacy_refresh(refresh_token):
+    client = async_redis_client
+    user_id = verify_token(refresh_token)
+    if not await client.exists(f"refresh_token:{refresh_token}"):
+        return None
+    access_token = create_access_token(user_id)
+    await client.set(f"access_token:{access_token}", token_data(user_id), expire=3600)
+    await client.sadd(f"user_tokens:{user_id}", access_token)
+    return access_token
+
+
+async def legacy_invalidate(token):
+    client = async_redis_client
+    data = await client.get(f"access_token:{token}")
+    if data:
+        await client.srem(f"user_tokens:{data['user_id']}", token)
+        return await client.delete(f"access_token:{token}")
+    return False
+
+
+async def measure(name, operation, setups, iterations):
+    latencies = []
+    CountingConnection.round_trips = 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        await operation(setups[i])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(
+        f"{name:<28} round trips/op={CountingConnection.round_trips / iterations:5.2f}  "
+        f"p50={statistics.median(latencies):6.3f}ms  "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:6.3f}ms"
+    )
+
+
+async def main(iterations):
+    async_redis_client._pool = BlockingConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=4,
+        connection_class=CountingConnection,
+        decode_responses=True,
+    )
+    users = [uuid4() for _ in range(iterations)]
+
+    print(f"{iterations} iterations against {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+    await measure("before: create_tokens", legacy_create_tokens, users, iterations)
+    await measure("after:  create_tokens", token_manager.create_tokens, users, iterations)
+
+    legacy_tokens = [await legacy_create_tokens(u) for u in users]
+    tokens = [await token_manager.create_tokens(u) for u in users]
+    # Warm the script cache so first-use SCRIPT LOAD fallbacks are not counted.
+    await token_manager.refresh_access_token(tokens[0]["refresh_token"])
+
+    await measure(
+        "before: refresh_access_token",
+        legacy_refresh,
+        [t["refresh_token"] for t in legacy_tokens],
+        iterations,
+    )
+    await measure(
+        "after:  refresh_access_token",
+        token_manager.refresh_access_token,
+        [t["refresh_token"] for t in tokens],
+        iterations,
+    )
+    await measure(
+        "before: invalidate_token",
+        legacy_invalidate,
+        [t["access_token"] for t in legacy_tokens],
+        iterations,
+    )
+    await measure(
+        "after:  invalidate_token",
+        token_manager.invalidate_token,
+        [t["access_token"] for t in tokens],
+        iterations,
+    )
+
+    for user_id in users:
+        await token_manager.invalidate_user_tokens(user_id)
+    await async_redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
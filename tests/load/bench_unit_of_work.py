@@ -0,0 +1,91 @@
+"""Micro-benchmark: transactions and connections per request, per-dependency
+sessions vs a request-scoped unit of work.
+
+Replays the database work of PUT /users/me (load the caller in auth, then
+update the profile in the handler) both ways against the configured
+database and counts BEGINs and pool checkouts per request.
+
+Usage (from the repository root, with Postgres running and .env configured):
+
+    python tests/load/bench_unit_of_work.py --requests 500
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry, UnitOfWork
+from app.models.user import User
+from app.repositories.user import AsyncUserRepository
+
+
+class Counters:
+    transactions = 0
+    checkouts = 0
+
+
+async def per_dependency_sessions(session_factory, user_id):
+    # get_current_user and the handler each open their own session
+    async with session_factory() as auth_session:
+        await AsyncUserRepository(auth_session).get_by_id(user_id)
+    async with session_factory() as session:
+        await AsyncUserRepository(session).update_user(user_id, {"full_name": uuid4().hex})
+
+
+async def unit_of_work(session_factory, user_id):
+    async with session_factory() as session:
+        uow = UnitOfWork(session)
+        repository = AsyncUserRepository(uow.session)
+        await repository.get_by_id(user_id)
+        await repository.update_user(user_id, {"full_name": uuid4().hex})
+        await uow.commit()
+
+
+async def measure(name, flow, session_factory, user_id, requests):
+    Counters.transactions = Counters.checkouts = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        await flow(session_factory, user_id)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<24} transactions/request={Counters.transactions / requests:4.2f}  "
+        f"checkouts/request={Counters.checkouts / requests:4.2f}  "
+        f"{requests / elapsed:7.0f} req/s"
+    )
+
+
+async def main(requests, database_url):
+    engine = EngineRegistry(database_url).async_engine("bench")
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "begin", lambda conn: setattr(Counters, "transactions", Counters.transactions + 1))
+    event.listen(sync_engine.pool, "checkout", lambda *args: setattr(Counters, "checkouts", Counters.checkouts + 1))
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with session_factory() as session:
+        user = await AsyncUserRepository(session).create(
+            User(email=f"bench_{uuid4().hex}@example.com", role="corper")
+        )
+
+    print(f"{requests} requests")
+    await measure("per-dependency sessions", per_dependency_sessions, session_factory, user.id, requests)
+    await measure("unit of work", unit_of_work, session_factory, user.id, requests)
+
+    async with session_factory() as session:
+        await AsyncUserRepository(session).delete(user.id)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.database_url))
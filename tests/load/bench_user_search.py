@@ -0,0 +1,134 @@
+"""Micro-benchmark: user search latency as the user table grows.
+
+Seeds synthetic corpers (user plus corper profile) in steps up to --sizes'
+last value (default 500k), and after each step times UserRepository.search
+for a few selective queries. With the trigram indexes each query stays
+roughly flat across steps; a leading-wildcard ILIKE without them grows
+linearly with the table. Seeded rows are removed at the end.
+
+Usage (from the repository root, with Postgres migrated to head, pg_trgm
+installed and .env configured):
+
+    python tests/load/bench_user_search.py --sizes 50000,200000,500000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry
+from app.models.user import CorperProfile, User
+from app.repositories.user import AsyncUserRepository
+
+EMAIL_DOMAIN = "bench-search.example.com"
+FIRST_NAMES = ["Ada", "Chinedu", "Fatima", "Tunde", "Ngozi", "Ibrahim", "Bola", "Emeka", "Zainab", "Segun"]
+LAST_NAMES = ["Okafor", "Bello", "Adeyemi", "Eze", "Musa", "Olawale", "Nwosu", "Abubakar", "Okonkwo", "Lawal"]
+STATES = ["LA", "AB", "KN", "OY", "EN", "KD", "RV", "BO", "OG", "PL"]
+GROUPS = [f"{name} CDS" for name in ("Health", "Education", "Sanitation", "Road Safety", "Anti-Corruption", "ICT")]
+
+
+def corper(i, now):
+    first, last = FIRST_NAMES[i % 10], LAST_NAMES[(i // 10) % 10]
+    state = STATES[(i // 100) % 10]
+    user_id = uuid4()
+    user = {
+        "id": user_id,
+        "email": f"{first}.{last}{i}@{EMAIL_DOMAIN}".lower(),
+        "full_name": f"{first} {last} {i}",
+        "is_active": True,
+        "is_verified": True,
+        "role": "corper",
+        "created_at": now,
+        "updated_at": now,
+    }
+    profile = {
+        "id": uuid4(),
+        "user_id": user_id,
+        "call_up_number": f"NYSC/{state}/24A/{i:07d}",
+        "state_code": f"{state}/24A/{i:07d}",
+        "batch": "A",
+        "stream": "1",
+        "gender": "F" if i % 2 else "M",
+        "lga_primary_assignment": "Ikeja",
+        "cds_group": random.choice(GROUPS),
+        "zone": "Zone 1",
+        "cds_day": "Tuesday",
+        "current_status": "active",
+        "date_of_registration": now,
+    }
+    return user, profile
+
+
+async def seed(session_factory, start, stop, chunk=5000):
+    now = datetime.utcnow()
+    async with session_factory() as session:
+        conn = await session.connection()
+        for offset in range(start, stop, chunk):
+            rows = [corper(i, now) for i in range(offset, min(offset + chunk, stop))]
+            await conn.execute(insert(User), [user for user, _ in rows])
+            await conn.execute(insert(CorperProfile), [profile for _, profile in rows])
+        await conn.execute(text('ANALYZE "user", corperprofile'))
+        await session.commit()
+
+
+async def timed(repository, query, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await repository.search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+async def main(sizes, repeat, database_url):
+    engine = EngineRegistry(database_url).async_engine("bench")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.connect() as conn:
+        if not (await conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))).first():
+            sys.exit("pg_trgm is not installed; run the migrations first")
+
+    # One selective query per kind of column, each matching a row of the first step.
+    now = datetime.utcnow()
+    queries = [
+        corper(1230, now)[0]["email"].split("@")[0],
+        corper(4013, now)[0]["full_name"],
+        corper(311, now)[1]["call_up_number"],
+        corper(977, now)[1]["state_code"],
+    ]
+    print("users     " + "".join(f"{q:>20}" for q in queries))
+    seeded = 0
+    try:
+        for size in sizes:
+            await seed(session_factory, seeded, size)
+            seeded = size
+            async with session_factory() as session:
+                repository = AsyncUserRepository(session)
+                latencies = [await timed(repository, query, repeat) for query in queries]
+            print(f"{size:<10}" + "".join(f"{ms:>18.2f}ms" for ms in latencies))
+    finally:
+        async with session_factory() as session:
+            conn = await session.connection()
+            seeded_ids = select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+            await conn.execute(delete(CorperProfile).where(CorperProfile.user_id.in_(seeded_ids)))
+            await conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="50000,200000,500000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    asyncio.run(main(sizes, args.repeat, args.database_url))
@@ -0,0 +1,276 @@
+"""Query-count check: list endpoints must not issue a SELECT per row.
+
+Seeds a CDS group whose corpers have profiles, a day of their attendance,
+officers with profiles, and one corper's attendance over as many days as
+there are officers, each day marked by another officer; once small, once
+large. Each list endpoint that serializes corpers or officers is then called
+through the application's routers over HTTP, authenticated as a user of the
+role it requires, and the SQL statements the request issues are counted.
+Every endpoint must answer 200 and stay within its budget at both sizes, so
+the include specs the endpoints pass are what is gated: a relationship left
+out of one is a lazy load, which fails the request on the async session.
+Exits non-zero on any failure, so it can gate CI. Seeded rows are removed at
+the end.
+
+Usage (from the repository root, with the database migrated to head and .env
+configured):
+
+    python tests/load/check_query_counts.py --small 5 --large 50
+"""
+import argparse
+import asyncio
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import delete, event, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.config.database import EngineRegistry, UnitOfWork, get_unit_of_work
+from app.core.partitions import MonthlyPartitions
+from app.dependencies.auth import get_current_user
+from app.models.attendance import Attendance, AttendanceRollup
+from app.models.user import CorperProfile, OfficerProfile, User
+from app.routers import api_router
+from app.schemas.user import UserPrincipal
+
+EMAIL_DOMAIN = "check-query-counts.example.com"
+GROUP_PREFIX = "check-query-counts-"
+
+# Statements allowed per request, whatever the row count
+BUDGETS = {
+    "GET /attendance/group": 1,
+    "GET /attendance/all": 1,
+    "GET /attendance/me": 1,
+    "GET /admin/officers": 1,
+}
+
+
+def seed(engine, size):
+    now = datetime.utcnow()
+    cds_group = f"{GROUP_PREFIX}{size}"
+    officers = [
+        {"id": uuid4(), "role": "officer", "email": f"officer{size}-{i}@{EMAIL_DOMAIN}", "full_name": f"Officer {i}"}
+        for i in range(size)
+    ]
+    corpers = [
+        {"id": uuid4(), "role": "corper", "email": f"corper{size}-{i}@{EMAIL_DOMAIN}", "full_name": f"Corper {i}"}
+        for i in range(size)
+    ]
+    for user in officers + corpers:
+        user.update(is_active=True, is_verified=False, created_at=now, updated_at=now)
+    with engine.begin() as conn:
+        conn.execute(insert(User), officers + corpers)
+        conn.execute(
+            insert(OfficerProfile),
+            [
+                {"id": uuid4(), "user_id": officer["id"], "designation": "LGI", "zone": cds_group}
+                for officer in officers
+            ],
+        )
+        conn.execute(
+            insert(CorperProfile),
+            [
+                {
+                    "id": uuid4(),
+                    "user_id": corper["id"],
+                    "call_up_number": f"CHECK/{size}/{i}",
+                    "state_code": f"CQ/{size}/{i}",
+                    "batch": "A",
+                    "stream": "1",
+                    "gender": "F",
+                    "lga_primary_assignment": "Check",
+                    "cds_group": cds_group,
+                    "zone": "zone-0",
+                    "cds_day": "Tuesday",
+                    "current_status": "active",
+                    "date_of_registration": now,
+                }
+                for i, corper in enumerate(corpers)
+            ],
+        )
+        conn.execute(
+            insert(Attendance),
+            [
+                {
+                    "id": uuid4(),
+                    "corper_id": corper["id"],
+                    # A handful of officers mark a group's attendance
+                    "officer_id": officers[i % 3]["id"],
+                    "cds_group": cds_group,
+                    "attendance_date": date.today(),
+                    "check_in_time": now,
+                    "status": "present",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i, corper in enumerate(corpers)
+            ]
+            # The first corper's earlier days, each marked by another officer
+            + [
+                {
+                    "id": uuid4(),
+                    "corper_id": corpers[0]["id"],
+                    "officer_id": officer["id"],
+                    "cds_group": cds_group,
+                    "attendance_date": date.today() - timedelta(days=day),
+                    "check_in_time": now,
+                    "status": "present",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for day, officer in enumerate(officers[1:], start=1)
+            ],
+        )
+    return cds_group, corpers[0]["id"]
+
+
+async def ensure_partitions(registry, start, end):
+    engine = registry.async_engine("check")
+    try:
+        await MonthlyPartitions("attendance", engine).ensure(start, end)
+    finally:
+        await engine.dispose()
+
+
+def cleanup(engine):
+    with engine.begin() as conn:
+        conn.execute(delete(Attendance).where(Attendance.cds_group.like(f"{GROUP_PREFIX}%")))
+        conn.execute(delete(AttendanceRollup).where(AttendanceRollup.cds_group.like(f"{GROUP_PREFIX}%")))
+        conn.execute(delete(CorperProfile).where(CorperProfile.cds_group.like(f"{GROUP_PREFIX}%")))
+        conn.execute(delete(OfficerProfile).where(OfficerProfile.zone.like(f"{GROUP_PREFIX}%")))
+        conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+
+
+@contextmanager
+def counting(engine):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def principal(user_id, role):
+    now = datetime.utcnow()
+    return UserPrincipal(
+        id=user_id,
+        email=f"{role}@{EMAIL_DOMAIN}",
+        is_active=True,
+        role=role,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def requests(group, corper_id):
+    """(name, url, params, principal making the request) per endpoint."""
+    today = date.today().isoformat()
+    return [
+        (
+            "GET /attendance/group",
+            "/attendance/group",
+            {"cds_group": group, "attendance_date": today},
+            principal(uuid4(), "officer"),
+        ),
+        (
+            "GET /attendance/all",
+            "/attendance/all",
+            {"cds_group": group, "attendance_date": today},
+            principal(uuid4(), "super_admin"),
+        ),
+        (
+            "GET /attendance/me",
+            "/attendance/me",
+            {"start_date": (date.today() - timedelta(days=365)).isoformat(), "end_date": today},
+            principal(corper_id, "corper"),
+        ),
+        ("GET /admin/officers", "/admin/officers", {}, principal(uuid4(), "super_admin")),
+    ]
+
+
+def build_app(engine):
+    """The API routers, on the check database and without the middleware."""
+    app = FastAPI()
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+
+    async def unit_of_work():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield UnitOfWork(session)
+
+    app.dependency_overrides[get_unit_of_work] = unit_of_work
+    return app
+
+
+async def count_statements(registry, group, corper_id):
+    """(status, statements issued, rows listed) per endpoint."""
+    engine = registry.async_engine("check")
+    app = build_app(engine)
+    results = {}
+    try:
+        # A failed request is a 500 to report, not an exception to stop on
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            for name, url, params, user in requests(group, corper_id):
+                app.dependency_overrides[get_current_user] = lambda user=user: user
+                with counting(engine.sync_engine) as statements:
+                    response = await client.get(settings.API_V1_STR + url, params=params)
+                rows = response.json() if response.status_code == 200 else []
+                results[name] = (response.status_code, len(statements), len(rows))
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main(small, large, database_url):
+    registry = EngineRegistry(database_url)
+    engine = registry.engine("check")
+    if engine.dialect.name == "postgresql":
+        asyncio.run(ensure_partitions(registry, date.today() - timedelta(days=large), date.today()))
+    failures = 0
+
+    def check(name, ok, detail=""):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f'  ({detail})' if detail else ''}")
+
+    try:
+        counts = {}  # (endpoint, size) -> (status, statements, rows)
+        for size in (small, large):
+            for name, result in asyncio.run(count_statements(registry, *seed(engine, size))).items():
+                counts[name, size] = result
+            cleanup(engine)
+        for name, budget in BUDGETS.items():
+            results = {size: counts[name, size] for size in (small, large)}
+            check(
+                f"{name}: answers 200 with the seeded rows",
+                all(status == 200 and rows >= size for size, (status, _, rows) in results.items()),
+                ", ".join(f"{size} rows: {status}, {rows} listed" for size, (status, _, rows) in results.items()),
+            )
+            check(
+                f"{name}: within {budget} statement(s)",
+                all(issued <= budget for _, issued, _ in results.values()),
+                ", ".join(f"{size} rows: {issued}" for size, (_, issued, _) in results.items()),
+            )
+    finally:
+        cleanup(engine)
+        engine.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--small", type=int, default=5)
+    parser.add_argument("--large", type=int, default=50)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    sys.exit(1 if main(args.small, args.large, args.database_url) else 0)
@@ -0,0 +1,125 @@
+"""Routing check: reads go to replicas, writes and stale replicas to the primary.
+
+Stores a marker row on the primary and on each replica, then builds requests
+and checks which database the session of each one reads the marker from:
+GET requests rotate over the replicas, other methods use the primary, a
+replica lagging beyond DB_REPLICA_MAX_LAG_SECONDS or failing its lag check is
+skipped, and after a user's write their GETs stay on the primary for
+DB_READ_YOUR_WRITES_SECONDS (this needs Redis; without it every GET of a
+signed-in user is sent to the primary). Marker rows are removed at the end.
+
+Any databases can stand in for the replicas, e.g. SQLite files:
+
+    python tests/load/check_replica_routing.py \\
+        --primary-url sqlite:////tmp/primary.db \\
+        --replica-url sqlite:////tmp/replica0.db --replica-url sqlite:////tmp/replica1.db
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from starlette.requests import Request
+
+from app.config import settings
+from app.config.database import EngineRegistry, ReplicaRouter
+from app.core.redis import async_redis_client
+from app.core.token_codec import token_codec
+from app.models.user import User
+
+MARKER_EMAIL = "replica-routing-marker@example.com"
+USER_ID = "00000000-0000-0000-0000-00000000beef"
+
+
+def request(method, user_id=None):
+    headers = []
+    if user_id:
+        token = token_codec.encode({"sub": user_id, "exp": datetime.utcnow() + timedelta(minutes=5)})
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers})
+
+
+async def mark(registry, names):
+    now = datetime.utcnow()
+    for name in names:
+        async with registry.async_engine(name).begin() as conn:
+            await conn.run_sync(User.__table__.create, checkfirst=True)
+            await conn.execute(delete(User).where(User.email == MARKER_EMAIL))
+            await conn.execute(
+                insert(User),
+                {"email": MARKER_EMAIL, "full_name": name, "is_active": True, "is_verified": False,
+                 "role": "corper", "created_at": now, "updated_at": now},
+            )
+
+
+async def unmark(registry, names):
+    for name in names:
+        async with registry.async_engine(name).begin() as conn:
+            await conn.execute(delete(User).where(User.email == MARKER_EMAIL))
+
+
+async def served_by(registry, router, req):
+    name = await router.route(req)
+    async with registry.async_engine(name).connect() as conn:
+        return (await conn.execute(select(User.full_name).where(User.email == MARKER_EMAIL))).scalar()
+
+
+async def main(primary_url, replica_urls):
+    registry = EngineRegistry(primary_url, replica_urls)
+    router = ReplicaRouter(registry, interval=0)
+    names = ["primary", *registry.replicas]
+    await mark(registry, names)
+    failures = 0
+
+    def check(name, ok, detail=""):
+        nonlocal failures
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f'  ({detail})' if detail else ''}")
+
+    try:
+        await router.check()
+        check("every replica's lag is measured", all(lag is not None for lag in router.lag.values()), router.lag)
+
+        reads = [await served_by(registry, router, request("GET")) for _ in range(2 * len(replica_urls))]
+        check("GETs rotate over the replicas", sorted(set(reads)) == registry.replicas, reads)
+        for method in ("POST", "PUT", "PATCH", "DELETE"):
+            check(f"{method} uses the primary", await served_by(registry, router, request(method)) == "primary")
+
+        router.lag[registry.replicas[0]] = router.max_lag + 1
+        reads = {await served_by(registry, router, request("GET")) for _ in range(len(replica_urls))}
+        expected = set(registry.replicas[1:]) or {"primary"}
+        check("a lagging replica is skipped", reads == expected, sorted(reads))
+        router.lag = dict.fromkeys(router.lag)
+        check("without a measured replica, GETs use the primary", await served_by(registry, router, request("GET")) == "primary")
+        await router.check()
+
+        try:
+            redis_up = await async_redis_client.client.ping()
+        except Exception:
+            redis_up = False
+        if redis_up:
+            await async_redis_client.client.delete(f"db_primary:{USER_ID}")
+            check("a signed-in user reads from a replica", await served_by(registry, router, request("GET", USER_ID)) != "primary")
+            await router.written(request("POST", USER_ID))
+            check("after writing, they read from the primary", await served_by(registry, router, request("GET", USER_ID)) == "primary")
+            check("other users still read from replicas", await served_by(registry, router, request("GET")) != "primary")
+            await async_redis_client.client.delete(f"db_primary:{USER_ID}")
+        else:
+            check("without Redis, a signed-in user reads from the primary", await served_by(registry, router, request("GET", USER_ID)) == "primary")
+    finally:
+        await unmark(registry, names)
+        await registry.dispose()
+        await async_redis_client.close()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--primary-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    parser.add_argument("--replica-url", action="append", default=None)
+    args = parser.parse_args()
+    replica_urls = args.replica_url or settings.DB_REPLICA_URIS
+    if not replica_urls:
+        parser.error("no replicas: pass --replica-url or set DB_REPLICA_URIS")
+    sys.exit(1 if asyncio.run(main(args.primary_url, replica_urls)) else 0)
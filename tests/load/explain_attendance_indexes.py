@@ -0,0 +1,212 @@
+"""Query-plan check: the attendance and user listings use their indexes.
+
+Seeds corpers and a few weeks of attendance, runs ANALYZE, then captures the
+SQL each repository method sends and EXPLAINs it, failing unless the plan
+scans the index the migrations built for that access path and, on Postgres,
+prunes attendance to the monthly partitions its dates cover. Also checks
+that a second record for the same corper and day is rejected. Seeded rows
+are removed at the end.
+
+Usage (from the repository root, with Postgres migrated to head and .env
+configured):
+
+    python tests/load/explain_attendance_indexes.py --corpers 2000 --days 30
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete, event, insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel
+
+from app.config import settings
+from app.config.database import EngineRegistry
+from app.core.partitions import MonthlyPartitions
+from app.models.attendance import Attendance
+from app.models.user import User
+from app.repositories.attendance import AttendanceRepository
+from app.repositories.user import UserRepository
+
+EMAIL_DOMAIN = "explain-attendance.example.com"
+GROUPS = 20
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def seed(engine, corpers, days):
+    now = datetime.utcnow()
+    first_day = date.today() - timedelta(days=days)
+    officer_id = uuid4()
+    users = [{"id": officer_id, "role": "officer", "email": f"officer@{EMAIL_DOMAIN}"}]
+    users += [{"id": uuid4(), "role": "corper", "email": f"corper{i}@{EMAIL_DOMAIN}"} for i in range(corpers)]
+    for i, user in enumerate(users):
+        user.update(is_active=True, is_verified=False, created_at=now + timedelta(microseconds=i), updated_at=now)
+    with engine.begin() as conn:
+        conn.execute(insert(User), users)
+        for day in range(days):
+            attendance_date = first_day + timedelta(days=day)
+            check_in = datetime.combine(attendance_date, datetime.min.time())
+            conn.execute(
+                insert(Attendance),
+                [
+                    {
+                        "id": uuid4(),
+                        "corper_id": user["id"],
+                        "officer_id": officer_id,
+                        "cds_group": f"group-{i % GROUPS}",
+                        "attendance_date": attendance_date,
+                        "check_in_time": check_in,
+                        "status": "present",
+                        "created_at": check_in + timedelta(microseconds=i),
+                        "updated_at": check_in,
+                    }
+                    for i, user in enumerate(users[1:])
+                ],
+            )
+    return [user["id"] for user in users[1:]], first_day
+
+
+def analyze(engine):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+@contextmanager
+def capture(engine):
+    """Collect (statement, parameters) of every SELECT sent meanwhile."""
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            sent.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield sent
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def scanned(engine, statement, parameters):
+    """Indexes and tables (partitions, on Postgres) the plan of a statement scans.
+
+    A partition's index is reported by the name of the partitioned index it
+    belongs to.
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            indexes = {
+                row[-1].split(" INDEX ")[1].split()[0]
+                for row in rows
+                if " INDEX " in row[-1] and "AUTOMATIC" not in row[-1]
+            }
+            return indexes, set()
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        indexes, tables, nodes = set(), set(), [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] in INDEX_SCANS:
+                indexes.add(node["Index Name"])
+            if "Relation Name" in node:
+                tables.add(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        parents = conn.execute(
+            text(
+                "SELECT idx.relname, coalesce(parent.relname, idx.relname) FROM pg_class idx "
+                "LEFT JOIN pg_inherits i ON i.inhrelid = idx.oid "
+                "LEFT JOIN pg_class parent ON parent.oid = i.inhparent "
+                "WHERE idx.relname = ANY(:names)"
+            ),
+            {"names": list(indexes)},
+        ).all()
+    return set(dict(parents).values()), tables
+
+
+def main(corpers, days, database_url):
+    registry = EngineRegistry(database_url)
+    engine = registry.engine("explain")
+    SQLModel.metadata.create_all(engine)
+    if engine.dialect.name == "postgresql":
+        partitions = MonthlyPartitions("attendance", registry.async_engine("explain"))
+        asyncio.run(partitions.ensure(date.today() - timedelta(days=days), date.today()))
+    print(f"Seeding {corpers} corpers x {days} days of attendance...")
+    corper_ids, first_day = seed(engine, corpers, days)
+    analyze(engine)
+
+    corper_id = corper_ids[corpers // 2]
+    target_date = first_day + timedelta(days=days // 2)
+    window = (target_date, target_date + timedelta(days=1))
+    # (name, query, acceptable indexes, most partitions it may scan)
+    cases = [
+        ("attendance by corper", lambda r, u: r.get_attendance_by_corper(corper_id),
+         {"ix_attendance_corper_id_created_at_id", "uq_attendance_corper_id_attendance_date"}, None),
+        ("attendance by corper in a window", lambda r, u: r.get_attendance_by_corper(corper_id, *window),
+         {"ix_attendance_corper_id_created_at_id", "uq_attendance_corper_id_attendance_date"}, 2),
+        ("attendance page by corper", lambda r, u: r.get_attendance_page_by_corper(corper_id, 20),
+         {"ix_attendance_corper_id_created_at_id"}, None),
+        ("attendance by group and date", lambda r, u: r.get_attendance_by_date("group-3", target_date),
+         {"ix_attendance_cds_group_attendance_date"}, 1),
+        ("attendance page by group and date", lambda r, u: r.get_attendance_page_by_date("group-3", target_date, 20),
+         {"ix_attendance_cds_group_attendance_date"}, 1),
+        ("active users page", lambda r, u: u.get_active_users_page(20),
+         {"ix_user_created_at_id"}, None),
+    ]
+
+    failures = 0
+    try:
+        with Session(engine) as session:
+            repository, users = AttendanceRepository(session), UserRepository(session)
+            for name, run, expected, max_partitions in cases:
+                with capture(engine) as sent:
+                    run(repository, users)
+                plans = [scanned(engine, *s) for s in sent]
+                indexes = set().union(*(i for i, _ in plans))
+                tables = set().union(*(t for _, t in plans))
+                partitions = {t for t in tables if t.startswith("attendance_p")}
+                ok = bool(indexes & expected)
+                if max_partitions is not None and engine.dialect.name == "postgresql":
+                    ok = ok and 0 < len(partitions) <= max_partitions
+                failures += not ok
+                print(
+                    f"{'PASS' if ok else 'FAIL'}  {name:<36} indexes={sorted(indexes) or '-'}"
+                    + (f" partitions={len(partitions)}" if partitions else "")
+                )
+
+            duplicate = repository.get_attendance_by_corper(corper_id)[0]
+            try:
+                repository.create_attendance(
+                    Attendance(
+                        corper_id=corper_id,
+                        officer_id=duplicate.officer_id,
+                        cds_group=duplicate.cds_group,
+                        attendance_date=duplicate.attendance_date,
+                        check_in_time=datetime.utcnow(),
+                    )
+                )
+                ok = False
+            except IntegrityError:
+                session.rollback()
+                ok = True
+            failures += not ok
+            print(f"{'PASS' if ok else 'FAIL'}  {'one record per corper per day':<36}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(Attendance).where(Attendance.corper_id.in_(corper_ids)))
+            conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        engine.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpers", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+    sys.exit(1 if main(args.corpers, args.days, args.database_url) else 0)
@@ -72,6 +72,26 @@ class AuthUser(HttpUser):
         except Exception as e:
             self.logger.error(f"Error getting profile: {str(e)}")
 
+    @task(2)
+    def get_own_attendance(self):
+        """Test viewing own attendance."""
+        if not self.token:
+            self.login()
+            if not self.token:
+                return
+
+        try:
+            response = self.client.get(
+                "/api/v1/attendance/me",
+                headers={"Authorization": f"Bearer {self.token}"}
+            )
+            if response.status_code == 200:
+                self.logger.info("Successfully retrieved attendance")
+            else:
+                self.logger.error(f"Failed to get attendance: {response.text}")
+        except Exception as e:
+            self.logger.error(f"Error getting attendance: {str(e)}")
+
     @task(1)
     def refresh_token(self):
         """Test token refresh."""